@@ -0,0 +1,154 @@
+"""
+Vectorised demographic analysis over the columnar form snapshot (snapshots.py).
+
+Every function takes a Snapshot and a row mask from select(), built from the
+filters: exact values of dictionary columns and a created_at range. After
+that it works on whole arrays, so a question over millions of forms is a few
+passes over memory-mapped columns and touches no SQL:
+
+- histogram() uses np.histogram on a numeric column.
+- crosstab() combines the dictionary codes of one or two columns into a
+  single index and counts it with np.bincount.
+- percentiles() sorts once by (group, value) and interpolates every group's
+  quantiles in one step.
+
+Numeric columns store NULL as -1; those rows are left out and reported as
+`missing`.
+"""
+from snapshots import DICTIONARY_COLUMNS, NUMERIC_COLUMNS, np
+
+MAX_BINS = 1000  # np.histogram allocates per bin; a huge count would exhaust memory
+
+
+def select(snapshot, filters=None, date_from=None, date_to=None):
+    """Boolean mask of the forms matching {dictionary column: value} and [date_from, date_to) on created_at."""
+    mask = np.ones(snapshot.rows, dtype=bool)
+    for column, value in (filters or {}).items():
+        if column not in DICTIONARY_COLUMNS:
+            raise ValueError(f"Cannot filter on: {column}")
+        code = snapshot.code(column, value)
+        if code is None:
+            mask[:] = False
+        else:
+            mask &= snapshot.columns[column] == code
+    created = snapshot.columns['created_at']
+    if date_from:
+        mask &= created >= np.datetime64(date_from, 's')
+    if date_to:
+        mask &= created < np.datetime64(date_to, 's')
+    return mask
+
+
+def _check_numeric(column):
+    if column not in NUMERIC_COLUMNS:
+        raise ValueError(f"Not a numeric column: {column} (use one of {', '.join(NUMERIC_COLUMNS)})")
+
+
+def _numeric(snapshot, column, mask):
+    _check_numeric(column)
+    values = snapshot.columns[column][mask]
+    present = values >= 0
+    return values[present], int(len(values) - present.sum())
+
+
+def histogram(snapshot, column, bins, mask):
+    """
+    Counts of `column` per bin: `bins` is a list of edges (last bin closed)
+    or a number of equal-width bins, at most MAX_BINS either way.
+    Returns {'bins': [{'from', 'to', 'count'}], 'missing': n}.
+    """
+    if isinstance(bins, int):
+        if not 1 <= bins <= MAX_BINS:
+            raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+    else:
+        if not 2 <= len(bins) <= MAX_BINS + 1:
+            raise ValueError(f"Give between 2 and {MAX_BINS + 1} bin edges")
+        if not np.isfinite(np.asarray(bins, dtype=float)).all():
+            raise ValueError("Bin edges must be finite numbers")
+    values, missing = _numeric(snapshot, column, mask)
+    if isinstance(bins, int) and not len(values):
+        return {'bins': [], 'missing': missing}
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        'bins': [{'from': edges[i].item(), 'to': edges[i + 1].item(), 'count': int(c)} for i, c in enumerate(counts)],
+        'missing': missing,
+    }
+
+
+def _dictionary(snapshot, column):
+    if column not in DICTIONARY_COLUMNS:
+        raise ValueError(f"Not a categorical column: {column} (use one of {', '.join(DICTIONARY_COLUMNS)})")
+    return snapshot.dictionaries[column]
+
+
+def crosstab(snapshot, rows, cols, mask):
+    """
+    Form counts per value of `rows`, or per (`rows`, `cols`) pair when
+    `cols` is given. NULL shows as None; values without forms are dropped.
+    Returns {'rows': [values], 'cols': [values], 'counts': [n, ...] or [[n, ...], ...]}.
+    """
+    row_values = _dictionary(snapshot, rows)
+    row_codes = snapshot.columns[rows][mask].astype(np.int64)
+    if cols is None:
+        counts = np.bincount(row_codes, minlength=len(row_values))
+        order = np.flatnonzero(counts)[np.argsort(-counts[counts > 0], kind='stable')]
+        return {'rows': [row_values[i] for i in order], 'cols': None, 'counts': counts[order].tolist()}
+
+    col_values = _dictionary(snapshot, cols)
+    col_codes = snapshot.columns[cols][mask].astype(np.int64)
+    width = len(col_values)
+    matrix = np.bincount(row_codes * width + col_codes, minlength=len(row_values) * width)
+    matrix = matrix.reshape(len(row_values), width)
+    used_rows = np.flatnonzero(matrix.sum(axis=1))
+    used_rows = used_rows[np.argsort(-matrix.sum(axis=1)[used_rows], kind='stable')]
+    used_cols = np.flatnonzero(matrix.sum(axis=0))
+    used_cols = used_cols[np.argsort(-matrix.sum(axis=0)[used_cols], kind='stable')]
+    return {
+        'rows': [row_values[i] for i in used_rows],
+        'cols': [col_values[i] for i in used_cols],
+        'counts': matrix[np.ix_(used_rows, used_cols)].tolist(),
+    }
+
+
+def percentiles(snapshot, column, qs, mask, by=None):
+    """
+    Percentiles `qs` (0-100) of a numeric column, overall or per value of
+    the dictionary column `by`, with linear interpolation (np.percentile's
+    default). Returns {'groups': [{'group', 'count', 'values': {q: v}}], 'missing': n}.
+    """
+    _check_numeric(column)
+    qs = np.asarray(qs, dtype=float)
+    if qs.size == 0 or not np.isfinite(qs).all() or (qs < 0).any() or (qs > 100).any():
+        raise ValueError("Percentiles must be between 0 and 100")
+    if by is None:
+        labels = [None]
+        groups = np.zeros(snapshot.rows, dtype=np.int64)[mask]
+    else:
+        labels = _dictionary(snapshot, by)
+        groups = snapshot.columns[by][mask].astype(np.int64)
+    values = snapshot.columns[column][mask]
+    present = values >= 0
+    values, groups = values[present].astype(np.float64), groups[present]
+
+    order = np.lexsort((values, groups))
+    values, groups = values[order], groups[order]
+    codes = np.arange(len(labels))
+    starts = np.searchsorted(groups, codes, side='left')
+    counts = np.searchsorted(groups, codes, side='right') - starts
+    found = np.flatnonzero(counts)
+
+    # position of each quantile inside its group's sorted slice, interpolated
+    positions = starts[found, None] + (qs[None, :] / 100) * (counts[found, None] - 1)
+    low = np.floor(positions).astype(np.int64)
+    high = np.ceil(positions).astype(np.int64)
+    result = values[low] + (values[high] - values[low]) * (positions - low)
+
+    keys = [format(q, 'g') for q in qs]
+    return {
+        'groups': [
+            {'group': labels[code] if by else None, 'count': int(counts[code]),
+             'values': dict(zip(keys, (round(v, 2) for v in result[i].tolist())))}
+            for i, code in enumerate(found)
+        ],
+        'missing': int(len(present) - present.sum()),
+    }
@@ -1,7 +1,11 @@
+import json
+import mimetypes
 import os
+import time
 
 from flask import (
-    Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, abort
+    Flask, Response, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, abort,
+    session, stream_with_context
 )
 
 
@@ -13,21 +17,50 @@ from flask_login import (
     current_user
 )
 
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
 
 import pymysql
 pymysql.install_as_MySQLdb()
 
+import click
+from werkzeug.middleware.proxy_fix import ProxyFix
+
 from config import Config
 import models
-from decorators import admin_required
+import importer
+import exporter
+import rollups
+import profiler
+import images
+import search
+import security
+import events
+import batch
+import identifiers
+import fragments
+import conditional
+import archive
+import snapshots
+import analytics
+from decorators import admin_required, is_admin
 from datetime import datetime, timedelta
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
 app = Flask(__name__)
 app.config.from_object(Config)
+if app.config['TRUSTED_PROXIES']:
+    # behind nginx remote_addr is the proxy; take the client from X-Forwarded-For
+    # so the per-IP auth limits stay per client
+    proxies = app.config['TRUSTED_PROXIES']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+models.init_app(app)
+profiler.init_app(app)
+security.init_app(app)
+events.init_app(app)
+identifiers.init_app(app)
+fragments.init_app(app)
+conditional.init_app(app)
+snapshots.init_app(app)
 
 # ---------- Login manager ----------
 login_manager = LoginManager()
@@ -38,16 +71,40 @@ login_manager.init_app(app)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 
+@app.template_filter('avatar')
+def avatar_filter(filename, size=128):
+    """Best thumbnail filename for an avatar rendered `size` px wide (device pixels)."""
+    return images.avatar_filename(filename, size, app.config)
+
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
 # ---------- flask-login user loader ----------
-@login_manager.user_loader
-def load_user(user_id):
-    row = models.get_user_by_id(user_id)
-    if not row:
+def remember_user(row):
+    """
+    Stash the small user record in the signed session so the next requests
+    can skip the DB entirely (USER_SESSION_CACHE). It is re-read after
+    USER_SESSION_TTL seconds, from the user cache, so a role change can take
+    up to USER_SESSION_TTL + USER_CACHE_TTL to show on pages. Admin access
+    does not wait for it: decorators.is_admin() re-reads the role.
+    """
+    if app.config['USER_SESSION_CACHE']:
+        record = {field: row.get(field) for field in models.USER_SESSION_FIELDS}
+        record['exp'] = time.time() + app.config['USER_SESSION_TTL']
+        session['_user'] = record
+
+
+def session_user(user_id):
+    """The user record remembered in the session for `user_id`, unless missing or expired."""
+    row = session.get('_user') if app.config['USER_SESSION_CACHE'] else None
+    if not row or str(row.get('id')) != str(user_id) or row.get('exp', 0) < time.time():
         return None
+    return row
+
+
+def user_from_row(row):
     return models.User(
         row['id'],
         row['name'],
@@ -57,6 +114,17 @@ def load_user(user_id):
     )
 
 
+@login_manager.user_loader
+def load_user(user_id):
+    row = session_user(user_id)
+    if row is None:
+        row = models.get_user_cached(user_id)
+        if not row:
+            return None
+        remember_user(row)
+    return user_from_row(row)
+
+
 # ==========================
 # AUTH
 # ==========================
@@ -67,6 +135,11 @@ def register():
         email = request.form.get('email').lower()
         password = request.form.get('password')
 
+        wait = security.throttle(app, request.remote_addr)
+        if wait:
+            flash(f"Too many attempts. Try again in {int(wait) + 1} seconds.", "danger")
+            return render_template('auth/register.html'), 429
+
         if models.get_user_by_email(email):
             flash("Email already registered", "danger")
             return redirect(url_for('register'))
@@ -74,13 +147,22 @@ def register():
         photo = request.files.get('profile_photo')
         filename = None
         if photo and allowed_file(photo.filename):
-            filename = secure_filename(photo.filename)
-            photo.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+            try:
+                filename = images.save_upload(photo, app.config)
+            except images.InvalidImage as e:
+                flash(str(e), "danger")
+                return redirect(url_for('register'))
+
+        try:
+            password_hash = app.extensions['password_hasher'].hash(password)
+        except security.Overloaded:
+            flash("The server is busy. Please try again in a moment.", "danger")
+            return render_template('auth/register.html'), 503
 
         models.create_user(
             name=name,
             email=email,
-            password=password,
+            password_hash=password_hash,
             role='user',
             profile_photo=filename
         )
@@ -97,8 +179,18 @@ def login():
         email = request.form.get('email').lower()
         password = request.form.get('password')
 
+        wait = security.throttle(app, request.remote_addr, email)
+        if wait:
+            flash(f"Too many login attempts. Try again in {int(wait) + 1} seconds.", "danger")
+            return render_template('auth/login.html'), 429
+
         user = models.get_user_by_email(email)
-        if not user or not check_password_hash(user['password'], password):
+        try:
+            valid = bool(user) and app.extensions['password_hasher'].check(user['password'], password)
+        except security.Overloaded:
+            flash("The server is busy. Please try again in a moment.", "danger")
+            return render_template('auth/login.html'), 503
+        if not valid:
             flash("Invalid credentials", "danger")
             return redirect(url_for('login'))
 
@@ -109,6 +201,7 @@ def login():
             user['role'],
             user.get('profile_photo')
         ))
+        remember_user(user)
 
         flash("Login successful", "success")
         return redirect(url_for('admin_dashboard' if user['role'] == 'admin' else 'user_dashboard'))
@@ -120,6 +213,7 @@ def login():
 @login_required
 def logout():
     logout_user()
+    session.pop('_user', None)
     flash("Logged out successfully", "info")
     return redirect(url_for('login'))
 
@@ -129,9 +223,10 @@ def logout():
 # ==========================
 @app.route('/')
 @login_required
+@conditional.etag_from(lambda: models.user_version(current_user.id))
 def user_dashboard():
-    forms = models.get_all_forms_by_user(current_user.id)
-    tickets = models.get_tickets_by_user(current_user.id)
+    forms = models.get_all_forms_by_user(current_user.id, include_archived=True)
+    tickets = models.get_tickets_by_user(current_user.id, include_archived=True)
     return render_template('user/dashboard.html', user=current_user, forms=forms, tickets=tickets)
 
 
@@ -141,9 +236,13 @@ def profile():
     if request.method == 'POST':
         photo = request.files.get('profile_photo')
         if photo and allowed_file(photo.filename):
-            filename = secure_filename(photo.filename)
-            photo.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+            try:
+                filename = images.save_upload(photo, app.config)
+            except images.InvalidImage as e:
+                flash(str(e), "danger")
+                return redirect(url_for('profile'))
             models.update_profile_photo(current_user.id, filename)
+            session.pop('_user', None)
             flash("Profile updated", "success")
             return redirect(url_for('profile'))
 
@@ -156,14 +255,23 @@ def profile():
 def user_form(form_id=None):
     if request.method == 'POST':
         form_data = request.form.to_dict()
-        if form_id:
-            existing = models.get_form_by_id(form_id)
-            if not existing or int(existing['user_id']) != int(current_user.id):
-                flash("Invalid form selected for editing.", "danger")
-                return redirect(url_for('user_dashboard'))
-            models.update_form_by_id(form_id, form_data)
-        else:
-            models.create_or_update_form(current_user.id, form_data)
+        malformed = identifiers.malformed(form_data)
+        if malformed:
+            names = ' and '.join(IDENTIFIER_LABELS[c] for c in malformed)
+            flash(f"Please enter a valid {names}.", "danger")
+            return redirect(url_for('user_form', form_id=form_id) if form_id else url_for('user_form'))
+        try:
+            if form_id:
+                # ownership and Aadhaar/PAN duplicates are checked inside the update's transaction
+                if not models.update_form_by_id(form_id, form_data, user_id=current_user.id):
+                    flash("Invalid form selected for editing.", "danger")
+                    return redirect(url_for('user_dashboard'))
+            else:
+                models.create_or_update_form(current_user.id, form_data)
+        except models.IdentifierConflict as e:
+            names = ' and '.join(IDENTIFIER_LABELS[c] for c in e.columns)
+            flash(f"This {names} is already registered to another applicant.", "danger")
+            return redirect(url_for('user_form', form_id=form_id) if form_id else url_for('user_form'))
 
         flash("Form submitted successfully", "success")
         return redirect(url_for('user_dashboard'))
@@ -178,6 +286,32 @@ def user_form(form_id=None):
     return render_template(template, form=form)
 
 
+IDENTIFIER_LABELS = {'aadhar_number': 'Aadhaar number', 'pan_number': 'PAN'}
+
+
+@app.route('/api/forms/check-identifiers', methods=['POST'])
+@login_required
+def api_check_identifiers():
+    """
+    Whether an Aadhaar and/or PAN number is already on another applicant's
+    form, for inline validation while the form is filled in. JSON or form
+    body: {"aadhar_number": "...", "pan_number": "..."}. POST so the numbers
+    stay out of URLs and access logs; rate limited per user.
+    """
+    wait = app.extensions['rate_limits']['identifier'].hit(str(current_user.id))
+    if wait:
+        return jsonify({"error": "Too many checks", "retry_after": int(wait) + 1}), 429
+    data = request.get_json(silent=True) or request.form
+    given = [c for c in IDENTIFIER_LABELS if data.get(c)]
+    if not given:
+        return jsonify({"error": "Give aadhar_number and/or pan_number"}), 400
+    errors = [identifiers.format_error(c, data.get(c)) for c in given]
+    if any(errors):
+        return jsonify({"error": '; '.join(e for e in errors if e)}), 400
+    conflicts = models.identifier_conflicts({c: data.get(c) for c in given}, user_id=current_user.id)
+    return jsonify({c: {"duplicate": c in conflicts} for c in given})
+
+
 @app.route('/form/<int:form_id>/delete', methods=['POST', 'GET'])
 @login_required
 def delete_form(form_id):
@@ -249,11 +383,11 @@ def user_tickets():
 @app.route('/tickets/<int:ticket_id>')
 @login_required
 def view_ticket(ticket_id):
-    ticket = models.get_ticket_by_id(ticket_id)
+    ticket = models.get_ticket_by_id(ticket_id, include_archived=True)
     if not ticket:
         abort(404)
 
-    if current_user.role != 'admin' and int(ticket['user_id']) != int(current_user.id):
+    if int(ticket['user_id']) != int(current_user.id) and not is_admin():
         flash("You don't have permission to view this ticket.", "danger")
         return redirect(url_for('user_dashboard'))
 
@@ -267,79 +401,109 @@ def view_ticket(ticket_id):
 @admin_required
 def admin_dashboard():
     stats = models.get_stats()
-    # Get latest 10 forms to show in "Recent Forms" (sorted by created_at desc if available)
-    try:
-        all_forms = models.get_all_forms()
-        # Sort safely by created_at if present, otherwise keep original order
-        sorted_forms = sorted(all_forms, key=lambda x: x.get('created_at', datetime.min), reverse=True)
-    except Exception:
-        sorted_forms = models.get_all_forms() or []
+    forms = models.get_recent_forms(limit=10)
+    return render_template('admin/dashboard.html', stats=stats, forms=forms)
 
-    # Build a lightweight preview for the dashboard table (avoid heavy nested data)
-    forms_preview = []
-    for f in sorted_forms[:10]:
-        user_row = None
-        try:
-            user_row = models.get_user_by_id(f.get('user_id'))
-        except Exception:
-            user_row = None
-        forms_preview.append({
-            'id': f.get('id'),
-            'email': user_row.get('email') if user_row else f.get('email') or '',
-            'status': f.get('status', 'unknown')
-        })
 
-    return render_template('admin/dashboard.html', stats=stats, forms=forms_preview)
+FORM_STATUSES = ['pending', 'in_review', 'completed', 'rejected']
+TICKET_STATUSES = ['open', 'in_progress', 'resolved']
+USER_ROLES = ['admin', 'user']
+
+
+def page_args(allowed):
+    """
+    Read the shared listing query args: ?status=&cursor=&limit=
+    Unknown statuses are ignored; limit is clamped to ADMIN_MAX_PAGE_SIZE.
+    """
+    status = request.args.get('status')
+    if status not in allowed:
+        status = None
+    limit = request.args.get('limit', app.config['ADMIN_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['ADMIN_MAX_PAGE_SIZE']))
+    return status, request.args.get('cursor'), limit
+
+
+def archived_arg():
+    """?archived=1 switches the forms/tickets listings to the archive tables (exports add them)."""
+    return request.args.get('archived') == '1'
 
 
 @app.route('/admin/users')
 @admin_required
 def admin_users():
-    users = models.get_all_users()
-    return render_template('admin/users.html', users=users)
+    role, cursor, limit = page_args(USER_ROLES)
+    users, next_cursor = models.get_users_page(role=role, cursor=cursor, limit=limit)
+    return render_template(
+        'admin/users.html',
+        users=users,
+        role=role,
+        counts=models.get_status_counts('users'),
+        next_cursor=next_cursor
+    )
 
 
 @app.route('/admin/forms')
 @admin_required
 def admin_forms():
-    forms = models.get_all_forms_admin()
-
-    open_forms = []
-    in_progress_forms = []
-    resolved_forms = []
-
-    for f in forms:
-        status = (f.get('status') or 'open').lower()
-
-        if status in ['open', 'pending']:
-            open_forms.append(f)
-        elif status in ['in_progress', 'processing']:
-            in_progress_forms.append(f)
-        else:
-            resolved_forms.append(f)
-
+    status, cursor, limit = page_args(FORM_STATUSES)
+    archived = archived_arg()
+    forms, next_cursor = models.get_forms_page(status=status, cursor=cursor, limit=limit, archived=archived)
     return render_template(
         'admin/forms.html',
-        open_forms=open_forms,
-        in_progress_forms=in_progress_forms,
-        resolved_forms=resolved_forms
+        forms=forms,
+        status=status,
+        statuses=FORM_STATUSES,
+        archived=archived,
+        counts=models.get_status_counts('user_forms', archived=archived),
+        next_cursor=next_cursor
     )
 
 
+@app.route('/admin/forms/import', methods=['POST'])
+@admin_required
+def admin_forms_import():
+    """
+    Bulk import a CSV/JSONL upload into user_forms; responds with the import report.
+    Very large files should go through `flask import-forms` instead (MAX_CONTENT_LENGTH).
+    """
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    fmt = request.form.get('format') or importer.detect_format(upload.filename)
+    batch_size = request.form.get('batch_size', app.config['IMPORT_BATCH_SIZE'], type=int)
+    start_at = request.form.get('start_at', 0, type=int)
+    try:
+        report = importer.import_forms(
+            importer.open_text(upload.stream), fmt=fmt, batch_size=max(1, batch_size), start_at=max(0, start_at)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(report), (200 if not report['error'] else 500)
+
 
 @app.route('/admin/forms/<int:form_id>/update', methods=['POST'])
 @admin_required
 def admin_form_update(form_id):
     data = request.form.to_dict()
 
-    status = data.pop('status', None)
     admin_remark = data.pop('admin_remark', None)
+    malformed = identifiers.malformed(data)
+    if malformed:
+        names = ' and '.join(IDENTIFIER_LABELS[c] for c in malformed)
+        flash(f"Please enter a valid {names}.", "danger")
+        return redirect(url_for('admin_form_detail', form_id=form_id))
 
-    # update full form
-    models.update_form_by_id(form_id, data)
-
-    # update admin-only fields
-    models.update_form_status(form_id, status, admin_remark)
+    # full form and admin-only fields in one statement
+    try:
+        updated = models.update_form_by_id(form_id, data, admin_remark=admin_remark)
+    except models.IdentifierConflict as e:
+        names = ' and '.join(IDENTIFIER_LABELS[c] for c in e.columns)
+        flash(f"This {names} is already registered to another applicant.", "danger")
+        return redirect(url_for('admin_form_detail', form_id=form_id))
+    if not updated:
+        flash("This form no longer exists or has been archived; it cannot be edited.", "danger")
+        return redirect(url_for('admin_form_detail', form_id=form_id))
 
     flash("Form updated successfully", "success")
     return redirect(url_for('admin_form_detail', form_id=form_id))
@@ -349,7 +513,7 @@ def admin_form_update(form_id):
 @app.route('/admin/forms/<int:form_id>')
 @admin_required
 def admin_form_detail(form_id):
-    form = models.get_form_by_id(form_id)
+    form = models.get_form_by_id(form_id, include_archived=True)
     if not form:
         abort(404)
 
@@ -364,6 +528,7 @@ def admin_form_detail(form_id):
 
 @app.route('/admin/tickets', methods=['GET', 'POST'])
 @admin_required
+@conditional.etag_from(lambda: models.table_version('tickets'))
 def admin_tickets():
     if request.method == 'POST':
         models.update_ticket_status(
@@ -372,73 +537,420 @@ def admin_tickets():
             request.form.get('admin_response')
         )
         flash("Ticket updated", "success")
-        return redirect(url_for('admin_tickets'))
+        return redirect(url_for('admin_tickets', **request.args))
+
+    status, cursor, limit = page_args(TICKET_STATUSES)
+    archived = archived_arg()
+    tickets, next_cursor = models.get_tickets_page(status=status, cursor=cursor, limit=limit, archived=archived)
+    return render_template(
+        'admin/tickets.html',
+        tickets=tickets,
+        status=status,
+        archived=archived,
+        counts=models.get_status_counts('tickets', archived=archived),
+        next_cursor=next_cursor
+    )
+
+
+@app.route('/admin/batch/<kind>', methods=['POST'])
+@admin_required
+def admin_batch(kind):
+    """
+    Apply one status and/or note to many forms or tickets. JSON body:
+    {"ids": [1, 2]} or {"filter": {"status": "pending", "state": "Goa", "older_than_days": 30}},
+    plus "status" and/or "note" (admin remark for forms, admin response for tickets).
+    Streams NDJSON progress: one line per committed chunk, the last with "done": true.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        progress = batch.apply(
+            kind,
+            status=payload.get('status') or None,
+            note=payload.get('note'),
+            ids=payload.get('ids'),
+            filters=payload.get('filter'),
+            chunk_size=app.config['BATCH_CHUNK_SIZE']
+        )
+    except batch.BatchError as e:
+        return jsonify({"error": str(e)}), 400
+
+    body = (json.dumps(report) + "\n" for report in progress)
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+
+@app.route('/admin/search')
+@admin_required
+def admin_search():
+    q = request.args.get('q', '').strip()
+    target = request.args.get('type', 'forms')
+    if target not in search.TARGETS:
+        target = 'forms'
+    page = request.args.get('page', 1, type=int)
+    results, has_more = search.search(target, q, page=page) if q else ([], False)
+    return render_template(
+        'admin/search.html',
+        q=q,
+        target=target,
+        page=max(1, min(page, search.MAX_PAGE)),
+        results=results,
+        has_more=has_more
+    )
+
+
+@app.route('/admin/export/<kind>')
+@admin_required
+def admin_export(kind):
+    """
+    Stream forms or tickets as CSV/JSONL.
+    Query args: format=csv|jsonl, status=, from=YYYY-MM-DD, to=YYYY-MM-DD (exclusive),
+    archived=1 to include archived rows (live rows only otherwise; X-Export-Scope
+    says which), gzip=1 to download a .gz file. Without gzip=1 the body is still
+    gzip-encoded on the wire when the client accepts it.
+    """
+    fmt = request.args.get('format', 'csv')
+    try:
+        date_from = request.args.get('from', type=lambda v: datetime.strptime(v, '%Y-%m-%d'))
+        date_to = request.args.get('to', type=lambda v: datetime.strptime(v, '%Y-%m-%d'))
+    except ValueError:
+        abort(400)
+    as_file = request.args.get('gzip') == '1'
+    on_wire = not as_file and 'gzip' in request.headers.get('Accept-Encoding', '')
+    include_archived = archived_arg()
 
-    tickets = models.get_all_tickets()
-    return render_template('admin/tickets.html', tickets=tickets)
+    try:
+        body = exporter.export(
+            kind, fmt=fmt, status=request.args.get('status') or None,
+            date_from=date_from, date_to=date_to, compress=as_file or on_wire,
+            include_archived=include_archived
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    scope = 'live+archived' if include_archived else 'live'
+    filename = f"{kind}-{scope.replace('+', '-')}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}" + (".gz" if as_file else "")
+    mimetype = 'application/gzip' if as_file else ('text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Export-Scope'] = scope
+    response.headers['X-Accel-Buffering'] = 'no'
+    if on_wire:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 
 # ==========================
 # API & FILES
 # ==========================
-from collections import defaultdict
+STATS_VERSION_TABLES = ('users', 'user_forms', 'tickets')
+
+
+def stats_version(versions=None):
+    """Validator for the stats: data versions plus the minute, since the window moves with time."""
+    if versions is None:
+        versions = [models.table_version(table) for table in STATS_VERSION_TABLES]
+    return '/'.join(list(versions) + [datetime.now().strftime('%Y%m%d%H%M')])
+
 
 @app.route('/api/admin/stats')
 @admin_required
+@conditional.etag_from(stats_version)
 def api_admin_stats():
-    days = request.args.get('days', 7, type=int)
-    since_date = datetime.now() - timedelta(days=days)
+    return jsonify(dashboard_snapshot(request.args.get('days', 7, type=int)))
 
-    stats = models.get_stats(time_from=since_date)
 
-    forms = models.get_all_forms(time_from=since_date)
-    tickets = models.get_all_tickets(time_from=since_date)
+def dashboard_snapshot(days):
+    since_date = datetime.now() - timedelta(days=days)
+    return dashboard_payload(
+        models.get_stats(time_from=since_date),
+        models.get_daily_counts('user_forms', since_date, days),
+        models.get_daily_counts('tickets', since_date, days)
+    )
 
-    daily_forms_dict = defaultdict(int)
-    daily_tickets_dict = defaultdict(int)
 
-    for f in forms:
-        created = f.get('created_at')
-        if isinstance(created, datetime):
-            date_str = created.strftime('%Y-%m-%d')
-        else:
-            # if stored as string, attempt a parse; fallback to today
-            try:
-                date_str = datetime.strptime(created, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
-            except Exception:
-                date_str = datetime.now().strftime('%Y-%m-%d')
-        daily_forms_dict[date_str] += 1
-
-    for t in tickets:
-        created = t.get('created_at')
-        if isinstance(created, datetime):
-            date_str = created.strftime('%Y-%m-%d')
-        else:
-            try:
-                date_str = datetime.strptime(created, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
-            except Exception:
-                date_str = datetime.now().strftime('%Y-%m-%d')
-        daily_tickets_dict[date_str] += 1
-
-    daily_forms = []
-    daily_tickets = []
-    for i in range(days):
-        day = (since_date + timedelta(days=i)).strftime('%Y-%m-%d')
-        daily_forms.append({'date': day, 'count': daily_forms_dict.get(day, 0)})
-        daily_tickets.append({'date': day, 'count': daily_tickets_dict.get(day, 0)})
-
-    return jsonify({
+def dashboard_payload(stats, daily_forms, daily_tickets):
+    """The /api/admin/stats body; shared with the async view in asgi.py."""
+    return {
         "users": stats.get("users", 0),
         "forms": stats.get("forms", []),
         "tickets": stats.get("tickets", []),
         "dailyForms": daily_forms,
         "dailyTickets": daily_tickets
+    }
+
+
+@app.route('/api/admin/stream')
+@admin_required
+def api_admin_stream():
+    """
+    Server-Sent Events for the live dashboard: one `snapshot` (same shape as
+    /api/admin/stats), then a `delta` per committed status change.
+    The snapshot is built here rather than inside the generator, so the
+    request's pooled DB connection is released before streaming starts; the
+    subscription comes first, so changes committed meanwhile still arrive.
+    """
+    broker = app.extensions['events']
+    q = broker.subscribe()
+    try:
+        snapshot = dashboard_snapshot(request.args.get('days', 7, type=int))
+    except Exception:
+        broker.unsubscribe(q)
+        raise
+    return Response(
+        events.stream(broker, q, snapshot),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/admin/demographics')
+@admin_required
+def api_admin_demographics():
+    """
+    Cross-tab form counts served from the rollup tables.
+    ?group=state,gender  dimensions to group by (see rollups.DIMENSIONS)
+    ?days=30 or ?from=YYYY-MM-DD&to=YYYY-MM-DD (exclusive)
+    any other dimension name as an exact-match filter, e.g. ?gender=female
+    """
+    group_by = [d for d in request.args.get('group', '').split(',') if d]
+    filters = {k: v for k, v in request.args.items() if k in rollups.DIMENSIONS}
+    date_from, date_to = date_range_args()
+
+    try:
+        cube, rows = rollups.query(group_by, filters=filters, date_from=date_from, date_to=date_to)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"cube": cube, "group": group_by, "filters": filters, "rows": rows})
+
+
+def date_range_args():
+    """(date_from, date_to) from ?days=N or ?from=YYYY-MM-DD&to=YYYY-MM-DD (exclusive); 400 if malformed."""
+    try:
+        date_from = request.args.get('from', type=lambda v: datetime.strptime(v, '%Y-%m-%d').date())
+        date_to = request.args.get('to', type=lambda v: datetime.strptime(v, '%Y-%m-%d').date())
+    except ValueError:
+        abort(400)
+    days = request.args.get('days', type=int)
+    if days and not date_from:
+        date_from = (datetime.now() - timedelta(days=days)).date()
+    return date_from, date_to
+
+
+@app.route('/api/admin/analytics/<op>')
+@admin_required
+@conditional.etag_from(lambda op: snapshots.generation())
+def api_admin_analytics(op):
+    """
+    Demographic analysis over the columnar form snapshot (`flask snapshot-forms`).
+    /histogram?column=age&bins=0,18,25,35,60,120 (edges, or a number of bins)
+    /crosstab?rows=state&cols=qualification (cols optional)
+    /percentiles?column=age&q=25,50,75&by=state (by optional)
+    ?days=30 or ?from=YYYY-MM-DD&to=YYYY-MM-DD on created_at, and any of
+    snapshots.DICTIONARY_COLUMNS as an exact-match filter, e.g. ?gender=female
+    """
+    if op not in ('histogram', 'crosstab', 'percentiles'):
+        abort(404)
+    snapshot = snapshots.get()
+    if snapshot is None:
+        return jsonify({"error": "No analytics snapshot available; run `flask snapshot-forms`"}), 503
+
+    filters = {k: v for k, v in request.args.items() if k in snapshots.DICTIONARY_COLUMNS}
+    date_from, date_to = date_range_args()
+    args = request.args
+    try:
+        mask = analytics.select(snapshot, filters, date_from=date_from, date_to=date_to)
+        if op == 'histogram':
+            bins = args.get('bins', '10')
+            bins = [float(b) for b in bins.split(',')] if ',' in bins else int(bins)
+            result = analytics.histogram(snapshot, args.get('column', 'age'), bins, mask)
+        elif op == 'crosstab':
+            result = analytics.crosstab(snapshot, args.get('rows', 'state'), args.get('cols') or None, mask)
+        else:
+            qs = [float(q) for q in args.get('q', '25,50,75').split(',')]
+            result = analytics.percentiles(snapshot, args.get('column', 'age'), qs, mask, by=args.get('by') or None)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"snapshot": snapshot.describe(), "filters": filters, "result": result})
+
+
+@app.route('/admin/metrics')
+@admin_required
+def admin_metrics():
+    return render_template(
+        'admin/metrics.html',
+        endpoints=app.extensions['endpoint_stats'].summary(),
+        db_pool=app.extensions['db_pool'].status(),
+        replicas=app.extensions['db_replicas'].status() if app.extensions['db_replicas'] else [],
+        caches={
+            'stats': app.extensions['stats_cache'].stats(),
+            'users': app.extensions['user_cache'].stats(),
+            'fragments': app.extensions['fragment_cache'].stats()
+        }
+    )
+
+
+@app.route('/api/admin/metrics')
+@admin_required
+def api_admin_metrics():
+    return jsonify({
+        "db_pool": app.extensions['db_pool'].status(),
+        "replicas": app.extensions['db_replicas'].status() if app.extensions['db_replicas'] else [],
+        "stats_cache": app.extensions['stats_cache'].stats(),
+        "user_cache": app.extensions['user_cache'].stats(),
+        "fragment_cache": app.extensions['fragment_cache'].stats(),
+        "endpoints": app.extensions['endpoint_stats'].summary()
     })
 
 
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    """
+    Serve profile photos. Content-hash names (see images.py) never change, so
+    they are cacheable for a year as `immutable`; legacy names get a short
+    max-age and revalidate through ETag/If-None-Match. Range requests are
+    handled by send_file. With UPLOADS_ACCEL_REDIRECT (nginx) or
+    USE_X_SENDFILE (Apache/lighttpd) the proxy transfers the file instead.
+    """
+    # never expose in-flight originals (.pending/) or other dot-paths
+    if any(part.startswith('.') for part in filename.split('/')):
+        abort(404)
+    images.ensure_processed(filename, app.config)
+
+    content_hash = images.content_hash(filename)
+    if content_hash:
+        cache_control = f"public, max-age={app.config['UPLOADS_IMMUTABLE_MAX_AGE']}, immutable"
+    else:
+        cache_control = f"public, max-age={app.config['UPLOADS_MAX_AGE']}"
+
+    accel_prefix = app.config['UPLOADS_ACCEL_REDIRECT']
+    if accel_prefix:
+        if not os.path.isfile(os.path.join(app.config['UPLOAD_FOLDER'], filename)):
+            abort(404)
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + filename
+    else:
+        response = send_from_directory(
+            app.config['UPLOAD_FOLDER'], filename,
+            etag=filename if content_hash else True
+        )
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+# ==========================
+# CLI
+# ==========================
+@app.cli.command('import-forms')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help="Defaults to the file extension.")
+@click.option('--batch-size', type=int, default=None, help="Rows per INSERT batch/transaction.")
+@click.option('--start-at', type=int, default=0, help="Skip this many data rows (resume_offset of a previous run).")
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False), help="Write rejected rows here as JSONL.")
+def import_forms_command(path, fmt, batch_size, start_at, rejects_path):
+    """Bulk import demographic form records from a CSV or JSONL file."""
+    rejects_file = open(rejects_path, 'a', encoding='utf-8') if rejects_path else None
+
+    def on_reject(offset, row, error):
+        if rejects_file:
+            rejects_file.write(json.dumps({'offset': offset, 'error': error, 'row': row}, default=str) + "\n")
+
+    def on_progress(report):
+        click.echo(f"  {report['resume_offset']} rows read, {report['inserted']} inserted, "
+                   f"{report['rejected']} rejected", err=True)
+
+    try:
+        with open(path, encoding='utf-8-sig', newline='') as stream:
+            report = importer.import_forms(
+                stream,
+                fmt=fmt or importer.detect_format(path),
+                batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+                start_at=start_at,
+                on_reject=on_reject,
+                on_progress=on_progress
+            )
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    report.pop('rejects')
+    click.echo(json.dumps(report, indent=2))
+    if report['error']:
+        raise SystemExit(1)
+
+
+@app.cli.command('refresh-rollups')
+@click.option('--full', is_flag=True, help="Rebuild every day instead of only those changed since the watermark.")
+def refresh_rollups_command(full):
+    """Refresh the demographic rollup tables (run from cron)."""
+    result = rollups.refresh(full=full)
+    click.echo(f"Rebuilt {result['days']} day(s); watermark {result['watermark']}")
+
+
+@app.cli.command('backfill-identifiers')
+@click.option('--batch-size', type=int, default=1000, help="Forms per transaction.")
+@click.option('--start-id', type=int, default=0, help="Resume after this form id (last_id of a previous run).")
+@click.option('--table', type=click.Choice(['user_forms', 'user_forms_archive']), default='user_forms',
+              help="Run once per table after changing keys.")
+def backfill_identifiers_command(batch_size, start_id, table):
+    """Fill Aadhaar/PAN blind indexes (and apply encryption settings) for existing forms."""
+    def on_progress(report):
+        click.echo(f"  up to id {report['last_id']}: {report['scanned']} scanned, "
+                   f"{report['updated']} updated", err=True)
+
+    report = models.backfill_form_identifiers(
+        batch_size=batch_size, start_id=start_id, on_progress=on_progress, table=table
+    )
+    click.echo(json.dumps(report, indent=2))
+
+
+@app.cli.command('archive')
+@click.option('--days', type=int, default=None, help="Closed and untouched for this many days (ARCHIVE_AFTER_DAYS).")
+@click.option('--batch-size', type=int, default=None, help="Rows moved per transaction (ARCHIVE_BATCH_SIZE).")
+@click.option('--max-batches', type=int, default=None, help="Stop each table after this many batches.")
+def archive_command(days, batch_size, max_batches):
+    """Move closed forms and tickets into the partitioned archive tables (run from cron)."""
+    def on_progress(report):
+        click.echo(f"  {report['table']}: {report['moved']} moved in {report['batches']} batch(es)", err=True)
+
+    result = archive.run(days=days, batch_size=batch_size, max_batches=max_batches, on_progress=on_progress)
+    click.echo(json.dumps(result, indent=2, default=str))
+
+
+@app.cli.command('archive-partitions')
+@click.option('--months-ahead', type=int, default=None, help="Defaults to ARCHIVE_PARTITIONS_AHEAD.")
+def archive_partitions_command(months_ahead):
+    """Create the upcoming monthly partitions of the archive tables."""
+    if months_ahead is None:
+        months_ahead = app.config['ARCHIVE_PARTITIONS_AHEAD']
+    for table, names in archive.ensure_partitions(months_ahead).items():
+        click.echo(f"{table}: {', '.join(names) if names else 'up to date'}")
+
+
+@app.cli.command('snapshot-forms')
+@click.option('--full', is_flag=True, help="Re-export every form (including archived ones) instead of only changed ones.")
+def snapshot_forms_command(full):
+    """Write a new columnar analytics snapshot of user_forms (run from cron)."""
+    def on_progress(count):
+        click.echo(f"  {count} forms read", err=True)
+
+    result = snapshots.build(
+        app.config['SNAPSHOT_DIR'], full=full, keep=app.config['SNAPSHOT_KEEP'], on_progress=on_progress
+    )
+    click.echo(json.dumps(result, indent=2))
+
+
+@app.cli.command('set-role')
+@click.argument('email')
+@click.argument('role', type=click.Choice(['user', 'admin']))
+def set_role_command(email, role):
+    """Change a user's role. Admin access follows at once; page contents once cached copies expire."""
+    user = models.get_user_by_email(email.lower())
+    if not user:
+        raise click.ClickException(f"No user with email {email}")
+    models.update_user_role(user['id'], role)
+    click.echo(f"{email}: {user['role']} -> {role}")
 
 
 # ==========================
@@ -0,0 +1,200 @@
+"""
+Archival of closed forms and tickets (`flask archive`).
+
+Completed or rejected forms and resolved tickets that nobody has touched for
+ARCHIVE_AFTER_DAYS are moved from user_forms / tickets into
+user_forms_archive / tickets_archive (migrations/008). The hot tables then
+only hold live rows, so their indexes, and every listing, dashboard and
+duplicate check that reads them, stay the same size however much history
+piles up. The archives are range partitioned by month of created_at, so a
+date-bounded query only touches the partitions it needs.
+
+Rows move in batches of ARCHIVE_BATCH_SIZE, each its own short transaction:
+lock the next batch of candidates, copy them with INSERT ... SELECT, add them
+to archive_counts, delete them and commit, then pause ARCHIVE_PAUSE_SECONDS
+so replicas and concurrent writers keep up. Tickets go first; a form is only
+moved once none of its tickets are left in `tickets` (the foreign key would
+otherwise cascade the delete to them).
+
+Archived rows are read-only. models' read functions look in the archives
+only when asked (`include_archived=True`, `archived=True`); the stats, daily
+charts, rollups and Aadhaar/PAN duplicate checks keep counting them. Exports
+include them with ?archived=1; search and batch actions cover the hot tables
+only.
+
+Archived rows keep their ids. Before MySQL 8.0 AUTO_INCREMENT restarts at
+MAX(id) + 1, so an id could only be handed out twice if the newest row of a
+table were archived, which a live system with ARCHIVE_AFTER_DAYS in weeks
+never does.
+"""
+import calendar
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+import models
+
+# table -> (archive table, columns copied, closed statuses, extra candidate condition).
+# Order matters: tickets are archived before the forms they belong to.
+TABLES = {
+    'tickets': ('tickets_archive', models.TICKET_ROW_COLUMNS, ('resolved',), ""),
+    'user_forms': (
+        'user_forms_archive', models.FORM_ROW_COLUMNS, ('completed', 'rejected'),
+        "AND NOT EXISTS (SELECT 1 FROM tickets t WHERE t.form_id = src.id)",
+    ),
+}
+
+COUNTS_SQL = """
+    INSERT INTO archive_counts (kind, day, status, count)
+    SELECT %s, DATE(created_at), status, COUNT(*)
+    FROM {table}
+    WHERE id IN ({ids})
+    GROUP BY DATE(created_at), status
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+
+PARTITIONS_SQL = """
+    SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+
+def _candidates_query(table, cutoff, position, limit):
+    """
+    (sql, params) locking the next `limit` archivable rows of `table` after
+    `position` ((updated_at, id) of the previous batch's last row), walking
+    idx_*_updated_at so rows that stay behind are never scanned twice.
+    """
+    _, _, statuses, extra = TABLES[table]
+    where = [f"src.status IN ({', '.join(['%s'] * len(statuses))})", "src.updated_at < %s"]
+    params = list(statuses) + [cutoff]
+    if position:
+        where.append("(src.updated_at > %s OR (src.updated_at = %s AND src.id > %s))")
+        params.extend([position[0], position[0], position[1]])
+    sql = f"""
+        SELECT src.id, src.updated_at
+        FROM {table} src
+        WHERE {' AND '.join(where)} {extra}
+        ORDER BY src.updated_at, src.id
+        LIMIT %s
+        FOR UPDATE
+    """
+    params.append(limit)
+    return sql, params
+
+
+def archive_table(table, cutoff, batch_size, pause=0.0, max_batches=None, on_progress=None):
+    """
+    Move closed rows of `table` last updated before `cutoff` into its archive.
+    Returns {'table', 'moved', 'batches'}.
+    """
+    archive, columns, _, _ = TABLES[table]
+    select = ', '.join(columns)
+    report = {'table': table, 'moved': 0, 'batches': 0}
+    position = None
+    db = models.get_db()
+    cur = db.cursor()
+    try:
+        db.rollback()  # SET TRANSACTION only applies between transactions
+        while max_batches is None or report['batches'] < max_batches:
+            # for the next transaction only: candidates that fail the filter
+            # are unlocked as soon as they are read instead of at commit
+            cur.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cur.execute(*_candidates_query(table, cutoff, position, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                db.rollback()
+                break
+            ids = tuple(row['id'] for row in rows)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cur.execute(
+                f"INSERT INTO {archive} ({select}) SELECT {select} FROM {table} WHERE id IN ({placeholders})", ids
+            )
+            cur.execute(COUNTS_SQL.format(table=table, ids=placeholders), (models.ARCHIVE_KINDS[table],) + ids)
+            cur.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+            db.commit()
+
+            report['moved'] += len(ids)
+            report['batches'] += 1
+            position = (rows[-1]['updated_at'], rows[-1]['id'])
+            if on_progress:
+                on_progress(report)
+            if pause:
+                time.sleep(pause)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
+    return report
+
+
+def _month_start(moment, months=0):
+    month = moment.month - 1 + months
+    return datetime(moment.year + month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(months_ahead):
+    """
+    Split each archive's pmax partition so there is one partition per month
+    up to `months_ahead` months after the current one. pmax is normally
+    empty, so this is a metadata change. Returns {archive: [new partitions]}.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    until = _month_start(now, months_ahead + 1)
+    added = {}
+    db = models.get_db()
+    cur = db.cursor()
+    try:
+        for archive, _, _, _ in TABLES.values():
+            cur.execute(PARTITIONS_SQL, (archive,))
+            bounds = [int(row['bound']) for row in cur.fetchall() if row['bound'] not in (None, 'MAXVALUE')]
+            if not bounds:
+                raise RuntimeError(f"{archive} is not partitioned; apply migrations/008_archive_tables.sql")
+            month = datetime.fromtimestamp(max(bounds), timezone.utc).replace(tzinfo=None)
+            parts = []
+            while month < until:
+                following = _month_start(month, 1)
+                parts.append((f"p{month:%Y%m}", calendar.timegm(following.timetuple())))
+                month = following
+            if parts:
+                ranges = ', '.join(f"PARTITION {name} VALUES LESS THAN ({bound})" for name, bound in parts)
+                cur.execute(
+                    f"ALTER TABLE {archive} REORGANIZE PARTITION pmax INTO "
+                    f"({ranges}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+                )
+            added[archive] = [name for name, _ in parts]
+    finally:
+        cur.close()
+        db.close()
+    return added
+
+
+def run(days=None, batch_size=None, max_batches=None, on_progress=None):
+    """
+    Create upcoming archive partitions, then archive tickets and forms closed
+    and untouched for `days` (ARCHIVE_AFTER_DAYS). `max_batches` caps each
+    table's run, for bounded cron slots; the next run carries on.
+    Returns {'cutoff', 'partitions', 'tables': [archive_table() reports]}.
+    """
+    config = current_app.config
+    days = config['ARCHIVE_AFTER_DAYS'] if days is None else days
+    batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.now() - timedelta(days=days)
+
+    partitions = ensure_partitions(config['ARCHIVE_PARTITIONS_AHEAD'])
+    reports = []
+    try:
+        for table in TABLES:
+            reports.append(archive_table(
+                table, cutoff, batch_size,
+                pause=config['ARCHIVE_PAUSE_SECONDS'], max_batches=max_batches, on_progress=on_progress
+            ))
+    finally:
+        # totals are unchanged (archive_counts), but versions and listings are not
+        models.invalidate_stats()
+    return {'cutoff': cutoff, 'partitions': partitions, 'tables': reports}
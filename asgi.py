@@ -0,0 +1,272 @@
+"""
+Optional ASGI entry point:
+
+    uvicorn asgi:application --workers 4
+
+The read-heavy pages (user dashboard, ticket views, admin dashboard, admin
+ticket list and /api/admin/stats) are served by coroutines on aiomysql
+(async_models.py), so a worker waiting on MySQL keeps serving other requests
+instead of parking a thread. Every other request, including all POSTs, is
+handed to the unchanged Flask app through asgiref's WsgiToAsgi adapter.
+
+Routing, templates, sessions and flashes are still Flask's: the URL is matched
+against app.url_map, the view runs inside a Flask request context, and the
+response goes through app.process_response(), so the session cookie is saved
+exactly as in WSGI mode. Conditional GETs are answered here too, from async
+validators (ETAGS), since the sync ones in app.py would block the loop. Requests without a logged-in session user (e.g. only
+a remember-me cookie) are also handed to Flask, which handles them as before.
+
+Without aiomysql installed, `application` is just the WSGI adapter.
+"""
+import asyncio
+import io
+import logging
+import sys
+from datetime import datetime, timedelta
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import abort, flash, g, jsonify, redirect, render_template, request, session, url_for
+from werkzeug.exceptions import HTTPException, MethodNotAllowed, NotFound
+
+import app as web
+import conditional
+from cache import TTLCache
+
+try:
+    import async_models
+except ImportError:  # aiomysql not installed
+    async_models = None
+
+flask_app = web.app
+wsgi_application = WsgiToAsgi(flask_app)
+logger = logging.getLogger('demograph.asgi')
+
+
+# ==========================
+# ASYNC VIEWS (keyed by Flask endpoint)
+# ==========================
+async def _render_cached(template, **context):
+    """
+    render_template() for templates with {% cache %} fragments. The tag reads
+    the fragment cache and table_version() synchronously: fine on the loop
+    with in-process caches (the version was just prewarmed), but with Redis
+    that is network I/O and with the null cache a MySQL query, so those
+    render in a thread (to_thread copies the context, request context included).
+    """
+    caches = (flask_app.extensions['fragment_cache'], flask_app.extensions['stats_cache'])
+    if all(isinstance(cache, TTLCache) for cache in caches):
+        return render_template(template, **context)
+    return await asyncio.to_thread(render_template, template, **context)
+
+
+async def user_dashboard(user):
+    forms = await async_models.get_all_forms_by_user(user.id, include_archived=True)
+    tickets = await async_models.get_tickets_by_user(user.id, include_archived=True)
+    return render_template('user/dashboard.html', user=user, forms=forms, tickets=tickets)
+
+
+async def view_ticket(user, ticket_id):
+    ticket = await async_models.get_ticket_by_id(ticket_id, include_archived=True)
+    if not ticket:
+        abort(404)
+
+    if int(ticket['user_id']) != int(user.id) and await async_models.get_user_role(user.id) != 'admin':
+        flash("You don't have permission to view this ticket.", "danger")
+        return redirect(url_for('user_dashboard'))
+
+    return render_template('user/view_ticket.html', ticket=ticket)
+
+
+async def admin_dashboard(user):
+    stats = await async_models.get_stats()
+    forms = await async_models.get_recent_forms(limit=10)
+    await async_models.table_version('user_forms')  # cached, so {% cache %} in the template does not block
+    return await _render_cached('admin/dashboard.html', stats=stats, forms=forms)
+
+
+async def admin_tickets(user):
+    status, cursor, limit = web.page_args(web.TICKET_STATUSES)
+    archived = web.archived_arg()
+    tickets, next_cursor = await async_models.get_tickets_page(
+        status=status, cursor=cursor, limit=limit, archived=archived
+    )
+    await async_models.table_version('tickets')  # cached, so {% cache %} in the template does not block
+    return await _render_cached(
+        'admin/tickets.html',
+        tickets=tickets,
+        status=status,
+        archived=archived,
+        counts=await async_models.get_status_counts('tickets', archived=archived),
+        next_cursor=next_cursor
+    )
+
+
+async def api_admin_stats(user):
+    days = request.args.get('days', 7, type=int)
+    since_date = datetime.now() - timedelta(days=days)
+    return jsonify(web.dashboard_payload(
+        await async_models.get_stats(time_from=since_date),
+        await async_models.get_daily_counts('user_forms', since_date, days),
+        await async_models.get_daily_counts('tickets', since_date, days)
+    ))
+
+
+VIEWS = {
+    'user_dashboard': (user_dashboard, False),
+    'view_ticket': (view_ticket, False),
+    'admin_dashboard': (admin_dashboard, True),
+    'admin_tickets': (admin_tickets, True),
+    'api_admin_stats': (api_admin_stats, True),
+}
+
+
+# ==========================
+# ETAG VALIDATORS (same values as the @etag_from validators in app.py)
+# ==========================
+async def stats_version(user):
+    return web.stats_version([await async_models.table_version(t) for t in web.STATS_VERSION_TABLES])
+
+
+ETAGS = {
+    'user_dashboard': lambda user: async_models.user_version(user.id),
+    'admin_tickets': lambda user: async_models.table_version('tickets'),
+    'api_admin_stats': stats_version,
+}
+
+
+# ==========================
+# PLUMBING
+# ==========================
+def _environ(scope):
+    """Minimal WSGI environ for a body-less ASGI HTTP request."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _match(environ):
+    """(endpoint, view_args) when an async view serves this request, else None."""
+    if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+        return None
+    try:
+        endpoint, args = flask_app.url_map.bind_to_environ(environ).match()
+    except (NotFound, MethodNotAllowed):
+        return None
+    except HTTPException:  # redirects (e.g. strict slashes) are left to Flask
+        return None
+    if endpoint not in VIEWS:
+        return None
+    return endpoint, args
+
+
+async def _session_user():
+    """The logged-in user from the session, mirroring app.load_user() without blocking."""
+    user_id = session.get('_user_id')
+    if user_id is None:
+        return None
+    row = web.session_user(user_id)
+    if row is None:
+        row = await async_models.get_user_cached(user_id)
+        if not row:
+            return None
+        web.remember_user(row)
+    return web.user_from_row(row)
+
+
+async def _send(send, response, head_only):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in response.headers.items()],
+    })
+    await send({'type': 'http.response.body', 'body': b'' if head_only else response.get_data()})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await async_models.init_pool(flask_app)
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_models.close_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return await wsgi_application(scope, receive, send)
+
+    environ = _environ(scope)
+    matched = _match(environ)
+    if matched is None:
+        return await wsgi_application(scope, receive, send)
+    endpoint, args = matched
+    view, admin_only = VIEWS[endpoint]
+    environ[conditional.ASYNC_VIEW] = True  # the sync ETag hook would block the loop
+
+    await async_models.init_pool(flask_app)  # no-op once the lifespan startup has run
+    response = None
+    with flask_app.request_context(environ):
+        user = await _session_user()
+        if user is not None:
+            g._login_user = user  # Flask-Login's current_user for templates
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None and admin_only:
+                    # decorators.is_admin() without the blocking query
+                    g._is_admin = await async_models.get_user_role(user.id) == 'admin'
+                    if not g._is_admin:
+                        flash("Admin access required.", "danger")
+                        rv = redirect(url_for("user_dashboard"))
+                if rv is None and endpoint in ETAGS and conditional.cacheable():
+                    rv = conditional.check(await ETAGS[endpoint](user))  # 304 or None
+                if rv is None:
+                    rv = await view(user, **args)
+            except HTTPException as e:
+                rv = flask_app.handle_http_exception(e)
+            response = flask_app.process_response(flask_app.make_response(rv))
+
+    if response is None:
+        # not logged in, or only a remember-me cookie: let Flask-Login handle it
+        return await wsgi_application(scope, receive, send)
+    await _send(send, response, scope['method'] == 'HEAD')
+
+
+if async_models is None:
+    logger.warning("aiomysql is not installed; serving every request through WsgiToAsgi")
+    application = wsgi_application  # noqa: F811
@@ -0,0 +1,200 @@
+"""
+Async read path for asgi.py, on aiomysql.
+
+Only the read-heavy queries served by the ASGI routes live here (dashboards,
+ticket views, stats). The SQL text and result shaping are shared with
+models.py, so both serving modes return identical data; every write still
+goes through the sync models layer behind the WSGI fallback.
+
+Needs `aiomysql` (optional, see requirements.txt).
+"""
+import asyncio
+
+import aiomysql
+
+import models
+from cache import TTLCache, NullCache
+
+_pool = None
+_pool_lock = asyncio.Lock()
+_app = None
+
+
+# ==========================
+# POOL
+# ==========================
+async def init_pool(app):
+    """Create the aiomysql pool for `app` (idempotent)."""
+    global _pool, _app
+    async with _pool_lock:
+        if _pool is None:
+            config = app.config
+            _app = app
+            _pool = await aiomysql.create_pool(
+                host=config['MYSQL_HOST'],
+                port=config['MYSQL_PORT'],
+                user=config['MYSQL_USER'],
+                password=config['MYSQL_PASSWORD'],
+                db=config['MYSQL_DB'],
+                minsize=1,
+                maxsize=config['ASYNC_DB_POOL_SIZE'],
+                pool_recycle=config['DB_POOL_RECYCLE'],
+                autocommit=True,  # reads only; every statement sees the latest commit
+                cursorclass=aiomysql.DictCursor,
+            )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            await _pool.wait_closed()
+            _pool = None
+
+
+def pool_status():
+    if _pool is None:
+        return None
+    return {'size': _pool.size, 'free': _pool.freesize, 'max_size': _pool.maxsize}
+
+
+async def _fetchall(sql, params=None):
+    async with _pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchall()
+
+
+async def _fetchone(sql, params=None):
+    async with _pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchone()
+
+
+# The in-process cache never blocks; a Redis cache does network I/O, so it
+# runs in a thread rather than stalling the event loop.
+async def _cache_call(cache, method, *args):
+    if isinstance(cache, (TTLCache, NullCache)):
+        return getattr(cache, method)(*args)
+    return await asyncio.to_thread(getattr(cache, method), *args)
+
+
+# ==========================
+# USERS
+# ==========================
+async def get_user_cached(user_id):
+    """Async counterpart of models.get_user_cached()."""
+    cache = _app.extensions['user_cache']
+    key = str(user_id)
+    row = await _cache_call(cache, 'get', key)
+    if row is None:
+        full = await _fetchone(models.USER_BY_ID_SQL, (user_id,))
+        if not full:
+            return None
+        row = {field: full.get(field) for field in models.USER_SESSION_FIELDS}
+        await _cache_call(cache, 'set', key, row)
+    return row
+
+
+async def get_user_role(user_id):
+    """Async counterpart of models.get_user_role()."""
+    row = await _fetchone(models.USER_ROLE_SQL, (user_id,))
+    return row['role'] if row else None
+
+
+# ==========================
+# FORMS / TICKETS
+# ==========================
+async def get_all_forms_by_user(user_id, include_archived=False):
+    if include_archived:
+        rows = await _fetchall(models.FORMS_BY_USER_WITH_ARCHIVE_SQL, (user_id, user_id))
+    else:
+        rows = await _fetchall(models.FORMS_BY_USER_SQL, (user_id,))
+    return models.reveal_forms(rows)
+
+
+async def get_tickets_by_user(user_id, include_archived=False):
+    if include_archived:
+        return await _fetchall(models.TICKETS_BY_USER_WITH_ARCHIVE_SQL, (user_id, user_id))
+    return await _fetchall(models.TICKETS_BY_USER_SQL, (user_id,))
+
+
+async def get_ticket_by_id(ticket_id, include_archived=False):
+    ticket = await _fetchone(models.TICKET_BY_ID_SQL, (ticket_id,))
+    if ticket is None and include_archived:
+        ticket = await _fetchone(models.ARCHIVED_TICKET_BY_ID_SQL, (ticket_id,))
+    return ticket
+
+
+async def get_tickets_page(status=None, cursor=None, limit=50, archived=False):
+    where, params = models._status_filter("t", status)
+    query = models.ARCHIVED_TICKETS_PAGE_SQL if archived else models.TICKETS_PAGE_SQL
+    sql, params = models._keyset_query(query, "t", where, params, cursor, limit)
+    return models._keyset_result(await _fetchall(sql, params), limit)
+
+
+async def get_status_counts(table, archived=False):
+    if archived:
+        rows = await _fetchall(models.ARCHIVE_STATUS_COUNTS_SQL, (models.ARCHIVE_KINDS[table],))
+    else:
+        rows = await _fetchall(models._status_counts_sql(table))
+    return {row['status']: int(row['count']) for row in rows}
+
+
+# ==========================
+# ADMIN STATS
+# ==========================
+async def get_stats(time_from=None):
+    """Async counterpart of models.get_stats(); shares its cache entries."""
+    if time_from:
+        time_from = time_from.replace(second=0, microsecond=0)
+    cache = _app.extensions['stats_cache']
+    key = f"stats:{models._window_key(time_from)}"
+    cached = await _cache_call(cache, 'get', key)
+    if cached is not None:
+        return cached
+
+    stats = models._stats_from_rows(await _fetchall(*models._stats_query(time_from)))
+    await _cache_call(cache, 'set', key, stats)
+    return stats
+
+
+async def table_version(table):
+    """Async counterpart of models.table_version(); shares its cache entries."""
+    sql = models._table_version_sql(table)
+    cache = _app.extensions['stats_cache']
+    key = f"version:{table}"
+    version = await _cache_call(cache, 'get', key)
+    if version is None:
+        version = models._version_from_row(await _fetchone(sql))
+        await _cache_call(cache, 'set', key, version)
+    return version
+
+
+async def user_version(user_id):
+    """Async counterpart of models.user_version()."""
+    rows = await _fetchall(models.USER_VERSION_SQL, (user_id, user_id))
+    return '/'.join(models._version_from_row(row) for row in rows)
+
+
+async def get_recent_forms(limit=10):
+    return await _fetchall(models.RECENT_FORMS_SQL, (limit,))
+
+
+async def get_daily_counts(table, time_from, days):
+    """Async counterpart of models.get_daily_counts(); shares its cache entries."""
+    time_from = time_from.replace(second=0, microsecond=0)
+    sql, params = models._daily_counts_query(table, time_from)
+    cache = _app.extensions['stats_cache']
+    key = f"daily:{table}:{models._window_key(time_from)}:{days}"
+    cached = await _cache_call(cache, 'get', key)
+    if cached is not None:
+        return cached
+
+    rows = await _fetchall(sql, params)
+    series = models._daily_series(rows, time_from, days)
+    await _cache_call(cache, 'set', key, series)
+    return series
@@ -0,0 +1,172 @@
+"""
+Batch status changes for forms and tickets (POST /admin/batch/<kind>).
+
+A batch selects rows by explicit IDs or by a filter (status, state, age in
+days) and sets the same status and/or remark (forms) / response (tickets) on
+all of them. Rows are processed in id order, BATCH_CHUNK_SIZE per transaction:
+each chunk locks its rows, updates them with one statement and commits, so a
+batch over thousands of rows never holds locks for long, and a failure
+leaves the chunks before it applied. Stats caches are invalidated and the
+live dashboard notified once per batch, not once per row.
+"""
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import MySQLdb
+
+import models
+
+TARGETS = {
+    'forms': {
+        'table': 'user_forms',
+        'statuses': ('pending', 'in_review', 'completed', 'rejected'),
+        'note': 'admin_remark',
+        'filters': ('status', 'state', 'older_than_days'),
+    },
+    'tickets': {
+        'table': 'tickets',
+        'statuses': ('open', 'in_progress', 'resolved'),
+        'note': 'admin_response',
+        'filters': ('status', 'older_than_days'),
+    },
+}
+
+MAX_IDS = 10000
+
+
+class BatchError(ValueError):
+    """Raised for an invalid batch request."""
+
+
+def _where(ids, filters):
+    where, params = [], []
+    if ids:
+        where.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+        params.extend(ids)
+    for name, value in filters.items():
+        if name == 'older_than_days':
+            where.append("created_at < %s")
+            params.append(datetime.now() - timedelta(days=value))
+        else:
+            where.append(f"{name} = %s")
+            params.append(value)
+    return where, params
+
+
+def _clean_filters(spec, filters):
+    if not isinstance(filters, dict):
+        raise BatchError("filter must be an object")
+    unknown = set(filters) - set(spec['filters'])
+    if unknown:
+        raise BatchError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    cleaned = {k: v for k, v in filters.items() if v not in (None, '')}
+    if 'status' in cleaned and cleaned['status'] not in spec['statuses']:
+        raise BatchError(f"Unknown status filter: {cleaned['status']}")
+    if 'older_than_days' in cleaned:
+        try:
+            cleaned['older_than_days'] = int(cleaned['older_than_days'])
+        except (TypeError, ValueError):
+            raise BatchError("older_than_days must be a whole number")
+        if cleaned['older_than_days'] < 0:
+            raise BatchError("older_than_days must not be negative")
+    return cleaned
+
+
+def apply(kind, status=None, note=None, ids=None, filters=None, chunk_size=500):
+    """
+    Validate a batch and return a generator that runs it, yielding a progress
+    dict after every committed chunk and a final one with 'done': True:
+    {'kind', 'matched', 'updated', 'chunks', 'elapsed_seconds', 'error', 'done'}.
+    Either `ids` or at least one filter is required. Raises BatchError.
+    """
+    spec = TARGETS.get(kind)
+    if spec is None:
+        raise BatchError(f"Unknown batch target: {kind}")
+    if status is None and note is None:
+        raise BatchError("Nothing to change: give a status and/or a note")
+    if status is not None and status not in spec['statuses']:
+        raise BatchError(f"Unknown status: {status}")
+
+    try:
+        ids = sorted({int(i) for i in ids or ()})
+    except (TypeError, ValueError):
+        raise BatchError("ids must be integers")
+    if len(ids) > MAX_IDS:
+        raise BatchError(f"At most {MAX_IDS} ids per batch; use a filter instead")
+    filters = _clean_filters(spec, filters or {})
+    if not ids and not filters:
+        raise BatchError("Give ids or at least one filter")
+
+    sets, set_params = [], []
+    if status is not None:
+        sets.append("status=%s")
+        set_params.append(status)
+    if note is not None:
+        sets.append(f"{spec['note']}=%s")
+        set_params.append(note)
+
+    where, params = _where(ids, filters)
+    # chunks commit while the response streams, after the session cookie has
+    # gone out, so pin this session's reads to the primary now
+    models.remember_write()
+    return _run(kind, spec, where, params, ', '.join(sets), set_params, status, chunk_size)
+
+
+def _run(kind, spec, where, params, sets, set_params, status, chunk_size):
+    table = spec['table']
+    select_sql = (
+        f"SELECT id, status, DATE(created_at) AS day FROM {table} "
+        f"WHERE {' AND '.join(where + ['id > %s'])} ORDER BY id LIMIT %s FOR UPDATE"
+    )
+    report = {'kind': kind, 'matched': 0, 'updated': 0, 'chunks': 0,
+              'elapsed_seconds': 0.0, 'error': None, 'done': False}
+    transitions = Counter()
+    started = time.monotonic()
+    last_id = 0
+
+    db = models.get_db()
+    cur = db.cursor()
+    try:
+        db.rollback()  # SET TRANSACTION only applies between transactions
+        while True:
+            # for the next chunk only: scanned rows that fail the filters are
+            # unlocked as soon as they are read instead of at commit
+            cur.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cur.execute(select_sql, params + [last_id, chunk_size])
+            rows = cur.fetchall()
+            if not rows:
+                db.rollback()
+                break
+            chunk_ids = [row['id'] for row in rows]
+            cur.execute(
+                f"UPDATE {table} SET {sets} WHERE id IN ({', '.join(['%s'] * len(chunk_ids))})",
+                set_params + chunk_ids
+            )
+            updated = cur.rowcount
+            db.commit()
+
+            last_id = chunk_ids[-1]
+            report['matched'] += len(rows)
+            report['updated'] += updated
+            report['chunks'] += 1
+            if status is not None:
+                for row in rows:
+                    if row['status'] != status:
+                        transitions[(row['status'], row['day'])] += 1
+            report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+            yield dict(report)
+    except MySQLdb.Error as e:
+        db.rollback()
+        report['error'] = str(e)
+    finally:
+        cur.close()
+        db.close()
+        if report['chunks']:
+            models.invalidate_stats()
+            for (old, day), count in transitions.items():
+                models.notify_change(kind, old, status, day, count=count)
+
+    report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    report['done'] = True
+    yield report
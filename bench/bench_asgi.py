@@ -0,0 +1,114 @@
+"""
+Compare WSGI and ASGI serving modes under concurrent load.
+
+Start both servers against the same local MariaDB/MySQL, e.g.
+
+    gunicorn -w 4 --threads 8 -b 127.0.0.1:8000 wsgi:app
+    uvicorn asgi:application --workers 4 --port 8001
+
+then run
+
+    python bench/bench_asgi.py --email admin@example.com --password secret \\
+        --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001 \\
+        --concurrency 64 --seconds 30
+
+Each target gets its own logged-in session; the client threads then hit the
+read-heavy routes in a fixed mix and report throughput, error count and
+p50/p95/p99/max latency per target.
+"""
+import argparse
+import http.cookiejar
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+PATHS = [
+    '/admin',
+    '/admin/tickets',
+    '/admin/tickets?status=open',
+    '/api/admin/stats?days=7',
+    '/api/admin/stats?days=30',
+]
+
+
+def login(base, email, password):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    body = urllib.parse.urlencode({'email': email, 'password': password}).encode()
+    opener.open(f"{base}/login", data=body, timeout=30).read()
+    if not any(c.name == 'session' for c in jar):
+        raise SystemExit(f"Login failed for {base}")
+    return opener
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(name, base, opener, concurrency, seconds):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                with opener.open(base + rng.choice(PATHS), timeout=30) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                failed += 1
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    if not latencies:
+        print(f"{name:<8} no successful requests ({errors[0]} errors)")
+        return
+    ms = [v * 1000 for v in latencies]
+    print(f"{name:<8} {len(ms) / elapsed:>8.1f} req/s  errors {errors[0]:<5} "
+          f"p50 {percentile(ms, 50):>7.1f}  p95 {percentile(ms, 95):>7.1f}  "
+          f"p99 {percentile(ms, 99):>7.1f}  max {max(ms):>7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help="name=base_url; repeatable")
+    parser.add_argument('--email', default=os.getenv('BENCH_EMAIL'))
+    parser.add_argument('--password', default=os.getenv('BENCH_PASSWORD'))
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=3)
+    args = parser.parse_args()
+    if not args.email or not args.password:
+        parser.error("--email and --password (an admin account) are required")
+
+    for target in args.target:
+        name, base = target.split('=', 1)
+        base = base.rstrip('/')
+        opener = login(base, args.email, args.password)
+        if args.warmup:
+            run(f"{name}*", base, opener, min(args.concurrency, 8), args.warmup)
+        run(name, base, opener, args.concurrency, args.seconds)
+    print("(* = warm-up, not comparable)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
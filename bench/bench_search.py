@@ -0,0 +1,92 @@
+"""
+Search latency benchmark for search.py against a local MariaDB/MySQL.
+
+    python bench/bench_search.py --seed 1000000      # add 1M synthetic forms first (slow, once)
+    python bench/bench_search.py --runs 200
+
+Seeding attaches the synthetic forms to the first user in the database.
+Reports p50/p95/p99/max latency for a fixed mix of prefix queries on forms and tickets.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+import models  # noqa: E402
+import search  # noqa: E402
+
+FIRST = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Rohan', 'Saanvi']
+LAST = ['Sharma', 'Verma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Singh', 'Das', 'Khan']
+PLACES = [('Mumbai', 'Maharashtra'), ('Pune', 'Maharashtra'), ('Chennai', 'Tamil Nadu'),
+          ('Bengaluru', 'Karnataka'), ('Kolkata', 'West Bengal'), ('Jaipur', 'Rajasthan'),
+          ('Lucknow', 'Uttar Pradesh'), ('Hyderabad', 'Telangana')]
+UNIVERSITIES = ['University of Mumbai', 'Anna University', 'Delhi University', 'Osmania University',
+                'Jadavpur University', 'Savitribai Phule Pune University']
+
+QUERIES = [
+    ('forms', 'sharma'), ('forms', 'aar mum'), ('forms', 'Anna Chennai'), ('forms', 'kav patel pune'),
+    ('forms', 'univ'), ('tickets', 'address'), ('tickets', 'upd'), ('tickets', 'wrong name'),
+]
+
+
+def seed(count, batch=5000):
+    db = models.get_db()
+    cur = db.cursor()
+    cur.execute("SELECT id FROM users ORDER BY id LIMIT 1")
+    user = cur.fetchone()
+    if not user:
+        raise SystemExit("Create at least one user before seeding")
+    sql = ("INSERT INTO user_forms (user_id, full_name, city, state, university, status) "
+           "VALUES (%s, %s, %s, %s, %s, 'pending')")
+    rng = random.Random(42)
+    for start in range(0, count, batch):
+        rows = []
+        for _ in range(min(batch, count - start)):
+            city, state = rng.choice(PLACES)
+            rows.append((user['id'], f"{rng.choice(FIRST)} {rng.choice(LAST)}", city, state, rng.choice(UNIVERSITIES)))
+        cur.executemany(sql, rows)
+        db.commit()
+        print(f"  seeded {start + len(rows)}/{count}", file=sys.stderr)
+    cur.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=0, help="insert this many synthetic forms first")
+    parser.add_argument('--runs', type=int, default=100, help="timed queries per query string")
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.seed:
+            seed(args.seed)
+
+        db = models.get_db()
+        cur = db.cursor()
+        cur.execute("SELECT (SELECT COUNT(*) FROM user_forms) AS forms, (SELECT COUNT(*) FROM tickets) AS tickets")
+        print(f"dataset: {cur.fetchone()}")
+        cur.close()
+
+        for target, text in QUERIES:
+            timings = []
+            hits = 0
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                rows, _ = search.search(target, text)
+                timings.append((time.perf_counter() - started) * 1000)
+                hits = len(rows)
+            print(f"{target:8} {text!r:20} hits/page={hits:3}  p50={percentile(timings, 50):7.2f}ms  "
+                  f"p95={percentile(timings, 95):7.2f}ms  p99={percentile(timings, 99):7.2f}ms  "
+                  f"max={max(timings):7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Requests/sec benchmark for /uploads.
+
+Run it against a running server before and after a change, e.g.:
+
+    python bench/bench_uploads.py http://127.0.0.1:5000 /uploads/Screenshot_26.jpg --seconds 10 --concurrency 16
+    python bench/bench_uploads.py http://127.0.0.1:5000 /uploads/<hash>.jpg --revalidate
+
+--revalidate sends the ETag from the first response as If-None-Match, which
+is what a browser with a cached copy does (expect 304s); without it every
+request downloads the full body, which is the worst case for the worker.
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+
+def worker(url, etag, deadline, results, lock):
+    local = Counter()
+    received = 0
+    while time.monotonic() < deadline:
+        req = urllib.request.Request(url)
+        if etag:
+            req.add_header('If-None-Match', etag)
+        try:
+            with urllib.request.urlopen(req) as resp:
+                received += len(resp.read())
+                local[resp.status] += 1
+        except urllib.error.HTTPError as e:
+            local[e.code] += 1
+        except OSError:
+            local['error'] += 1
+    with lock:
+        results['status'].update(local)
+        results['bytes'] += received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_url')
+    parser.add_argument('path')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--revalidate', action='store_true', help="send If-None-Match with the first ETag")
+    args = parser.parse_args()
+
+    url = args.base_url.rstrip('/') + args.path
+    with urllib.request.urlopen(url) as resp:
+        headers = dict(resp.headers)
+        size = len(resp.read())
+    print(f"GET {url}: {size} bytes")
+    for name in ('Cache-Control', 'ETag', 'Accept-Ranges', 'X-Accel-Redirect'):
+        print(f"  {name}: {headers.get(name)}")
+
+    etag = headers.get('ETag') if args.revalidate else None
+    results = {'status': Counter(), 'bytes': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(url, etag, deadline, results, lock))
+        for _ in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    total = sum(results['status'].values())
+    print(f"{total} requests in {elapsed:.1f}s -> {total / elapsed:.1f} req/s, "
+          f"{results['bytes'] / elapsed / 1024:.1f} KiB/s; statuses {dict(results['status'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Concurrency check for models.create_or_update_form against a local MariaDB/MySQL.
+
+    python bench/check_form_upsert.py --threads 16 --rounds 20
+
+Each round creates a fresh user with no form, then has every thread submit
+that user's form at the same moment. Exactly one form per user must exist
+afterwards; any duplicate means two saves both took the insert branch.
+Test users are deleted at the end (their forms cascade).
+"""
+import argparse
+import os
+import sys
+import threading
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+import models  # noqa: E402
+
+
+def submit(user_id, n, barrier, errors):
+    with app.app_context():
+        barrier.wait()
+        try:
+            models.create_or_update_form(user_id, {'full_name': f"Concurrent {n}", 'city': 'Pune'})
+        except Exception as e:  # deadlocks or lock wait timeouts would show up here
+            errors.append(repr(e))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    if args.threads > app.config['DB_POOL_SIZE']:
+        print(f"note: {args.threads} threads share a pool of {app.config['DB_POOL_SIZE']} connections",
+              file=sys.stderr)
+
+    duplicates, errors, user_ids = 0, [], []
+    with app.app_context():
+        for _ in range(args.rounds):
+            email = f"upsert-{uuid.uuid4().hex[:12]}@example.invalid"
+            models.create_user("Upsert Check", email, password_hash='!')
+            user_ids.append(models.get_user_by_email(email)['id'])
+
+    for user_id in user_ids:
+        barrier = threading.Barrier(args.threads)
+        threads = [threading.Thread(target=submit, args=(user_id, n, barrier, errors))
+                   for n in range(args.threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    with app.app_context():
+        db = models.get_db()
+        cur = db.cursor()
+        for user_id in user_ids:
+            cur.execute("SELECT COUNT(*) AS n FROM user_forms WHERE user_id=%s", (user_id,))
+            count = cur.fetchone()['n']
+            if count != 1:
+                duplicates += 1
+                print(f"user {user_id}: {count} forms")
+        cur.executemany("DELETE FROM users WHERE id=%s", [(u,) for u in user_ids])
+        db.commit()
+        cur.close()
+
+    print(f"{args.rounds} rounds x {args.threads} concurrent saves: "
+          f"{duplicates} users with duplicate forms, {len(errors)} errors")
+    for error in errors[:10]:
+        print("  ", error)
+    sys.exit(1 if duplicates or errors else 0)
+
+
+if __name__ == '__main__':
+    main()
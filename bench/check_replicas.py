@@ -0,0 +1,96 @@
+"""
+Check read-replica routing against two local MariaDB instances.
+
+Primary on 3306 and a replica on 3307, e.g. with Docker:
+
+    docker run -d --name db-primary -p 3306:3306 -e MARIADB_ROOT_PASSWORD=pw \\
+        mariadb:11 --log-bin --server-id=1
+    docker run -d --name db-replica -p 3307:3306 -e MARIADB_ROOT_PASSWORD=pw \\
+        mariadb:11 --server-id=2 --read-only=1
+    # load demograph.sql into the primary, then on the replica:
+    #   CHANGE MASTER TO MASTER_HOST='<primary ip>', MASTER_USER='root',
+    #     MASTER_PASSWORD='pw', MASTER_USE_GTID=slave_pos; START SLAVE;
+
+    MYSQL_PASSWORD=pw MYSQL_REPLICAS=127.0.0.1:3307 python bench/check_replicas.py
+
+Verifies, printing the server port behind each read:
+  1. SELECT helpers go to the replica;
+  2. after a commit, reads in the same request and session stay on the primary
+     for READ_YOUR_WRITES_SECONDS;
+  3. an unreachable replica is taken out of rotation and reads fail over to
+     the remaining replica, or to the primary when none is left.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import session  # noqa: E402
+
+from app import app  # noqa: E402
+import models  # noqa: E402
+from pool import ReplicaSet  # noqa: E402
+
+
+def port_of(db):
+    cur = db.cursor()
+    cur.execute("SELECT @@port AS port")
+    port = cur.fetchone()['port']
+    cur.close()
+    return port
+
+
+def check(label, actual, expected):
+    ok = actual == expected
+    print(f"{'ok  ' if ok else 'FAIL'} {label}: port {actual} (expected {expected})")
+    return ok
+
+
+def main():
+    replicas = app.extensions['db_replicas']
+    if replicas is None:
+        raise SystemExit("Set MYSQL_REPLICAS, e.g. MYSQL_REPLICAS=127.0.0.1:3307")
+    primary = app.config['MYSQL_PORT']
+    replica = int(app.config['MYSQL_REPLICAS'][0].partition(':')[2] or 3306)
+    results = []
+
+    with app.test_request_context():
+        results.append(check("read routed to replica", port_of(models.get_read_db()), replica))
+
+    with app.test_request_context():
+        models.get_db().commit()
+        results.append(check("read after own write (same request)", port_of(models.get_read_db()), primary))
+
+    with app.test_request_context():
+        session['_wrote_at'] = time.time()
+        results.append(check("read after own write (same session)", port_of(models.get_read_db()), primary))
+
+    with app.test_request_context():
+        session['_wrote_at'] = time.time() - app.config['READ_YOUR_WRITES_SECONDS'] - 1
+        results.append(check("read after the window", port_of(models.get_read_db()), replica))
+
+    # Failover: put an unreachable target in front of the real replica.
+    config = app.config
+    app.extensions['db_replicas'] = ReplicaSet(
+        [('127.0.0.1:1', models._make_pool(config, '127.0.0.1', 1))] + [(r.name, r.pool) for r in replicas.replicas],
+        check_interval=config['REPLICA_CHECK_INTERVAL'], max_lag=config['REPLICA_MAX_LAG'],
+    )
+    for i in range(3):
+        with app.test_request_context():
+            results.append(check(f"failover read {i + 1}", port_of(models.get_read_db()), replica))
+    print("replica status:", app.extensions['db_replicas'].status())
+
+    app.extensions['db_replicas'] = ReplicaSet(
+        [('127.0.0.1:1', models._make_pool(config, '127.0.0.1', 1))],
+        check_interval=config['REPLICA_CHECK_INTERVAL'],
+    )
+    with app.test_request_context():
+        results.append(check("no healthy replica -> primary", port_of(models.get_read_db()), primary))
+
+    app.extensions['db_replicas'] = replicas
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Synthetic demographic data for benchmarks.
+
+    python bench/datagen.py --users 10k                 # ~10K users, ~10K forms, ~2.5K tickets
+    python bench/datagen.py --users 1m --days 730 --seed 7
+    python bench/datagen.py --users 10m --truncate      # wipes users/forms/tickets first
+
+Fills the demograph.sql schema with plausible distributions: state weighted
+by population, age skewed young, marital status and qualification following
+age, passing year following date of birth, form and ticket statuses following
+how old the record is, and creation times growing over `--days` with weekday
+and office-hour peaks. The same --seed always produces the same rows.
+
+Every synthetic user has the password given by --password; one admin
+(--admin-email) is created for bench/harness.py. Rows get explicit ids after
+the current maximum, so generation can be appended to an existing database.
+Run `flask refresh-rollups --full` afterwards to rebuild the rollup tables.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import app  # noqa: E402
+import models  # noqa: E402
+
+# (state, population weight, cities)
+STATES = [
+    ('Uttar Pradesh', 200, ['Lucknow', 'Kanpur', 'Varanasi', 'Agra', 'Prayagraj']),
+    ('Maharashtra', 112, ['Mumbai', 'Pune', 'Nagpur', 'Nashik', 'Aurangabad']),
+    ('Bihar', 104, ['Patna', 'Gaya', 'Bhagalpur', 'Muzaffarpur']),
+    ('West Bengal', 91, ['Kolkata', 'Howrah', 'Durgapur', 'Siliguri']),
+    ('Madhya Pradesh', 73, ['Bhopal', 'Indore', 'Gwalior', 'Jabalpur']),
+    ('Tamil Nadu', 72, ['Chennai', 'Coimbatore', 'Madurai', 'Tiruchirappalli']),
+    ('Rajasthan', 69, ['Jaipur', 'Jodhpur', 'Udaipur', 'Kota']),
+    ('Karnataka', 61, ['Bengaluru', 'Mysuru', 'Hubballi', 'Mangaluru']),
+    ('Gujarat', 60, ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot']),
+    ('Andhra Pradesh', 49, ['Visakhapatnam', 'Vijayawada', 'Guntur', 'Tirupati']),
+    ('Odisha', 42, ['Bhubaneswar', 'Cuttack', 'Rourkela']),
+    ('Telangana', 35, ['Hyderabad', 'Warangal', 'Nizamabad']),
+    ('Kerala', 33, ['Thiruvananthapuram', 'Kochi', 'Kozhikode']),
+    ('Jharkhand', 33, ['Ranchi', 'Jamshedpur', 'Dhanbad']),
+    ('Assam', 31, ['Guwahati', 'Silchar', 'Dibrugarh']),
+    ('Punjab', 28, ['Ludhiana', 'Amritsar', 'Jalandhar']),
+    ('Haryana', 25, ['Gurugram', 'Faridabad', 'Panipat']),
+    ('Delhi', 17, ['New Delhi']),
+    ('Goa', 2, ['Panaji', 'Margao']),
+]
+FIRST = {
+    'male': ['Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Rohan', 'Ishaan', 'Rahul', 'Amit', 'Suresh', 'Karthik',
+             'Mohammed', 'Harpreet', 'Sanjay', 'Vikram', 'Anil', 'Rajesh', 'Manoj', 'Deepak'],
+    'female': ['Ananya', 'Diya', 'Kavya', 'Meera', 'Saanvi', 'Priya', 'Pooja', 'Lakshmi', 'Fatima', 'Neha',
+               'Sunita', 'Anjali', 'Divya', 'Shreya', 'Aisha', 'Gurpreet', 'Rekha', 'Swati'],
+}
+FIRST['other'] = FIRST['male'][:6] + FIRST['female'][:6]
+LAST = ['Sharma', 'Verma', 'Patel', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Singh', 'Das', 'Khan', 'Yadav',
+        'Kumar', 'Mishra', 'Joshi', 'Mehta', 'Chatterjee', 'Pillai', 'Rao', 'Banerjee', 'Shaikh']
+# (qualification, weight, typical age when completed, eligible from age)
+QUALIFICATIONS = [
+    ('10th', 18, 16, 16), ('12th', 26, 18, 18), ('Diploma', 8, 20, 19), ('B.A.', 12, 21, 21),
+    ('B.Sc.', 10, 21, 21), ('B.Com.', 9, 21, 21), ('B.Tech', 9, 22, 22), ('MBA', 3, 25, 24),
+    ('M.Sc.', 3, 23, 23), ('Ph.D.', 1, 29, 27),
+]
+UNIVERSITIES = ['University of Mumbai', 'Anna University', 'Delhi University', 'Osmania University',
+                'Jadavpur University', 'Savitribai Phule Pune University', 'Banaras Hindu University',
+                'University of Calcutta', 'Gujarat University', 'Bangalore University', 'State Board']
+TICKET_SUBJECTS = [
+    ('Update address', "Please update my address, I have moved to a new house."),
+    ('Wrong name spelling', "My name is spelled incorrectly in the submitted form."),
+    ('Status not updated', "My form has been pending for a long time, please check."),
+    ('Change phone number', "I changed my mobile number and need to update it."),
+    ('Document upload issue', "I could not upload my documents, the page shows an error."),
+    ('Correct date of birth', "The date of birth on my form is wrong."),
+]
+USER_BATCH = 5000
+
+
+def parse_count(value):
+    """'10k' -> 10000, '1.5m' -> 1500000."""
+    value = value.strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * scale)
+
+
+class Generator:
+    def __init__(self, rng, now, days):
+        self.rng = rng
+        self.now = now
+        self.days = days
+        self.state_weights = [w for _, w, _ in STATES]
+
+    def created_at(self):
+        """Growth over the window (more recent days are busier), weekday and office-hour peaks."""
+        rng = self.rng
+        while True:
+            age_days = self.days * (1 - math.sqrt(rng.random()))
+            moment = self.now - timedelta(days=age_days)
+            if moment.weekday() >= 5 and rng.random() < 0.5:
+                continue
+            hour = min(23, max(0, int(rng.gauss(14, 4))))
+            return moment.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=0)
+
+    def person(self):
+        rng = self.rng
+        roll = rng.random()
+        gender = 'male' if roll < 0.51 else ('female' if roll < 0.995 else 'other')
+        last = rng.choice(LAST)
+        return gender, f"{rng.choice(FIRST[gender])} {last}", last
+
+    def form(self, user_name, gender, last, created):
+        rng = self.rng
+        age = int(rng.triangular(18, 70, 26))
+        dob = created.date() - timedelta(days=age * 365 + rng.randrange(365))
+        state, _, cities = rng.choices(STATES, weights=self.state_weights)[0]
+        married = rng.random() < 1 / (1 + math.exp(-(age - 27) / 3))
+
+        quals = [(q, w) for (q, w, _, eligible) in QUALIFICATIONS if eligible <= age]
+        qualification = rng.choices([q for q, _ in quals], weights=[w for _, w in quals])[0]
+        done_at = next(a for q, _, a, _ in QUALIFICATIONS if q == qualification)
+        passing_year = min(created.year, dob.year + done_at + rng.choice((0, 0, 1, 2)))
+
+        record_age = (self.now - created).days
+        if record_age < 7:
+            status = rng.choices(['pending', 'in_review'], weights=[80, 20])[0]
+        elif record_age < 60:
+            status = rng.choices(['pending', 'in_review', 'completed', 'rejected'], weights=[35, 30, 28, 7])[0]
+        else:
+            status = rng.choices(['pending', 'in_review', 'completed', 'rejected'], weights=[8, 7, 72, 13])[0]
+
+        return {
+            'full_name': user_name,
+            'phone': f"{rng.choice('6789')}{rng.randrange(10 ** 9):09d}",
+            'age': age,
+            'gender': gender,
+            'dob': dob,
+            'aadhar_number': f"{rng.randrange(2, 10)}{rng.randrange(10 ** 11):011d}",
+            'pan_number': ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=5))
+                          + f"{rng.randrange(10000):04d}" + rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ'),
+            'qualification': qualification,
+            'university': rng.choice(UNIVERSITIES),
+            'passing_year': passing_year,
+            'father_name': f"{rng.choice(FIRST['male'])} {last}",
+            'mother_name': f"{rng.choice(FIRST['female'])} {last}",
+            'family_members': max(1, min(12, int(rng.gauss(4.5, 1.8)))),
+            'marital_status': 'married' if married else 'single',
+            'address': f"{rng.randrange(1, 999)}, {rng.choice(['MG Road', 'Station Road', 'Gandhi Nagar', 'Civil Lines', 'Sector ' + str(rng.randrange(1, 60))])}",
+            'city': rng.choice(cities),
+            'state': state,
+            'pincode': f"{rng.randrange(110000, 855999)}",
+            'status': status,
+        }
+
+    def tickets(self, form_created):
+        rng = self.rng
+        if rng.random() >= 0.2:
+            return []
+        out = []
+        for _ in range(rng.choice((1, 1, 1, 2))):
+            created = form_created + timedelta(hours=rng.expovariate(1 / 72))
+            if created > self.now:
+                created = self.now
+            subject, message = rng.choice(TICKET_SUBJECTS)
+            age = (self.now - created).days
+            status = 'open' if age < 2 else rng.choices(['open', 'in_progress', 'resolved'], weights=[15, 15, 70])[0]
+            response = "Updated as requested." if status == 'resolved' else None
+            out.append((subject, message, status, response, created))
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=parse_count, default=parse_count('10k'), help="e.g. 10k, 250k, 10m")
+    parser.add_argument('--days', type=int, default=365, help="spread creation times over this many days")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--password', default='bench-pass')
+    parser.add_argument('--admin-email', default='bench-admin@example.invalid')
+    parser.add_argument('--truncate', action='store_true', help="delete all users, forms and tickets (and archives) first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    gen = Generator(rng, datetime.now().replace(microsecond=0), args.days)
+    password_hash = generate_password_hash(args.password)  # hashed once, shared by every synthetic user
+
+    # app context: models.form_values() derives the Aadhaar/PAN blind indexes from app config
+    with app.app_context():
+        conn = models._connect(app.config)
+        cur = conn.cursor()
+        cur.execute("SET SESSION foreign_key_checks=0, unique_checks=0")
+        if args.truncate:
+            for table in ('tickets', 'user_forms', 'users', 'tickets_archive', 'user_forms_archive', 'archive_counts'):
+                cur.execute(f"TRUNCATE TABLE {table}")
+
+        cur.execute("SELECT COALESCE(MAX(id), 0) AS m FROM users")
+        user_id = cur.fetchone()['m']
+        # archived forms keep their ids, so new ones must start above them too
+        cur.execute(
+            "SELECT GREATEST((SELECT COALESCE(MAX(id), 0) FROM user_forms), "
+            "(SELECT COALESCE(MAX(id), 0) FROM user_forms_archive)) AS m"
+        )
+        form_id = cur.fetchone()['m']
+
+        user_sql = "INSERT INTO users (id, name, email, password, role, created_at) VALUES (%s,%s,%s,%s,%s,%s)"
+        form_columns = ('id',) + models.FORM_INSERT_COLUMNS + ('created_at', 'updated_at')
+        form_sql = (f"INSERT INTO user_forms ({', '.join(form_columns)}) "
+                    f"VALUES ({', '.join(['%s'] * len(form_columns))})")
+        ticket_sql = ("INSERT INTO tickets (user_id, form_id, subject, message, status, admin_response, created_at, updated_at) "
+                      "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)")
+
+        cur.execute("SELECT id FROM users WHERE email=%s", (args.admin_email,))
+        if not cur.fetchone():
+            user_id += 1
+            cur.execute(user_sql, (user_id, 'Bench Admin', args.admin_email, password_hash, 'admin',
+                                   gen.now - timedelta(days=args.days)))
+
+        started = time.monotonic()
+        totals = {'users': 0, 'forms': 0, 'tickets': 0}
+        for batch_start in range(0, args.users, USER_BATCH):
+            users, forms, tickets = [], [], []
+            for _ in range(min(USER_BATCH, args.users - batch_start)):
+                user_id += 1
+                gender, name, last = gen.person()
+                joined = gen.created_at()
+                users.append((user_id, name, f"user{user_id}@bench.invalid", password_hash, 'user', joined))
+
+                for _ in range(rng.choices((0, 1, 2, 3), weights=(10, 80, 8, 2))[0]):
+                    form_id += 1
+                    created = min(gen.now, joined + timedelta(hours=rng.expovariate(1 / 48)))
+                    data = gen.form(name, gender, last, created)
+                    updated = created if data['status'] == 'pending' else min(gen.now, created + timedelta(days=rng.randrange(1, 30)))
+                    forms.append((form_id, user_id) + models.form_values(data) + (data['status'], created, updated))
+                    for subject, message, status, response, t_created in gen.tickets(created):
+                        tickets.append((user_id, form_id, subject, message, status, response, t_created, t_created))
+
+            cur.executemany(user_sql, users)
+            if forms:
+                cur.executemany(form_sql, forms)
+            if tickets:
+                cur.executemany(ticket_sql, tickets)
+            conn.commit()
+
+            totals['users'] += len(users)
+            totals['forms'] += len(forms)
+            totals['tickets'] += len(tickets)
+            elapsed = time.monotonic() - started
+            rows = sum(totals.values())
+            print(f"  {totals['users']}/{args.users} users, {totals['forms']} forms, {totals['tickets']} tickets "
+                  f"({rows / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+        cur.close()
+        conn.close()
+        print(f"done: {totals} in {time.monotonic() - started:.1f}s (seed {args.seed}); "
+              f"login as {args.admin_email} / user<id>@bench.invalid with password {args.password!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,370 @@
+"""
+Per-route benchmark for every route in app.py, against a local MariaDB/MySQL.
+
+    python bench/datagen.py --users 100k                        # once
+    python bench/harness.py --runs 200 --save-baseline bench/baseline.json
+    # ... change code ...
+    python bench/harness.py --runs 200 --baseline bench/baseline.json
+
+The app runs in-process behind Flask's test client, so numbers cover the
+whole request (routing, session, queries, templates) without HTTP or server
+overhead; use bench_asgi.py for concurrency. Each scenario is warmed up, then
+timed sequentially for --runs requests (p50/p95/p99/max latency, requests per
+second, mean X-Query-Count, mean template render time from Server-Timing)
+and re-run --mem-runs times under tracemalloc for peak Python memory per
+request.
+
+Scenarios log in as the datagen admin and as a user owning a form and a
+ticket; ids are sampled from the database. Writes (form saves, ticket
+creation, imports, batch updates, registration, photo uploads) are marked
+[w] and leave rows behind; --skip-writes runs reads only.
+
+With --baseline, a route regresses when its p95 grows by more than
+--threshold (and by at least --min-ms), its median query count grows, or
+its peak memory grows by more than --threshold. The exit status is 1 on any
+regression or failed request.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read by config.py at import: query counts on every response, no login throttling.
+os.environ.setdefault("QUERY_PROFILE_HEADERS", "1")
+os.environ.setdefault("AUTH_RATE_PER_IP", "1000000/1")
+os.environ.setdefault("AUTH_RATE_PER_EMAIL", "1000000/1")
+
+from app import app  # noqa: E402
+import models  # noqa: E402
+
+RENDER_TIMING = re.compile(r'render;dur=([\d.]+)')
+
+# Routes no scenario drives, and why.
+EXCLUDED = {
+    'delete_form': "models.delete_form is not implemented",
+    'delete_ticket': "models.delete_ticket is not implemented",
+}
+
+
+class Scenario:
+    """
+    One request shape. `role` is 'anon', 'user', 'admin', 'fresh' (a new
+    user session per request, logged in outside the timing) or 'new' (a new
+    client without cookies per request, for requests that log in). `make` returns
+    keyword arguments for client.open() and is called before every request.
+    """
+
+    def __init__(self, name, endpoint, role, make, write=False, first_chunk=False):
+        self.name = name
+        self.endpoint = endpoint
+        self.role = role
+        self.make = make
+        self.write = write
+        self.first_chunk = first_chunk  # streaming response: time to the first chunk only
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def sample_ids(admin_email):
+    """Ids the scenarios need, from the current dataset."""
+    db = models.get_db()
+    cur = db.cursor()
+    cur.execute("SELECT id FROM users WHERE email=%s AND role='admin'", (admin_email,))
+    if not cur.fetchone():
+        raise SystemExit(f"No admin {admin_email}; run bench/datagen.py first")
+    cur.execute(
+        "SELECT t.id AS ticket_id, t.form_id, t.status AS ticket_status, u.email "
+        "FROM tickets t JOIN users u ON u.id = t.user_id "
+        "WHERE u.role='user' AND u.email LIKE '%%@bench.invalid' ORDER BY t.id LIMIT 1"
+    )
+    ids = cur.fetchone()
+    if not ids:
+        raise SystemExit("No synthetic user with a ticket; run bench/datagen.py first")
+    cur.execute("SELECT * FROM user_forms WHERE id=%s", (ids['form_id'],))
+    ids['form'] = models.reveal_form(cur.fetchone())
+    cur.execute("SELECT profile_photo FROM users WHERE profile_photo IS NOT NULL ORDER BY id DESC LIMIT 1")
+    row = cur.fetchone()
+    ids['photo'] = row['profile_photo'] if row else None
+    cur.execute("SELECT (SELECT COUNT(*) FROM users) AS users, (SELECT COUNT(*) FROM user_forms) AS forms, "
+                "(SELECT COUNT(*) FROM tickets) AS tickets")
+    ids['dataset'] = cur.fetchone()
+    cur.close()
+    return ids
+
+
+def form_payload(form):
+    return {field: '' if form[field] is None else str(form[field]) for field in models.FORM_FIELDS}
+
+
+def png_bytes():
+    from PIL import Image
+    out = io.BytesIO()
+    Image.new('RGB', (320, 320), (200, 120, 40)).save(out, 'PNG')
+    return out.getvalue()
+
+
+def scenarios(ids, password):
+    form_id, ticket_id = ids['form_id'], ids['ticket_id']
+    form_data = form_payload(ids['form'])
+    today = datetime.now().strftime('%Y-%m-%d')
+    photo = png_bytes()
+    import_rows = "".join(
+        json.dumps(dict(form_data, user_id=ids['form']['user_id'], status='pending')) + "\n"
+        for _ in range(10)
+    ).encode()
+
+    get = lambda path: lambda: {'path': path}  # noqa: E731
+    post = lambda path, **kw: lambda: dict(path=path, method='POST', **kw)  # noqa: E731
+
+    out = [
+        Scenario('login page', 'login', 'anon', get('/login')),
+        Scenario('login submit', 'login', 'new',
+                 post('/login', data={'email': ids['email'], 'password': password})),
+        Scenario('register page', 'register', 'anon', get('/register')),
+        Scenario('register submit', 'register', 'anon', lambda: {
+            'path': '/register', 'method': 'POST',
+            'data': {'name': 'Bench Signup', 'email': f"signup-{uuid.uuid4().hex[:12]}@bench.invalid",
+                     'password': password},
+        }, write=True),
+        Scenario('logout', 'logout', 'fresh', get('/logout')),
+        Scenario('user dashboard', 'user_dashboard', 'user', get('/')),
+        Scenario('profile', 'profile', 'user', get('/profile')),
+        Scenario('profile photo upload', 'profile', 'user', lambda: {
+            'path': '/profile', 'method': 'POST',
+            'data': {'profile_photo': (io.BytesIO(photo), 'bench.png')},
+        }, write=True),
+        Scenario('form page', 'user_form', 'user', get('/form')),
+        Scenario('form edit page', 'user_form', 'user', get(f'/form/{form_id}')),
+        Scenario('form save', 'user_form', 'user', post('/form', data=form_data), write=True),
+        Scenario('form edit save', 'user_form', 'user', post(f'/form/{form_id}', data=form_data), write=True),
+        Scenario('user tickets', 'user_tickets', 'user', get('/tickets')),
+        Scenario('ticket create', 'user_tickets', 'user', post('/tickets', data={
+            'form_id': form_id, 'subject': 'Bench ticket', 'message': 'Created by bench/harness.py'}), write=True),
+        Scenario('ticket view', 'view_ticket', 'user', get(f'/tickets/{ticket_id}')),
+        Scenario('admin dashboard', 'admin_dashboard', 'admin', get('/admin')),
+        Scenario('admin users', 'admin_users', 'admin', get('/admin/users')),
+        Scenario('admin forms', 'admin_forms', 'admin', get('/admin/forms')),
+        Scenario('admin forms pending', 'admin_forms', 'admin', get('/admin/forms?status=pending')),
+        Scenario('admin form detail', 'admin_form_detail', 'admin', get(f'/admin/forms/{form_id}')),
+        Scenario('admin form update', 'admin_form_update', 'admin', post(
+            f'/admin/forms/{form_id}/update',
+            data=dict(form_data, admin_remark=ids['form']['admin_remark'] or '')), write=True),
+        Scenario('admin forms import', 'admin_forms_import', 'admin', lambda: {
+            'path': '/admin/forms/import', 'method': 'POST',
+            'data': {'file': (io.BytesIO(import_rows), 'bench.jsonl')},
+        }, write=True),
+        Scenario('admin tickets', 'admin_tickets', 'admin', get('/admin/tickets')),
+        Scenario('admin tickets open', 'admin_tickets', 'admin', get('/admin/tickets?status=open')),
+        Scenario('admin ticket update', 'admin_tickets', 'admin', post('/admin/tickets', data={
+            'ticket_id': ticket_id, 'status': ids['ticket_status'], 'admin_response': 'Bench response'}),
+            write=True),
+        Scenario('admin batch', 'admin_batch', 'admin', post(
+            '/admin/batch/forms', json={'ids': [form_id], 'status': ids['form']['status']}), write=True),
+        Scenario('admin search forms', 'admin_search', 'admin', get('/admin/search?q=sharma+pune')),
+        Scenario('admin search tickets', 'admin_search', 'admin', get('/admin/search?type=tickets&q=address')),
+        Scenario('admin export today', 'admin_export', 'admin', get(f'/admin/export/forms?from={today}')),
+        Scenario('api stats 7d', 'api_admin_stats', 'admin', get('/api/admin/stats?days=7')),
+        Scenario('api stats 30d', 'api_admin_stats', 'admin', get('/api/admin/stats?days=30')),
+        Scenario('api stream snapshot', 'api_admin_stream', 'admin', get('/api/admin/stream'), first_chunk=True),
+        Scenario('api demographics', 'api_admin_demographics', 'admin',
+                 get('/api/admin/demographics?group=state,gender&days=30')),
+        Scenario('api analytics histogram', 'api_admin_analytics', 'admin',
+                 get('/api/admin/analytics/histogram?column=age&bins=0,18,25,35,60,120')),
+        Scenario('api analytics crosstab', 'api_admin_analytics', 'admin',
+                 get('/api/admin/analytics/crosstab?rows=state&cols=qualification&days=30')),
+        Scenario('api analytics percentiles', 'api_admin_analytics', 'admin',
+                 get('/api/admin/analytics/percentiles?column=age&q=25,50,75&by=state')),
+        Scenario('admin metrics', 'admin_metrics', 'admin', get('/admin/metrics')),
+        Scenario('api metrics', 'api_admin_metrics', 'admin', get('/api/admin/metrics')),
+        Scenario('static js', 'static', 'anon', get('/static/js/charts.js')),
+    ]
+    if ids['photo']:
+        out.append(Scenario('upload file', 'uploaded_file', 'anon', get(f"/uploads/{ids['photo']}")))
+    else:
+        EXCLUDED['uploaded_file'] = "no user has a profile photo yet (run with writes once)"
+    return out
+
+
+def login(email, password):
+    client = app.test_client()
+    response = client.post('/login', data={'email': email, 'password': password})
+    if response.status_code != 302:
+        raise SystemExit(f"Login failed for {email}: HTTP {response.status_code}")
+    return client
+
+
+def request_once(client, scenario):
+    kwargs = scenario.make()
+    started = time.perf_counter()
+    if scenario.first_chunk:
+        response = client.open(buffered=False, **kwargs)
+        next(iter(response.response), None)
+        elapsed = time.perf_counter() - started
+        response.close()
+    else:
+        response = client.open(**kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+    render = RENDER_TIMING.search(response.headers.get('Server-Timing', ''))
+    return (elapsed, response.status_code, int(response.headers.get('X-Query-Count', 0)),
+            float(render.group(1)) if render else 0.0)
+
+
+def run(scenario, clients, email, password, runs, warmup, mem_runs):
+    def client_for():
+        if scenario.role == 'fresh':
+            return login(email, password)
+        if scenario.role == 'new':
+            return app.test_client()  # a shared one would keep the login cookie
+        return clients[scenario.role]
+
+    for _ in range(warmup):
+        request_once(client_for(), scenario)
+
+    timings, queries, renders, failures = [], [], [], 0
+    wall = 0.0
+    for _ in range(runs):
+        client = client_for()
+        elapsed, status, count, render_ms = request_once(client, scenario)
+        wall += elapsed
+        timings.append(elapsed * 1000)
+        queries.append(count)
+        renders.append(render_ms)
+        if status >= 400:
+            failures += 1
+
+    peak = 0
+    for _ in range(mem_runs):
+        client = client_for()
+        tracemalloc.start()
+        request_once(client, scenario)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'endpoint': scenario.endpoint,
+        'write': scenario.write,
+        'runs': runs,
+        'failures': failures,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(max(timings), 3),
+        'rps': round(runs / wall, 1) if wall else None,
+        'queries': round(sum(queries) / len(queries), 2),
+        'queries_p50': percentile(queries, 50),
+        'render_ms': round(sum(renders) / len(renders), 3),
+        'peak_kib': round(peak / 1024, 1) if mem_runs else None,
+    }
+
+
+def compare(results, baseline, threshold, min_ms):
+    """Regression messages for routes present in both runs."""
+    problems = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if now['p95_ms'] > before['p95_ms'] * (1 + threshold) and now['p95_ms'] - before['p95_ms'] >= min_ms:
+            problems.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        # The mean moves with cache expiries during the run; the median doesn't.
+        if 'queries_p50' in before:
+            if now['queries_p50'] > before['queries_p50']:
+                problems.append(f"{name}: median queries {before['queries_p50']} -> {now['queries_p50']}")
+        elif now['queries'] > before['queries'] * (1 + threshold):  # baseline from before queries_p50
+            problems.append(f"{name}: queries {before['queries']} -> {now['queries']}")
+        if now['peak_kib'] and before.get('peak_kib') and now['peak_kib'] > before['peak_kib'] * (1 + threshold):
+            problems.append(f"{name}: peak memory {before['peak_kib']}KiB -> {now['peak_kib']}KiB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--admin-email', default='bench-admin@example.invalid')
+    parser.add_argument('--password', default='bench-pass', help="password datagen.py gave every bench user")
+    parser.add_argument('--runs', type=int, default=100, help="timed requests per scenario")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--mem-runs', type=int, default=3, help="requests per scenario under tracemalloc")
+    parser.add_argument('--only', action='append', default=[], help="scenario name substring (repeatable)")
+    parser.add_argument('--skip-writes', action='store_true')
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--save-baseline', metavar='PATH', help="write results JSON as the new baseline")
+    parser.add_argument('--baseline', metavar='PATH', help="compare against this baseline JSON")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative growth (0.2 = 20%%)")
+    parser.add_argument('--min-ms', type=float, default=1.0, help="ignore p95 growth smaller than this")
+    args = parser.parse_args()
+
+    with app.app_context():
+        ids = sample_ids(args.admin_email)
+    print(f"dataset: {ids['dataset']}")
+
+    todo = scenarios(ids, args.password)
+    covered = {s.endpoint for s in todo}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint not in covered:
+            print(f"not benchmarked: {rule.endpoint} ({EXCLUDED.get(rule.endpoint, 'no scenario')})",
+                  file=sys.stderr)
+    if args.skip_writes:
+        todo = [s for s in todo if not s.write]
+    if args.only:
+        todo = [s for s in todo if any(part in s.name for part in args.only)]
+
+    clients = {
+        'anon': app.test_client(),
+        'user': login(ids['email'], args.password),
+        'admin': login(args.admin_email, args.password),
+    }
+
+    results = {}
+    print(f"{'scenario':28} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'queries':>7} {'render':>8} {'peak KiB':>9}")
+    for scenario in todo:
+        stats = run(scenario, clients, ids['email'], args.password, args.runs, args.warmup, args.mem_runs)
+        results[scenario.name] = stats
+        flag = ' [w]' if scenario.write else ''
+        failed = f"  {stats['failures']} FAILED" if stats['failures'] else ''
+        print(f"{(scenario.name + flag):28} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} "
+              f"{stats['rps'] or 0:8.1f} {stats['queries']:7.2f} {stats['render_ms']:8.2f} {stats['peak_kib'] or 0:9.1f}{failed}")
+
+    report = {
+        'meta': {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'dataset': ids['dataset'],
+            'runs': args.runs,
+        },
+        'routes': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"wrote {path}")
+
+    problems = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('dataset') != ids['dataset']:
+            print(f"note: baseline dataset was {baseline['meta'].get('dataset')}", file=sys.stderr)
+        problems = compare(results, baseline['routes'], args.threshold, args.min_ms)
+        print(f"\n{len(problems)} regression(s) against {args.baseline}")
+        for problem in problems:
+            print("  ", problem)
+
+    failed = [name for name, stats in results.items() if stats['failures']]
+    sys.exit(1 if problems or failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    In-process cache with per-entry TTL and LRU eviction once `max_entries`
+    is reached. Thread-safe; `get()` returns None on a miss or expired entry.
+    """
+
+    def __init__(self, ttl=30, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RedisCache:
+    """
+    Cache shared by all workers, backed by Redis (needs the optional `redis`
+    package). Keys live under `namespace`; `clear()` bumps a generation counter
+    instead of scanning, so stale entries simply age out through their TTL.
+    """
+
+    def __init__(self, url, namespace, ttl=30):
+        import redis  # optional dependency
+
+        self._redis = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        generation = int(self._redis.get(f"{self.namespace}:gen") or 0)
+        return f"{self.namespace}:{generation}:{key}"
+
+    def get(self, key):
+        raw = self._redis.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(self._key(key), pickle.dumps(value), ex=int(self.ttl if ttl is None else ttl))
+
+    def delete(self, key):
+        self._redis.delete(self._key(key))
+
+    def clear(self):
+        self._redis.incr(f"{self.namespace}:gen")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class NullCache:
+    """Cache that never stores anything (CACHE_BACKEND=null)."""
+
+    hits = misses = 0
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"backend": "null"}
+
+
+def make_cache(config, namespace, ttl=None, max_entries=None):
+    """
+    Build the cache configured by CACHE_BACKEND ('memory', 'redis' or 'null').
+    `ttl`/`max_entries` override CACHE_TTL/CACHE_MAX_ENTRIES for this cache.
+    """
+    backend = config['CACHE_BACKEND']
+    ttl = config['CACHE_TTL'] if ttl is None else ttl
+    if backend == 'null':
+        return NullCache()
+    if backend == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'], namespace=f"demograph:{namespace}", ttl=ttl)
+    return TTLCache(ttl=ttl, max_entries=config['CACHE_MAX_ENTRIES'] if max_entries is None else max_entries)
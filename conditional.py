@@ -0,0 +1,138 @@
+"""
+Conditional GET and response compression.
+
+Views decorated with `@etag_from(validator)` get a weak ETag derived from
+`validator(**view_args)` (a cheap data version such as
+models.table_version()), the signed-in user, the full URL and a fingerprint
+of the templates. A matching If-None-Match is answered with 304 from a
+before_request hook, so neither the view's queries nor template rendering
+run. Validators only run once the request is allowed to see the view: for
+signed-in users, and for admins on @admin_required views.
+
+Validators are blocking calls. The async views of asgi.py mark their
+requests with ASYNC_VIEW so the hook skips them; asgi.py awaits an async
+validator of its own and passes its value to check(), so both serving modes
+send the same ETags.
+
+Responses of a compressible type and at least COMPRESS_MIN_SIZE bytes are
+compressed with the best encoding the client accepts: brotli (needs the
+optional `brotli` package) or gzip. Streamed responses and ones that already
+carry a Content-Encoding (exports) are left alone.
+"""
+import gzip
+import hashlib
+import os
+
+from flask import current_app, g, request, session
+from flask_login import current_user
+
+from decorators import is_admin
+
+VALIDATORS = {}  # view function name (= endpoint) -> validator
+ASYNC_VIEW = 'demograph.async_view'  # WSGI environ key set by asgi.py
+
+COMPRESSIBLE = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript',
+    'application/json', 'application/javascript', 'application/x-ndjson', 'image/svg+xml',
+}
+
+
+def etag_from(validator):
+    """Register `validator(**view_args) -> str` for this view's ETag."""
+    def decorate(view):
+        VALIDATORS[view.__name__] = validator
+        return view
+    return decorate
+
+
+def _templates_fingerprint(app):
+    """Changes when any template changes, so a deploy never answers 304 with stale markup."""
+    digest = hashlib.sha1(app.config['ETAG_SALT'].encode())
+    root = os.path.join(app.root_path, app.template_folder)
+    for folder, _, files in sorted(os.walk(root)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(folder, name))
+            digest.update(f"{folder}/{name}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()[:12]
+
+
+def cacheable():
+    """Whether the current request may get an ETag, checked before running its validator."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if not current_user.is_authenticated or session.get('_flashes'):
+        return False  # pending flash messages are rendered into the page
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, 'admin_only', False) and not is_admin():
+        return False  # admin_required turns these away; don't query for them
+    return True
+
+
+def check(value):
+    """
+    Record the ETag for the validator value `value` in g.etag. Returns a 304
+    response if the client already has it, else None.
+    """
+    parts = (
+        current_app.extensions['etag_fingerprint'],
+        request.full_path,
+        f"{current_user.id}:{current_user.role}:{current_user.name}:{current_user.profile_photo}",
+        value,
+    )
+    etag = hashlib.sha1(repr(parts).encode()).hexdigest()
+    g.etag = etag
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+
+def _negotiate(accepted, brotli):
+    """'br', 'gzip' or None, honouring q-values in Accept-Encoding."""
+    offers = (['br'] if brotli else []) + ['gzip']
+    return accepted.best_match(offers)
+
+
+def init_app(app):
+    config = app.config
+    app.extensions['etag_fingerprint'] = _templates_fingerprint(app)
+    try:
+        import brotli  # optional dependency
+    except ImportError:
+        brotli = None
+
+    @app.before_request
+    def _check_etag():
+        validator = VALIDATORS.get(request.endpoint)
+        if validator is None or request.environ.get(ASYNC_VIEW) or not cacheable():
+            return None
+        return check(validator(**(request.view_args or {})))
+
+    @app.after_request
+    def _finish_response(response):
+        etag = g.get('etag')
+        if etag and response.status_code == 200:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+
+        if (not config['COMPRESS_RESPONSES'] or response.status_code != 200
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = _negotiate(request.accept_encodings, brotli)
+        if encoding == 'br':
+            response.set_data(brotli.compress(body, quality=config['COMPRESS_BROTLI_QUALITY']))
+        elif encoding == 'gzip':
+            response.set_data(gzip.compress(body, compresslevel=config['COMPRESS_LEVEL']))
+        else:
+            return response
+        response.headers['Content-Encoding'] = encoding
+        return response
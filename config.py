@@ -6,8 +6,106 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
     MYSQL_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")
+    MYSQL_PORT = int(os.getenv("MYSQL_PORT", 3306))
     MYSQL_USER = os.getenv("MYSQL_USER", "root")
     MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
     MYSQL_DB = os.getenv("MYSQL_DB", "demograph")
     UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "static/uploads/profiles")
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 5 * 1024 * 1024))  # 5 MB
+
+    # DB connection pool (one connection is borrowed per request)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))            # seconds to wait for a free connection
+    DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", 30))  # ping idle connections older than this
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))            # reopen connections older than this
+
+    # Read replicas: "host[:port],host[:port]" (same user/password/db as the primary); empty = primary only
+    MYSQL_REPLICAS = [h.strip() for h in os.getenv("MYSQL_REPLICAS", "").split(",") if h.strip()]
+    REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 5))  # seconds between health checks
+    REPLICA_MAX_LAG = int(os.getenv("REPLICA_MAX_LAG")) if os.getenv("REPLICA_MAX_LAG") else None  # seconds; unset = no lag check
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))  # reads stay on the primary after a write
+
+    # Admin listings (keyset pagination)
+    ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", 50))
+    ADMIN_MAX_PAGE_SIZE = int(os.getenv("ADMIN_MAX_PAGE_SIZE", 200))
+
+    # Caching: 'memory' (per worker, TTL + LRU), 'redis' (shared by workers) or 'null'
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_TTL = int(os.getenv("CACHE_TTL", 30))                 # seconds
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+    # Flask-Login user loader cache
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))       # seconds
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+    USER_SESSION_CACHE = os.getenv("USER_SESSION_CACHE", "1") == "1"  # keep the user record in the signed session
+    USER_SESSION_TTL = int(os.getenv("USER_SESSION_TTL", 60))    # seconds before the session copy is re-read
+
+    # Bulk import (flask import-forms / POST /admin/forms/import)
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+    # Query profiling
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))     # statements at/above this go to the slow-query log
+    QUERY_PROFILE_HEADERS = os.getenv("QUERY_PROFILE_HEADERS", "0") == "1"  # add X-Query-Count / Server-Timing
+    PROFILE_SAMPLES = int(os.getenv("PROFILE_SAMPLES", 1000))  # latency samples kept per endpoint
+
+    # Profile photo pipeline (images.py)
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+    IMAGE_THUMB_SIZES = tuple(int(s) for s in os.getenv("IMAGE_THUMB_SIZES", "64,128,256").split(","))
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))  # reject decompression bombs
+
+    # /uploads caching and offloading
+    UPLOADS_IMMUTABLE_MAX_AGE = int(os.getenv("UPLOADS_IMMUTABLE_MAX_AGE", 365 * 24 * 3600))  # content-hash names
+    UPLOADS_MAX_AGE = int(os.getenv("UPLOADS_MAX_AGE", 3600))                                 # legacy names
+    UPLOADS_ACCEL_REDIRECT = os.getenv("UPLOADS_ACCEL_REDIRECT", "")  # e.g. "/protected-uploads" (nginx internal location)
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "0") == "1"          # Apache/lighttpd mod_xsendfile
+
+    # Password hashing pool and auth rate limits ("attempts/seconds")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 16))   # max queued+running hashes per worker
+    AUTH_RATE_PER_IP = os.getenv("AUTH_RATE_PER_IP", "20/60")
+    AUTH_RATE_PER_EMAIL = os.getenv("AUTH_RATE_PER_EMAIL", "5/60")
+    AUTH_RATE_MAX_KEYS = int(os.getenv("AUTH_RATE_MAX_KEYS", 100_000))
+    TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))  # reverse proxies in front (e.g. 1 behind nginx); 0 = none
+
+    # Live dashboard events (events.py); use "redis" when running several workers
+    EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory")     # "memory" or "redis"
+    EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0"))
+    EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))  # pending events per client before it must resync
+
+    # ASGI mode (asgi.py + async_models.py)
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", 20))  # aiomysql connections per worker process
+
+    # Batch admin actions (POST /admin/batch/<kind>)
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 500))  # rows locked and committed per transaction
+
+    # Aadhaar/PAN blind indexes and encryption (identifiers.py)
+    # HMAC key; set it in production. Empty = derived from SECRET_KEY (logs a warning).
+    # Changing it (or SECRET_KEY while it is derived) needs `flask backfill-identifiers`.
+    BLIND_INDEX_KEY = os.getenv("BLIND_INDEX_KEY", "")
+    IDENTIFIER_ENCRYPTION_KEY = os.getenv("IDENTIFIER_ENCRYPTION_KEY", "")  # Fernet key; empty = store plaintext
+    IDENTIFIER_CHECK_RATE = os.getenv("IDENTIFIER_CHECK_RATE", "30/60")    # duplicate checks per user
+
+    # Template caching (fragments.py): compiled bytecode on disk, {% cache %} fragments
+    JINJA_BYTECODE_CACHE = os.getenv("JINJA_BYTECODE_CACHE", "1") == "1"
+    JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR", "")  # empty = Jinja's private per-user temp dir
+    FRAGMENT_CACHE_TTL = int(os.getenv("FRAGMENT_CACHE_TTL", 300))    # seconds; entries are also dropped on every write
+    FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", 512))
+
+    # Conditional GET and compression (conditional.py)
+    ETAG_SALT = os.getenv("ETAG_SALT", "")                            # e.g. the release id; changes every ETag
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "1") == "1"  # off when a proxy compresses instead
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))     # bytes; smaller bodies are sent as-is
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))              # gzip 1-9
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))  # brotli 0-11
+
+    # Archival of closed forms and tickets (archive.py, `flask archive`)
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 180))          # closed and untouched this long
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))          # rows moved per transaction
+    ARCHIVE_PAUSE_SECONDS = float(os.getenv("ARCHIVE_PAUSE_SECONDS", 0.2))  # sleep between batches
+    ARCHIVE_PARTITIONS_AHEAD = int(os.getenv("ARCHIVE_PARTITIONS_AHEAD", 3))  # monthly partitions created in advance
+
+    # Columnar analytics snapshots (snapshots.py / analytics.py, needs numpy)
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")                      # empty = off
+    SNAPSHOT_RELOAD_SECONDS = int(os.getenv("SNAPSHOT_RELOAD_SECONDS", 30))  # how often workers look for a newer one
+    SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", 2))                         # generations kept on disk
@@ -1,13 +1,31 @@
 from functools import wraps
-from flask import redirect, url_for, flash
+from flask import redirect, url_for, flash, g
 from flask_login import current_user, login_required
 
+import models
+
+
+def is_admin():
+    """
+    Whether the current user is an admin right now. The session copy and the
+    user cache can be minutes old either way (a promotion from another process
+    never clears this worker's cache), so the role is always re-read from the
+    primary, once per request.
+    """
+    if not current_user.is_authenticated:
+        return False
+    if '_is_admin' not in g:
+        g._is_admin = models.get_user_role(current_user.id) == 'admin'
+    return g._is_admin
+
+
 def admin_required(func):
     @wraps(func)
     @login_required
     def wrapper(*args, **kwargs):
-        if getattr(current_user, 'role', None) != 'admin':
+        if not is_admin():
             flash("Admin access required.", "danger")
             return redirect(url_for("user_dashboard"))
         return func(*args, **kwargs)
+    wrapper.admin_only = True  # conditional.py: no ETag work for non-admins
     return wrapper
@@ -36,7 +36,7 @@ CREATE TABLE `tickets` (
   `status` enum('open','in_progress','resolved') DEFAULT 'open',
   `admin_response` text DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
-  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp()
+  `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6) ON UPDATE current_timestamp(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- --------------------------------------------------------
@@ -69,8 +69,10 @@ CREATE TABLE `user_forms` (
   `age` int(11) DEFAULT NULL,
   `gender` enum('male','female','other') DEFAULT NULL,
   `dob` date DEFAULT NULL,
-  `aadhar_number` varchar(12) DEFAULT NULL,
-  `pan_number` varchar(10) DEFAULT NULL,
+  `aadhar_number` varchar(255) DEFAULT NULL,
+  `pan_number` varchar(255) DEFAULT NULL,
+  `aadhar_bidx` binary(16) DEFAULT NULL,
+  `pan_bidx` binary(16) DEFAULT NULL,
   `qualification` varchar(100) DEFAULT NULL,
   `university` varchar(150) DEFAULT NULL,
   `passing_year` year(4) DEFAULT NULL,
@@ -85,9 +87,118 @@ CREATE TABLE `user_forms` (
   `status` enum('pending','in_review','completed','rejected') DEFAULT 'pending',
   `admin_remark` text DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
-  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp()
+  `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6) ON UPDATE current_timestamp(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+--
+-- Demographic rollups (see rollups.py)
+--
+
+CREATE TABLE `rollup_watermarks` (
+  `name` varchar(64) NOT NULL,
+  `last_updated_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `rollup_forms_demographics` (
+  `day` date NOT NULL,
+  `state` varchar(100) NOT NULL DEFAULT '',
+  `gender` varchar(10) NOT NULL DEFAULT '',
+  `age_band` varchar(10) NOT NULL DEFAULT '',
+  `marital_status` varchar(10) NOT NULL DEFAULT '',
+  `status` varchar(20) NOT NULL DEFAULT '',
+  `forms` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`,`state`,`gender`,`age_band`,`marital_status`,`status`),
+  KEY `idx_rollup_demo_state` (`state`,`day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `rollup_forms_education` (
+  `day` date NOT NULL,
+  `state` varchar(100) NOT NULL DEFAULT '',
+  `qualification` varchar(100) NOT NULL DEFAULT '',
+  `passing_year` smallint(6) NOT NULL DEFAULT 0,
+  `gender` varchar(10) NOT NULL DEFAULT '',
+  `forms` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`,`state`,`qualification`,`passing_year`,`gender`),
+  KEY `idx_rollup_edu_qualification` (`qualification`,`day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+--
+-- Archives of closed forms and tickets (see archive.py)
+--
+
+CREATE TABLE `user_forms_archive` (
+  `id` int(11) NOT NULL,
+  `user_id` int(11) NOT NULL,
+  `full_name` varchar(100) DEFAULT NULL,
+  `phone` varchar(15) DEFAULT NULL,
+  `age` int(11) DEFAULT NULL,
+  `gender` enum('male','female','other') DEFAULT NULL,
+  `dob` date DEFAULT NULL,
+  `aadhar_number` varchar(255) DEFAULT NULL,
+  `pan_number` varchar(255) DEFAULT NULL,
+  `aadhar_bidx` binary(16) DEFAULT NULL,
+  `pan_bidx` binary(16) DEFAULT NULL,
+  `qualification` varchar(100) DEFAULT NULL,
+  `university` varchar(150) DEFAULT NULL,
+  `passing_year` year(4) DEFAULT NULL,
+  `father_name` varchar(100) DEFAULT NULL,
+  `mother_name` varchar(100) DEFAULT NULL,
+  `family_members` int(11) DEFAULT NULL,
+  `marital_status` enum('single','married') DEFAULT NULL,
+  `address` text DEFAULT NULL,
+  `city` varchar(100) DEFAULT NULL,
+  `state` varchar(100) DEFAULT NULL,
+  `pincode` varchar(10) DEFAULT NULL,
+  `status` enum('pending','in_review','completed','rejected') DEFAULT 'pending',
+  `admin_remark` text DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6),
+  `archived_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`,`created_at`),
+  KEY `idx_forms_archive_user_created_at` (`user_id`,`created_at`),
+  KEY `idx_forms_archive_created_at` (`created_at`),
+  KEY `idx_forms_archive_status_created_at` (`status`,`created_at`),
+  KEY `idx_forms_archive_aadhar_bidx` (`aadhar_bidx`,`user_id`),
+  KEY `idx_forms_archive_pan_bidx` (`pan_bidx`,`user_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(`created_at`)) (
+  PARTITION `p_old` VALUES LESS THAN (1735689600),  -- 2025-01-01 00:00:00 UTC
+  PARTITION `pmax` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE `tickets_archive` (
+  `id` int(11) NOT NULL,
+  `user_id` int(11) NOT NULL,
+  `form_id` int(11) NOT NULL,
+  `subject` varchar(200) NOT NULL,
+  `message` text NOT NULL,
+  `status` enum('open','in_progress','resolved') DEFAULT 'open',
+  `admin_response` text DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6),
+  `archived_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`,`created_at`),
+  KEY `idx_tickets_archive_user_created_at` (`user_id`,`created_at`),
+  KEY `idx_tickets_archive_form` (`form_id`),
+  KEY `idx_tickets_archive_created_at` (`created_at`),
+  KEY `idx_tickets_archive_status_created_at` (`status`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(`created_at`)) (
+  PARTITION `p_old` VALUES LESS THAN (1735689600),  -- 2025-01-01 00:00:00 UTC
+  PARTITION `pmax` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE `archive_counts` (
+  `kind` varchar(10) NOT NULL,
+  `day` date NOT NULL,
+  `status` varchar(20) NOT NULL,
+  `count` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`kind`,`day`,`status`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Indexes for dumped tables
 --
@@ -99,6 +210,10 @@ ALTER TABLE `tickets`
   ADD PRIMARY KEY (`id`),
   ADD KEY `fk_ticket_user` (`user_id`),
   ADD KEY `idx_tickets_status` (`status`),
+  ADD KEY `idx_tickets_created_at` (`created_at`),
+  ADD KEY `idx_tickets_status_created_at` (`status`,`created_at`),
+  ADD KEY `idx_tickets_updated_at` (`updated_at`),
+  ADD FULLTEXT KEY `ft_tickets` (`subject`,`message`),
   ADD KEY `fk_ticket_form` (`form_id`);
 
 --
@@ -107,15 +222,23 @@ ALTER TABLE `tickets`
 ALTER TABLE `users`
   ADD PRIMARY KEY (`id`),
   ADD UNIQUE KEY `email` (`email`),
-  ADD KEY `idx_users_role` (`role`);
+  ADD KEY `idx_users_role` (`role`),
+  ADD KEY `idx_users_created_at` (`created_at`),
+  ADD KEY `idx_users_role_created_at` (`role`,`created_at`);
 
 --
 -- Indexes for table `user_forms`
 --
 ALTER TABLE `user_forms`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `fk_user_form` (`user_id`),
-  ADD KEY `idx_forms_status` (`status`);
+  ADD KEY `idx_forms_user_created_at` (`user_id`,`created_at`),
+  ADD KEY `idx_forms_status` (`status`),
+  ADD KEY `idx_forms_created_at` (`created_at`),
+  ADD KEY `idx_forms_status_created_at` (`status`,`created_at`),
+  ADD KEY `idx_forms_updated_at` (`updated_at`),
+  ADD KEY `idx_forms_aadhar_bidx` (`aadhar_bidx`,`user_id`),
+  ADD KEY `idx_forms_pan_bidx` (`pan_bidx`,`user_id`),
+  ADD FULLTEXT KEY `ft_user_forms` (`full_name`,`city`,`state`,`university`);
 
 --
 -- AUTO_INCREMENT for dumped tables
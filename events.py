@@ -0,0 +1,142 @@
+"""
+Live dashboard events.
+
+Writes in models.py publish small delta events after they commit, e.g.
+{"table": "forms", "from": "pending", "to": "completed", "date": "2026-01-11"}
+("from" is null for a newly created row; batch updates add a "count"). /api/admin/stream forwards them to
+every connected dashboard as Server-Sent Events, after one initial snapshot,
+so open admin tabs cause no DB load of their own.
+
+EVENTS_BACKEND=memory only reaches subscribers in the same worker process;
+with several workers use EVENTS_BACKEND=redis, which relays events through a
+Redis pub/sub channel to every worker.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+
+CHANNEL = 'demograph:events'
+MAX_RECONNECT_DELAY = 30  # seconds
+
+logger = logging.getLogger('demograph.events')
+
+
+class Broker:
+    """In-process fan-out of events to subscriber queues."""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def _deliver(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # a stalled client; tell it to resync instead of growing without bound
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait({'type': 'resync'})
+
+    def publish(self, event):
+        self._deliver(event)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class RedisBroker(Broker):
+    """Broker that relays events between workers through Redis pub/sub (needs `redis`)."""
+
+    def __init__(self, url, max_queue=100):
+        super().__init__(max_queue=max_queue)
+        import redis  # optional dependency
+
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+
+    def _listen(self):
+        # Runs for the life of the process: a dropped connection is retried
+        # with backoff, and subscribers resync since events were missed.
+        delay = 1
+        reconnecting = False
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                if reconnecting:
+                    self._deliver({'type': 'resync'})
+                delay = 1
+                for message in pubsub.listen():
+                    try:
+                        self._deliver(json.loads(message['data']))
+                    except (TypeError, ValueError):
+                        continue
+            except Exception as e:
+                logger.warning("Events listener lost Redis (%s); reconnecting in %ss", e, delay)
+            finally:
+                pubsub.close()
+            reconnecting = True
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def subscribe(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe()
+
+    def publish(self, event):
+        self._redis.publish(CHANNEL, json.dumps(event))
+
+
+def init_app(app):
+    config = app.config
+    if config['EVENTS_BACKEND'] == 'redis':
+        broker = RedisBroker(config['EVENTS_REDIS_URL'], max_queue=config['EVENTS_QUEUE_SIZE'])
+    else:
+        broker = Broker(max_queue=config['EVENTS_QUEUE_SIZE'])
+    app.extensions['events'] = broker
+
+
+def sse(event_type, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream(broker, q, snapshot, keepalive=15):
+    """
+    Generator for a text/event-stream body: the snapshot first, then deltas
+    as they arrive, with comment keep-alives so proxies keep the socket open.
+    `q` comes from broker.subscribe(), taken before the snapshot was built so
+    no change committed in between is lost; it is unsubscribed when the
+    stream ends.
+    """
+    try:
+        yield sse('snapshot', snapshot)
+        while True:
+            try:
+                event = q.get(timeout=keepalive)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield sse(event.get('type', 'delta'), {k: v for k, v in event.items() if k != 'type'})
+    finally:
+        broker.unsubscribe(q)
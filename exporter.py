@@ -0,0 +1,191 @@
+"""
+Streaming CSV/JSONL export of forms and tickets.
+
+Rows come from an unbuffered server-side cursor (SSDictCursor) on a dedicated
+pooled connection (a read replica when configured) and are encoded in small chunks, so memory stays flat no
+matter how many rows are exported and the first bytes go out immediately.
+
+Exports cover live rows only unless `include_archived` is set: forms and
+tickets moved out by archive.py are then read from the archive tables first,
+followed by the live ones, with an extra archived_at column. Both reads share
+one transaction snapshot.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+import MySQLdb.cursors
+
+import models
+
+FORM_COLUMNS = [
+    'id', 'user_id', 'user_email', 'full_name', 'phone', 'age', 'gender', 'dob',
+    'aadhar_number', 'pan_number', 'qualification', 'university', 'passing_year',
+    'father_name', 'mother_name', 'family_members', 'marital_status',
+    'address', 'city', 'state', 'pincode', 'status', 'admin_remark', 'created_at', 'updated_at',
+]
+TICKET_COLUMNS = [
+    'id', 'user_id', 'user_email', 'form_id', 'subject', 'message',
+    'status', 'admin_response', 'created_at', 'updated_at',
+]
+
+
+def _select(alias, columns):
+    return ", ".join("u.email AS user_email" if c == 'user_email' else f"{alias}.{c}" for c in columns)
+
+
+EXPORTS = {
+    'forms': {
+        'alias': 'uf',
+        'table': 'user_forms',
+        'columns': FORM_COLUMNS,
+        'query': "SELECT {select} FROM {table} uf {join} users u ON uf.user_id = u.id",
+        'statuses': ('pending', 'in_review', 'completed', 'rejected'),
+    },
+    'tickets': {
+        'alias': 't',
+        'table': 'tickets',
+        'columns': TICKET_COLUMNS,
+        'query': "SELECT {select} FROM {table} t {join} users u ON t.user_id = u.id",
+        'statuses': ('open', 'in_progress', 'resolved'),
+    },
+}
+ARCHIVED_COLUMN = 'archived_at'
+
+FETCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def columns(kind, include_archived=False):
+    """Output columns of an export."""
+    return EXPORTS[kind]['columns'] + ([ARCHIVED_COLUMN] if include_archived else [])
+
+
+def _queries(kind, include_archived):
+    """
+    SELECTs to run in order: the archive table's (when included), then the
+    live table's. Archive tables have no foreign keys, so their rows are
+    LEFT JOINed to users and kept (with an empty user_email) once the user
+    is deleted.
+    """
+    spec = EXPORTS[kind]
+    select = _select(spec['alias'], spec['columns'])
+    if not include_archived:
+        return [spec['query'].format(select=select, table=spec['table'], join="JOIN")]
+    return [
+        spec['query'].format(
+            select=f"{select}, {spec['alias']}.{ARCHIVED_COLUMN}", table=f"{spec['table']}_archive", join="LEFT JOIN"
+        ),
+        spec['query'].format(select=f"{select}, NULL AS {ARCHIVED_COLUMN}", table=spec['table'], join="JOIN"),
+    ]
+
+
+def iter_rows(kind, status=None, date_from=None, date_to=None, include_archived=False):
+    """
+    Yield export rows as dicts, in id order, filtered by status and an
+    optional [date_from, date_to) created_at range. With `include_archived`,
+    the archived rows come first, each table in id order; both are read from
+    one consistent snapshot, so a row archived meanwhile is exported once.
+    """
+    pool, conn = models.acquire_read()
+    finished = False
+    try:
+        if include_archived:
+            cur = conn.cursor()
+            cur.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+            cur.close()
+        for query in _queries(kind, include_archived):
+            yield from _iter_query(conn, kind, query, status, date_from, date_to)
+        finished = True
+    finally:
+        # An abandoned server-side cursor would have to drain every remaining
+        # row before the connection is usable again; just drop it instead.
+        pool.release(conn, broken=not finished)
+
+
+def _iter_query(conn, kind, query, status, date_from, date_to):
+    alias = EXPORTS[kind]['alias']
+    where, params = [], []
+    if status:
+        where.append(f"{alias}.status = %s")
+        params.append(status)
+    if date_from:
+        where.append(f"{alias}.created_at >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append(f"{alias}.created_at < %s")
+        params.append(date_to)
+
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {alias}.id"
+
+    cur = conn.cursor(MySQLdb.cursors.SSDictCursor)
+    cur.execute(query, params)
+    while True:
+        rows = cur.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        yield from (models.reveal_forms(rows) if kind == 'forms' else rows)
+    cur.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def encode_jsonl(rows):
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps(row, default=_json_default, ensure_ascii=False) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(parts).encode('utf-8')
+            parts, size = [], 0
+    yield ''.join(parts).encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a byte-chunk iterator into a single gzip stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(kind, fmt='csv', status=None, date_from=None, date_to=None, compress=False, include_archived=False):
+    """Return an iterator of response body bytes for the requested export."""
+    spec = EXPORTS.get(kind)
+    if spec is None:
+        raise ValueError(f"Unknown export: {kind}")
+    if status and status not in spec['statuses']:
+        raise ValueError(f"Unknown {kind} status: {status}")
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    rows = iter_rows(kind, status=status, date_from=date_from, date_to=date_to, include_archived=include_archived)
+    chunks = encode_csv(rows, columns(kind, include_archived)) if fmt == 'csv' else encode_jsonl(rows)
+    return gzip_chunks(chunks) if compress else chunks
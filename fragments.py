@@ -0,0 +1,83 @@
+"""
+Template caching: compiled bytecode on disk and a {% cache %} fragment tag.
+
+Every worker would otherwise compile each template from source on its first
+render; with JINJA_BYTECODE_CACHE on, compiled templates are written to disk
+once and loaded by later workers and restarts (Jinja checks the source
+checksum, so edited templates recompile). Cached bytecode is executed, so the
+directory must not be writable by anyone else: by default it is Jinja's own
+per-user temp directory (created 0700, ownership checked), and a configured
+JINJA_BYTECODE_CACHE_DIR is refused unless this process owns it and it is
+not group- or world-writable.
+
+    {% cache 'admin_tickets_rows', table_version('tickets'), request.query_string %}
+      ... expensive loop ...
+    {% endcache %}
+
+renders the body once per distinct key and serves the stored HTML until the
+key changes. Keys should include a data version (`table_version()`, see
+models.table_version) and anything else the body reads, such as query args.
+Fragments live in app.extensions['fragment_cache'] (CACHE_BACKEND, with
+FRAGMENT_CACHE_TTL) and are dropped on every write, together with the stats.
+"""
+import hashlib
+import os
+import stat
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+import models
+from cache import make_cache
+
+
+class FragmentCacheExtension(Extension):
+    """`{% cache key_part, ... %}body{% endcache %}`"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        cache = current_app.extensions['fragment_cache']
+        key = 'frag:' + hashlib.sha1(repr(parts).encode()).hexdigest()
+        html = cache.get(key)
+        if html is None:
+            html = caller()
+            cache.set(key, str(html))
+        return Markup(html)
+
+
+def _private_dir(path):
+    """Create `path` (0700) if needed; refuse it unless owned by us and writable by nobody else."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if (hasattr(os, 'getuid') and info.st_uid != os.getuid()) or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise RuntimeError(
+            f"JINJA_BYTECODE_CACHE_DIR {path} must be owned by this user and not group/world writable"
+        )
+    return path
+
+
+def init_app(app):
+    config = app.config
+    if config['JINJA_BYTECODE_CACHE']:
+        if config['JINJA_BYTECODE_CACHE_DIR']:
+            cache = FileSystemBytecodeCache(_private_dir(config['JINJA_BYTECODE_CACHE_DIR']))
+        else:
+            cache = FileSystemBytecodeCache()  # per-user temp dir, ownership checked by Jinja
+        app.jinja_env.bytecode_cache = cache
+    app.extensions['fragment_cache'] = make_cache(
+        config, 'fragments', ttl=config['FRAGMENT_CACHE_TTL'], max_entries=config['FRAGMENT_CACHE_SIZE']
+    )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    app.jinja_env.globals['table_version'] = models.table_version
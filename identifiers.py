@@ -0,0 +1,126 @@
+"""
+Aadhaar and PAN numbers on user_forms: blind indexes and optional encryption.
+
+Each identifier is normalised (spaces and hyphens dropped, PAN upper-cased),
+checked against FORMATS when submitted, and stored next to a blind index: the first 16 bytes of
+HMAC-SHA256(BLIND_INDEX_KEY, "<column>:<value>"), in aadhar_bidx / pan_bidx.
+Both are indexed together with user_id, so "is this number already on file
+for someone else?" is one index range lookup instead of a table scan, and
+never needs the raw value.
+
+With IDENTIFIER_ENCRYPTION_KEY set (a Fernet key, needs `cryptography`) the
+raw columns hold "enc1:<token>" ciphertext and are decrypted on read, which
+leaves the blind index as the only way to search by identifier. Existing
+rows are indexed (and encrypted) by `flask backfill-identifiers`.
+
+Set BLIND_INDEX_KEY explicitly in production. Without it the key is derived
+from SECRET_KEY, so rotating the session secret silently changes every blind
+index and duplicate checks find nothing until the backfill has been rerun
+(for user_forms and user_forms_archive). The same applies when
+BLIND_INDEX_KEY itself is rotated.
+"""
+import hashlib
+import hmac
+import logging
+import re
+
+from flask import current_app
+
+# raw column -> blind index column
+COLUMNS = {'aadhar_number': 'aadhar_bidx', 'pan_number': 'pan_bidx'}
+INDEX_BYTES = 16
+PREFIX = 'enc1:'
+
+_SEPARATORS = re.compile(r'[\s-]+')
+# what a normalised value must look like; this also keeps "enc1:" text out
+FORMATS = {
+    'aadhar_number': (re.compile(r'^\d{12}$'), "12 digits"),
+    'pan_number': (re.compile(r'^[A-Z]{5}\d{4}[A-Z]$'), "5 letters, 4 digits and a letter"),
+}
+
+logger = logging.getLogger('demograph.identifiers')
+
+
+def normalize(column, value):
+    """Canonical form of an identifier, or None if empty."""
+    if value is None:
+        return None
+    value = _SEPARATORS.sub('', str(value))
+    if column == 'pan_number':
+        value = value.upper()
+    return value or None
+
+
+def format_error(column, value):
+    """Why a submitted identifier is malformed, or None if it is valid or empty."""
+    value = normalize(column, value)
+    pattern, expected = FORMATS[column]
+    if value is None or pattern.match(value):
+        return None
+    return f"{column} must be {expected}"
+
+
+def malformed(data):
+    """Names of the identifier fields in dict-like `data` that are given but malformed."""
+    return [column for column in COLUMNS if format_error(column, data.get(column))]
+
+
+class Identifiers:
+    def __init__(self, index_key, encryption_key=None):
+        self.index_key = index_key
+        self.fernet = None
+        if encryption_key:
+            from cryptography.fernet import Fernet  # optional dependency
+            self.fernet = Fernet(encryption_key)
+
+    def index(self, column, value):
+        """Blind index bytes for a plaintext value, or None if empty."""
+        value = normalize(column, value)
+        if value is None:
+            return None
+        return hmac.new(self.index_key, f"{column}:{value}".encode(), hashlib.sha256).digest()[:INDEX_BYTES]
+
+    def seal(self, column, value):
+        """A plaintext value as stored: normalised, and encrypted when a key is configured."""
+        value = normalize(column, value)
+        if value is None or self.fernet is None:
+            return value
+        return PREFIX + self.fernet.encrypt(value.encode()).decode()
+
+    def reveal(self, value):
+        """Plaintext for a stored value; plaintext passes through unchanged."""
+        if not isinstance(value, str) or not value.startswith(PREFIX):
+            return value
+        if self.fernet is None:
+            raise RuntimeError("Encrypted identifiers found but IDENTIFIER_ENCRYPTION_KEY is not set")
+        return self.fernet.decrypt(value[len(PREFIX):].encode()).decode()
+
+    def needs_update(self, column, stored, index):
+        """True if a stored value or its blind index does not match the current keys."""
+        if self.index(column, self.reveal(stored)) != (bytes(index) if index is not None else None):
+            return True
+        if stored is None:
+            return False
+        if self.fernet is not None:
+            return not stored.startswith(PREFIX)
+        return stored != normalize(column, stored)
+
+
+def init_app(app):
+    config = app.config
+    key = config['BLIND_INDEX_KEY']
+    if key:
+        key = key.encode()
+    else:
+        # derived rather than reused, so the session key never indexes data directly
+        logger.warning(
+            "BLIND_INDEX_KEY is not set; deriving it from SECRET_KEY. Rotating SECRET_KEY will then "
+            "break Aadhaar/PAN duplicate checks until `flask backfill-identifiers` is rerun. "
+            "Set BLIND_INDEX_KEY in production."
+        )
+        key = hmac.new(config['SECRET_KEY'].encode(), b'blind-index', hashlib.sha256).digest()
+    app.extensions['identifiers'] = Identifiers(key, config['IDENTIFIER_ENCRYPTION_KEY'] or None)
+
+
+def get():
+    return current_app.extensions['identifiers']
@@ -0,0 +1,199 @@
+"""
+Profile photo upload pipeline.
+
+On the request thread an upload is only checked and hashed: Pillow reads the
+header to confirm it is a real image of an allowed format and size, and the
+bytes are written to `<UPLOAD_FOLDER>/.pending/<name>` under a content-hash
+name, so identical images are stored once. Everything expensive runs in a
+small thread pool afterwards: decoding, applying the EXIF orientation,
+re-encoding without EXIF/metadata into `<UPLOAD_FOLDER>/<name>`, and writing
+WebP thumbnails to `<UPLOAD_FOLDER>/thumbs/`.
+
+If a photo is requested before its job has finished, `ensure_processed()`
+runs the same job inline, so the original with its metadata is never served.
+A job that fails (e.g. a truncated file that passed the header check) is
+logged and its pending file removed; `avatar_filename()` then returns None
+and templates show the default avatar.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+# '<hash>.<ext>' originals and 'thumbs/<hash>_<size>.<ext>' thumbnails
+CONTENT_HASH_NAME = re.compile(r'^(?:thumbs/)?([0-9a-f]{32})(?:_\d+)?\.(?:jpg|png|gif|webp)$')
+
+logger = logging.getLogger('demograph.images')
+
+_executor = None
+_executor_lock = threading.Lock()
+_job_locks = {}
+
+
+class InvalidImage(ValueError):
+    """Raised when an upload is not an acceptable image."""
+
+
+def _pool(config):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config['IMAGE_WORKERS'], thread_name_prefix='image-worker'
+            )
+    return _executor
+
+
+def _paths(config, name):
+    folder = config['UPLOAD_FOLDER']
+    return os.path.join(folder, '.pending', name), os.path.join(folder, name), os.path.join(folder, 'thumbs')
+
+
+def content_hash(filename):
+    """The content hash embedded in a pipeline-generated filename, or None for legacy names."""
+    match = CONTENT_HASH_NAME.match(filename)
+    return match.group(1) if match else None
+
+
+def thumb_name(name, size, ext='webp'):
+    stem = name.rsplit('.', 1)[0]
+    return f"thumbs/{stem}_{size}.{ext}"
+
+
+def save_upload(file_storage, config):
+    """
+    Validate and store an uploaded photo; returns its content-hash filename.
+    Processing continues in the background. Raises InvalidImage.
+    """
+    data = file_storage.read()
+    if not data:
+        raise InvalidImage("Empty upload")
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            fmt = img.format
+            width, height = img.size
+            img.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise InvalidImage(f"Not a valid image: {e}")
+
+    if fmt not in FORMATS:
+        raise InvalidImage(f"Unsupported image format: {fmt}")
+    if width * height > config['IMAGE_MAX_PIXELS']:
+        raise InvalidImage("Image dimensions are too large")
+
+    name = f"{hashlib.sha256(data).hexdigest()[:32]}.{FORMATS[fmt]}"
+    pending, final, _ = _paths(config, name)
+    if os.path.exists(final):
+        return name
+
+    os.makedirs(os.path.dirname(pending), exist_ok=True)
+    tmp = f"{pending}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, pending)
+
+    config = dict(config)
+    future = _pool(config).submit(process, name, config)
+
+    def check(done):
+        if not done.cancelled() and done.exception() is not None:
+            _failed(name, config, done.exception())
+    future.add_done_callback(check)
+    return name
+
+
+def _failed(name, config, error):
+    """Log a failed job and drop its pending upload, so the avatar falls back to the default."""
+    logger.error("Processing upload %s failed: %r", name, error)
+    pending, _, _ = _paths(config, name)
+    try:
+        os.remove(pending)
+    except FileNotFoundError:
+        pass
+
+
+def _save(img, path, fmt):
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    options = {'optimize': True}
+    if fmt == 'JPEG':
+        options['quality'] = 85
+        options['progressive'] = True
+    elif fmt == 'WEBP':
+        options = {'quality': 80, 'method': 4}
+    img.save(tmp, fmt, **options)
+    os.replace(tmp, path)
+
+
+def process(name, config):
+    """
+    Strip metadata from the pending upload and generate thumbnails. Idempotent;
+    concurrent calls for the same name run once.
+    """
+    pending, final, thumbs = _paths(config, name)
+    folder = config['UPLOAD_FOLDER']
+    with _executor_lock:
+        lock = _job_locks.setdefault(name, threading.Lock())
+    try:
+        with lock:
+            if not os.path.exists(pending):
+                return
+
+            fmt = {v: k for k, v in FORMATS.items()}[name.rsplit('.', 1)[1]]
+            with Image.open(pending) as src:
+                img = ImageOps.exif_transpose(src)
+                if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    img = img.convert('RGBA')
+                # Copying only the pixel data drops EXIF, GPS, XMP and comments.
+                clean = Image.new(img.mode, img.size)
+                clean.paste(img)
+
+            _save(clean.convert('RGB') if fmt == 'JPEG' else clean, final, fmt)
+
+            os.makedirs(thumbs, exist_ok=True)
+            for size in config['IMAGE_THUMB_SIZES']:
+                thumb = ImageOps.fit(clean, (size, size), Image.LANCZOS)
+                _save(thumb, os.path.join(folder, thumb_name(name, size)), 'WEBP')
+
+            os.remove(pending)
+    finally:
+        with _executor_lock:
+            _job_locks.pop(name, None)
+
+
+def ensure_processed(name, config):
+    """Finish processing `name` inline if its background job has not run yet."""
+    pending, final, _ = _paths(config, name)
+    if not os.path.exists(final) and os.path.exists(pending):
+        try:
+            process(name, config)
+        except Exception as e:
+            _failed(name, config, e)
+
+
+def avatar_filename(name, size, config):
+    """
+    Filename to serve for a `size`px avatar: the smallest WebP thumbnail at
+    least that large, falling back to the original (e.g. legacy uploads).
+    None when there is no photo or its processing failed.
+    """
+    if not name:
+        return None
+    for thumb_size in sorted(config['IMAGE_THUMB_SIZES']):
+        if thumb_size >= size:
+            candidate = thumb_name(name, thumb_size)
+            if os.path.exists(os.path.join(config['UPLOAD_FOLDER'], candidate)):
+                return candidate
+            break
+    if content_hash(name):
+        pending, final, _ = _paths(config, name)
+        if not os.path.exists(final) and not os.path.exists(pending):
+            return None
+    return name
@@ -0,0 +1,280 @@
+"""
+Bulk import of demographic form records from CSV or JSONL.
+
+Rows are read lazily, validated in chunks and inserted with executemany(),
+one transaction per batch, so memory use stays flat however large the file is.
+The returned report includes `resume_offset`: the number of data rows already
+committed, which can be passed back as `start_at` to continue after a failure.
+"""
+import csv
+import io
+import json
+import time
+from collections import Counter
+from datetime import date, datetime
+from itertools import islice
+
+import identifiers
+import models
+
+# column -> (kind, constraint); kind is 'str' (max length), 'int' (min, max),
+# 'enum' (allowed values) or 'date'
+FORM_RULES = {
+    'user_id': ('int', (1, None)),
+    'full_name': ('str', 100),
+    'phone': ('str', 15),
+    'age': ('int', (0, 150)),
+    'gender': ('enum', ('male', 'female', 'other')),
+    'dob': ('date', None),
+    'aadhar_number': ('str', 12),
+    'pan_number': ('str', 10),
+    'qualification': ('str', 100),
+    'university': ('str', 150),
+    'passing_year': ('int', (1901, 2155)),
+    'father_name': ('str', 100),
+    'mother_name': ('str', 100),
+    'family_members': ('int', (0, 100)),
+    'marital_status': ('enum', ('single', 'married')),
+    'address': ('str', 65535),
+    'city': ('str', 100),
+    'state': ('str', 100),
+    'pincode': ('str', 10),
+    'status': ('enum', ('pending', 'in_review', 'completed', 'rejected')),
+}
+IMPORT_COLUMNS = ('user_id',) + models.FORM_FIELDS + ('status',)  # FORM_RULES has a rule for each
+INSERT_SQL = models.FORM_INSERT_SQL
+_FIELDS = slice(1, -1)  # FORM_FIELDS within a validated params tuple
+
+MAX_REPORTED_REJECTS = 100
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per record from a text stream in 'csv' or 'jsonl' format."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield {'__error__': f"invalid JSON: {e}"}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def validate_row(row):
+    """
+    Return (params tuple, None) for a valid record or (None, error message).
+    Empty strings become NULL; unknown columns are rejected.
+    """
+    if not isinstance(row, dict):
+        return None, f"expected a JSON object, got {type(row).__name__}"
+    if '__error__' in row:
+        return None, row['__error__']
+
+    unknown = set(row) - set(IMPORT_COLUMNS)
+    if unknown:
+        return None, f"unknown columns: {', '.join(sorted(map(str, unknown)))}"
+
+    params = []
+    for column in IMPORT_COLUMNS:
+        value = row.get(column)
+        if column in identifiers.COLUMNS:
+            value = identifiers.normalize(column, value)  # spaces and hyphens are fine, as on the web form
+        elif isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            if column == 'user_id':
+                return None, "user_id is required"
+            params.append('pending' if column == 'status' else None)
+            continue
+
+        kind, rule = FORM_RULES[column]
+        if kind == 'str':
+            value = str(value)
+            if len(value) > rule:
+                return None, f"{column} longer than {rule} characters"
+        elif kind == 'int':
+            # JSON numbers: int() would accept true and truncate 25.9
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                return None, f"{column} must be an integer"
+            try:
+                value = int(value)
+            except (TypeError, ValueError, OverflowError):
+                return None, f"{column} must be an integer"
+            low, high = rule
+            if value < low or (high is not None and value > high):
+                return None, f"{column} out of range"
+        elif kind == 'enum':
+            value = str(value).lower()
+            if value not in rule:
+                return None, f"{column} must be one of {', '.join(rule)}"
+        elif kind == 'date':
+            if not isinstance(value, date):
+                try:
+                    value = datetime.strptime(str(value), '%Y-%m-%d').date()
+                except ValueError:
+                    return None, f"{column} must be YYYY-MM-DD"
+        params.append(value)
+
+    for column in identifiers.COLUMNS:
+        error = identifiers.format_error(column, params[IMPORT_COLUMNS.index(column)])
+        if error:
+            return None, error
+    return tuple(params), None
+
+
+def _existing_user_ids(cur, user_ids):
+    if not user_ids:
+        return set()
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    cur.execute(f"SELECT id FROM users WHERE id IN ({placeholders})", tuple(user_ids))
+    return {row['id'] for row in cur.fetchall()}
+
+
+# (column, position of its blind index in an INSERT_SQL params tuple)
+_INDEX_POSITIONS = tuple(
+    (column, models.FORM_INSERT_COLUMNS.index(index_column))
+    for column, index_column in identifiers.COLUMNS.items()
+)
+
+
+def _check_identifiers(cur, stored):
+    """
+    Yield (offset, row, params, error) for each stored row, with an error for
+    an Aadhaar/PAN already on file for another user, or given by two
+    different users in this batch. One blind-index lookup per column per batch,
+    locked until the batch commits so a concurrent web save cannot claim the
+    same numbers in between.
+    """
+    owners = {}
+    for column, position in _INDEX_POSITIONS:
+        digests = {params[position] for _, _, params in stored if params[position] is not None}
+        owners[column] = models.identifier_owners(cur, identifiers.COLUMNS[column], digests, lock=True)
+
+    for at, row, params in stored:
+        error = None
+        for column, position in _INDEX_POSITIONS:
+            digest = params[position]
+            if digest is None:
+                continue
+            users = owners[column].setdefault(digest, set())
+            if users - {params[0]}:
+                error = f"{column} already registered to another user"
+                break
+        if error is None:
+            for column, position in _INDEX_POSITIONS:
+                if params[position] is not None:
+                    owners[column][params[position]].add(params[0])
+        yield at, row, params, error
+
+
+def import_forms(stream, fmt='csv', batch_size=1000, start_at=0, on_reject=None, on_progress=None):
+    """
+    Stream records from `stream` into user_forms.
+
+    `start_at` skips that many data rows (a previous report's `resume_offset`).
+    `on_reject(offset, row, error)` and `on_progress(report)` are optional hooks.
+    Returns the report dict.
+    """
+    report = {
+        'processed': 0,
+        'inserted': 0,
+        'rejected': 0,
+        'rejects': [],
+        'resume_offset': start_at,
+        'elapsed_seconds': 0.0,
+        'rows_per_second': 0.0,
+        'error': None,
+    }
+    started = time.monotonic()
+    offset = start_at
+    rows = islice(read_rows(stream, fmt), start_at, None)
+
+    def reject(at, row, error):
+        report['rejected'] += 1
+        if len(report['rejects']) < MAX_REPORTED_REJECTS:
+            report['rejects'].append({'offset': at, 'error': error})
+        if on_reject:
+            on_reject(at, row, error)
+
+    db = models.get_db()
+    cur = db.cursor()
+    try:
+        while True:
+            try:
+                chunk = list(islice(rows, batch_size))
+            except (csv.Error, UnicodeDecodeError) as e:
+                # earlier batches stay committed; the report says where to resume
+                report['error'] = f"rows after offset {offset} unreadable: {e}"
+                break
+            if not chunk:
+                break
+
+            # reported once the batch commits, so a resumed import does not repeat them
+            rejected = []
+            valid = []
+            for i, row in enumerate(chunk):
+                params, error = validate_row(row)
+                if error:
+                    rejected.append((offset + i, row, error))
+                else:
+                    valid.append((offset + i, row, params))
+
+            known = _existing_user_ids(cur, {params[0] for _, _, params in valid})
+            stored = []
+            for at, row, params in valid:
+                if params[0] in known:
+                    stored.append((at, row, (params[0],) + models.stored_form_values(params[_FIELDS]) + (params[-1],)))
+                else:
+                    rejected.append((at, row, f"user_id {params[0]} does not exist"))
+
+            batch = []
+            try:
+                # the checks lock; they and the insert are one transaction
+                for at, row, params, error in _check_identifiers(cur, stored):
+                    if error:
+                        rejected.append((at, row, error))
+                    else:
+                        batch.append(params)
+                if batch:
+                    cur.executemany(INSERT_SQL, batch)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                report['error'] = f"batch starting at row {offset} failed: {e}"
+                break
+
+            for at, row, error in rejected:
+                reject(at, row, error)
+            if batch:
+                # open dashboards count the new rows as they commit
+                models.invalidate_stats()
+                for status, count in Counter(params[-1] for params in batch).items():
+                    models.notify_change('forms', None, status, count=count)
+
+            offset += len(chunk)
+            report['processed'] += len(chunk)
+            report['inserted'] += len(batch)
+            report['resume_offset'] = offset
+            if on_progress:
+                on_progress(report)
+    finally:
+        cur.close()
+        db.close()
+        elapsed = time.monotonic() - started
+        report['elapsed_seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['processed'] / elapsed, 1) if elapsed else 0.0
+
+    return report
+
+
+def open_text(binary_stream):
+    """Wrap an uploaded/binary file object as UTF-8 text without reading it all."""
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
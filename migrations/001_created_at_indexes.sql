@@ -0,0 +1,9 @@
+-- Indexes backing the per-day aggregation in /api/admin/stats
+-- (GROUP BY DATE(created_at) over a created_at >= ? range).
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  ADD KEY `idx_forms_created_at` (`created_at`);
+
+ALTER TABLE `tickets`
+  ADD KEY `idx_tickets_created_at` (`created_at`);
@@ -0,0 +1,15 @@
+-- Indexes for the keyset-paginated admin listings, which page on
+-- ORDER BY created_at DESC, id DESC with an optional status/role filter.
+-- InnoDB secondary indexes carry the primary key, so (created_at) already
+-- covers (created_at, id).
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  ADD KEY `idx_forms_status_created_at` (`status`, `created_at`);
+
+ALTER TABLE `tickets`
+  ADD KEY `idx_tickets_status_created_at` (`status`, `created_at`);
+
+ALTER TABLE `users`
+  ADD KEY `idx_users_created_at` (`created_at`),
+  ADD KEY `idx_users_role_created_at` (`role`, `created_at`);
@@ -0,0 +1,35 @@
+-- Demographic rollup tables (see rollups.py) and the updated_at index that
+-- lets `flask refresh-rollups` find changed forms without a table scan.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  ADD KEY `idx_forms_updated_at` (`updated_at`);
+
+CREATE TABLE `rollup_watermarks` (
+  `name` varchar(64) NOT NULL,
+  `last_updated_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `rollup_forms_demographics` (
+  `day` date NOT NULL,
+  `state` varchar(100) NOT NULL DEFAULT '',
+  `gender` varchar(10) NOT NULL DEFAULT '',
+  `age_band` varchar(10) NOT NULL DEFAULT '',
+  `marital_status` varchar(10) NOT NULL DEFAULT '',
+  `status` varchar(20) NOT NULL DEFAULT '',
+  `forms` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`,`state`,`gender`,`age_band`,`marital_status`,`status`),
+  KEY `idx_rollup_demo_state` (`state`,`day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE `rollup_forms_education` (
+  `day` date NOT NULL,
+  `state` varchar(100) NOT NULL DEFAULT '',
+  `qualification` varchar(100) NOT NULL DEFAULT '',
+  `passing_year` smallint(6) NOT NULL DEFAULT 0,
+  `gender` varchar(10) NOT NULL DEFAULT '',
+  `forms` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`,`state`,`qualification`,`passing_year`,`gender`),
+  KEY `idx_rollup_edu_qualification` (`qualification`,`day`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,9 @@
+-- FULLTEXT indexes for /admin/search (see search.py).
+-- Building them on a large table takes a while; run outside peak hours.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  ADD FULLTEXT KEY `ft_user_forms` (`full_name`, `city`, `state`, `university`);
+
+ALTER TABLE `tickets`
+  ADD FULLTEXT KEY `ft_tickets` (`subject`, `message`);
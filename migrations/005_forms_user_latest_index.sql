@@ -0,0 +1,8 @@
+-- Newest-form-per-user lookups (models.create_or_update_form, the user
+-- dashboard) filter on user_id and order by created_at. The composite index
+-- also serves the fk_user_form foreign key, so the single-column one goes.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  ADD KEY `idx_forms_user_created_at` (`user_id`, `created_at`),
+  DROP KEY `fk_user_form`;
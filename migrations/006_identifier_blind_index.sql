@@ -0,0 +1,15 @@
+-- Blind indexes for Aadhaar/PAN duplicate checks (see identifiers.py).
+-- The raw columns are widened to hold "enc1:<token>" ciphertext when
+-- IDENTIFIER_ENCRYPTION_KEY is set. After applying, fill the new columns for
+-- existing rows with `flask backfill-identifiers` (chunked, resumable).
+-- Not unique: one applicant may repeat their own number across forms, so
+-- user_id is part of the key and "someone else has it" stays index-only.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  MODIFY `aadhar_number` varchar(255) DEFAULT NULL,
+  MODIFY `pan_number` varchar(255) DEFAULT NULL,
+  ADD COLUMN `aadhar_bidx` binary(16) DEFAULT NULL AFTER `pan_number`,
+  ADD COLUMN `pan_bidx` binary(16) DEFAULT NULL AFTER `aadhar_bidx`,
+  ADD KEY `idx_forms_aadhar_bidx` (`aadhar_bidx`, `user_id`),
+  ADD KEY `idx_forms_pan_bidx` (`pan_bidx`, `user_id`);
@@ -0,0 +1,7 @@
+-- Table versions for cached template fragments (models.table_version) read
+-- MAX(updated_at) and COUNT(*); user_forms already has idx_forms_updated_at,
+-- this lets tickets answer from one small index as well.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `tickets`
+  ADD KEY `idx_tickets_updated_at` (`updated_at`);
@@ -0,0 +1,85 @@
+-- Archive tables for closed forms and tickets (see archive.py), range
+-- partitioned by month of created_at. `flask archive` moves rows here in
+-- small batches so user_forms / tickets only hold live data and their
+-- indexes stay the same size as history grows.
+--
+-- The hot tables themselves are not partitioned: InnoDB does not allow
+-- foreign keys on partitioned tables, and user_forms / tickets carry them.
+-- The archives have none, so their primary key can include the partition
+-- column. Partition bounds are UNIX_TIMESTAMP(created_at) in UTC; only the
+-- catch-all partitions are created here, `flask archive-partitions` (also run
+-- by `flask archive`) splits pmax into monthly partitions ahead of time.
+--
+-- archive_counts keeps per-day, per-status totals of archived rows so the
+-- admin stats and charts still count them without reading the archives.
+-- Already included in demograph.sql for fresh installs.
+
+CREATE TABLE `user_forms_archive` (
+  `id` int(11) NOT NULL,
+  `user_id` int(11) NOT NULL,
+  `full_name` varchar(100) DEFAULT NULL,
+  `phone` varchar(15) DEFAULT NULL,
+  `age` int(11) DEFAULT NULL,
+  `gender` enum('male','female','other') DEFAULT NULL,
+  `dob` date DEFAULT NULL,
+  `aadhar_number` varchar(255) DEFAULT NULL,
+  `pan_number` varchar(255) DEFAULT NULL,
+  `aadhar_bidx` binary(16) DEFAULT NULL,
+  `pan_bidx` binary(16) DEFAULT NULL,
+  `qualification` varchar(100) DEFAULT NULL,
+  `university` varchar(150) DEFAULT NULL,
+  `passing_year` year(4) DEFAULT NULL,
+  `father_name` varchar(100) DEFAULT NULL,
+  `mother_name` varchar(100) DEFAULT NULL,
+  `family_members` int(11) DEFAULT NULL,
+  `marital_status` enum('single','married') DEFAULT NULL,
+  `address` text DEFAULT NULL,
+  `city` varchar(100) DEFAULT NULL,
+  `state` varchar(100) DEFAULT NULL,
+  `pincode` varchar(10) DEFAULT NULL,
+  `status` enum('pending','in_review','completed','rejected') DEFAULT 'pending',
+  `admin_remark` text DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `archived_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`,`created_at`),
+  KEY `idx_forms_archive_user_created_at` (`user_id`,`created_at`),
+  KEY `idx_forms_archive_created_at` (`created_at`),
+  KEY `idx_forms_archive_status_created_at` (`status`,`created_at`),
+  KEY `idx_forms_archive_aadhar_bidx` (`aadhar_bidx`,`user_id`),
+  KEY `idx_forms_archive_pan_bidx` (`pan_bidx`,`user_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(`created_at`)) (
+  PARTITION `p_old` VALUES LESS THAN (1735689600),  -- 2025-01-01 00:00:00 UTC
+  PARTITION `pmax` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE `tickets_archive` (
+  `id` int(11) NOT NULL,
+  `user_id` int(11) NOT NULL,
+  `form_id` int(11) NOT NULL,
+  `subject` varchar(200) NOT NULL,
+  `message` text NOT NULL,
+  `status` enum('open','in_progress','resolved') DEFAULT 'open',
+  `admin_response` text DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `archived_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`,`created_at`),
+  KEY `idx_tickets_archive_user_created_at` (`user_id`,`created_at`),
+  KEY `idx_tickets_archive_form` (`form_id`),
+  KEY `idx_tickets_archive_created_at` (`created_at`),
+  KEY `idx_tickets_archive_status_created_at` (`status`,`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(`created_at`)) (
+  PARTITION `p_old` VALUES LESS THAN (1735689600),  -- 2025-01-01 00:00:00 UTC
+  PARTITION `pmax` VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE `archive_counts` (
+  `kind` varchar(10) NOT NULL,
+  `day` date NOT NULL,
+  `status` varchar(20) NOT NULL,
+  `count` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`kind`,`day`,`status`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
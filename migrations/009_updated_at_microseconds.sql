@@ -0,0 +1,18 @@
+-- ETags and fragment keys (models.table_version / user_version) include
+-- MAX(updated_at); at one-second precision two edits in the same second
+-- left it unchanged and clients got a stale 304. Microsecond precision makes
+-- every edit move it. The archives keep the same column type so archived
+-- rows are copied unchanged.
+-- Already included in demograph.sql for fresh installs.
+
+ALTER TABLE `user_forms`
+  MODIFY `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6) ON UPDATE current_timestamp(6);
+
+ALTER TABLE `tickets`
+  MODIFY `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6) ON UPDATE current_timestamp(6);
+
+ALTER TABLE `user_forms_archive`
+  MODIFY `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6);
+
+ALTER TABLE `tickets_archive`
+  MODIFY `updated_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6);
@@ -1,25 +1,231 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
 import MySQLdb
 import MySQLdb.cursors
-from flask import current_app
+from flask import current_app, g, has_request_context, session
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
+import identifiers
+from cache import make_cache
+from pool import ConnectionPool, NoReplicaAvailable, ReplicaSet
+from profiler import ProfilingCursor, query_count  # noqa: F401  (query_count re-exported)
+
+logger = logging.getLogger('demograph.models')
+
 # ==========================
 # DATABASE CONNECTION
 # ==========================
-def get_db():
-    """
-    Return a new DB connection using DictCursor so fetchone()/fetchall() return dicts.
-    """
+def _connect(config, host=None, port=None):
     return MySQLdb.connect(
-        host=current_app.config['MYSQL_HOST'],
-        user=current_app.config['MYSQL_USER'],
-        passwd=current_app.config['MYSQL_PASSWORD'],
-        db=current_app.config['MYSQL_DB'],
+        host=host or config['MYSQL_HOST'],
+        port=port or config['MYSQL_PORT'],
+        user=config['MYSQL_USER'],
+        passwd=config['MYSQL_PASSWORD'],
+        db=config['MYSQL_DB'],
         cursorclass=MySQLdb.cursors.DictCursor
     )
 
 
+def _make_pool(config, host=None, port=None):
+    return ConnectionPool(
+        lambda: _connect(config, host, port),
+        max_size=config['DB_POOL_SIZE'],
+        timeout=config['DB_POOL_TIMEOUT'],
+        ping_interval=config['DB_POOL_PING_INTERVAL'],
+        recycle=config['DB_POOL_RECYCLE'],
+    )
+
+
+def init_app(app):
+    """
+    Create the connection pools for `app` (primary, plus read replicas when
+    MYSQL_REPLICAS is set) and register the teardown handler that hands the
+    request's connections back to them.
+    """
+    config = app.config
+    app.extensions['db_pool'] = _make_pool(config)
+    app.extensions['db_replicas'] = None
+    if config['MYSQL_REPLICAS']:
+        pools = []
+        for target in config['MYSQL_REPLICAS']:
+            host, _, port = target.partition(':')
+            pools.append((target, _make_pool(config, host, int(port) if port else None)))
+        app.extensions['db_replicas'] = ReplicaSet(
+            pools, check_interval=config['REPLICA_CHECK_INTERVAL'], max_lag=config['REPLICA_MAX_LAG']
+        )
+    app.extensions['stats_cache'] = make_cache(config, 'stats')
+    app.extensions['user_cache'] = make_cache(
+        config, 'users', ttl=config['USER_CACHE_TTL'], max_entries=config['USER_CACHE_SIZE']
+    )
+    app.teardown_appcontext(_release_db)
+
+
+class _RequestConnection:
+    """
+    Proxy around a pooled connection that is shared for the whole app context.
+    `close()` is a no-op so existing `db.close()` calls keep working; the real
+    connection goes back to the pool in the teardown handler.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return ProfilingCursor(self._conn.cursor(*args, **kwargs))
+
+    def commit(self):
+        self._conn.commit()
+        remember_write()
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def get_db():
+    """
+    Return the DB connection bound to the current request (DictCursor, so
+    fetchone()/fetchall() return dicts). The first call borrows one from the pool.
+    """
+    if 'db' not in g:
+        g.db = _RequestConnection(current_app.extensions['db_pool'].acquire())
+    return g.db
+
+
+def remember_write():
+    """
+    Note a commit, so this request and (for a while) this session read from
+    the primary. Views that commit while streaming their response must call
+    it before the response starts: by then the session cookie has been sent.
+    """
+    g.db_wrote = True
+    if has_request_context():
+        session['_wrote_at'] = time.time()
+
+
+def _reads_pinned_to_primary():
+    if g.get('db_wrote'):
+        return True
+    if not has_request_context():
+        return False
+    wrote_at = session.get('_wrote_at')
+    return wrote_at is not None and time.time() - wrote_at < current_app.config['READ_YOUR_WRITES_SECONDS']
+
+
+def get_read_db():
+    """
+    Connection for read-only queries. With MYSQL_REPLICAS set this is a
+    replica connection bound to the current request, except within
+    READ_YOUR_WRITES_SECONDS of a write by the same session (replicas may
+    not have applied it yet). Falls back to the primary when no replica is
+    healthy. Without replicas it is simply get_db().
+    """
+    replicas = current_app.extensions['db_replicas']
+    if replicas is None or _reads_pinned_to_primary():
+        return get_db()
+    if 'read_db' not in g:
+        try:
+            g.read_db = _RequestConnection(replicas.acquire())
+        except NoReplicaAvailable:
+            return get_db()
+    return g.read_db
+
+
+def acquire_read():
+    """
+    (pool, conn) for a dedicated read connection outside the request's
+    shared ones (e.g. streaming exports); hand it back with pool.release(conn).
+    """
+    replicas = current_app.extensions['db_replicas']
+    if replicas is not None and not _reads_pinned_to_primary():
+        try:
+            return replicas, replicas.acquire()
+        except NoReplicaAvailable:
+            pass
+    pool = current_app.extensions['db_pool']
+    return pool, pool.acquire()
+
+
+def _stats_cache():
+    return current_app.extensions['stats_cache']
+
+
+def _cache_fill_db():
+    """
+    Connection for queries whose result goes into the shared stats cache:
+    always the primary. Right after invalidate_stats() a lagging replica
+    would hand back pre-write counts, which would then be cached (and used
+    in ETags) for CACHE_TTL.
+    """
+    return get_db()
+
+
+def invalidate_stats():
+    """
+    Drop cached admin stats and rendered template fragments; called after
+    every write that changes forms or tickets.
+    """
+    _stats_cache().clear()
+    fragments = current_app.extensions.get('fragment_cache')
+    if fragments is not None:
+        fragments.clear()
+
+
+def _locked_row(cur, table, row_id, user_id=None):
+    """
+    {status, day, user_id} of a row (day is its created date), locked until
+    commit so the reported transition is exact; None if there is no such row.
+    With `user_id`, only a row owned by that user counts.
+    """
+    sql = f"SELECT status, DATE(created_at) AS day, user_id FROM {table} WHERE id=%s"
+    params = (row_id,)
+    if user_id is not None:
+        sql += " AND user_id=%s"
+        params += (user_id,)
+    cur.execute(sql + " FOR UPDATE", params)
+    return cur.fetchone()
+
+
+def _row_status(cur, table, row_id, user_id=None):
+    """(status, created day) of a locked row, or (None, None); see _locked_row()."""
+    row = _locked_row(cur, table, row_id, user_id)
+    return (row['status'], row['day']) if row else (None, None)
+
+
+def notify_change(table, old, new, day=None, count=1):
+    """
+    Publish a dashboard delta after commit (see events.py). `old` is None for
+    new rows; `day` is the row's created_at date (today for new rows);
+    `count` rows made the same transition (batch updates). The write has
+    already committed, so a failed publish is logged, never raised.
+    """
+    if old == new:
+        return
+    day = day or datetime.now().date()
+    event = {'table': table, 'from': old, 'to': new, 'date': day.strftime('%Y-%m-%d')}
+    if count != 1:
+        event['count'] = count
+    try:
+        current_app.extensions['events'].publish(event)
+    except Exception:
+        logger.exception("Could not publish dashboard event %s", event)
+
+
+def _release_db(exc=None):
+    broken = isinstance(exc, MySQLdb.OperationalError)
+    db = g.pop('db', None)
+    if db is not None:
+        current_app.extensions['db_pool'].release(db._conn, broken=broken)
+    read_db = g.pop('read_db', None)
+    if read_db is not None:
+        current_app.extensions['db_replicas'].release(read_db._conn, broken=broken)
+
+
 # ==========================
 # USER MODEL (Flask-Login)
 # ==========================
@@ -35,7 +241,13 @@ class User(UserMixin):
 # ==========================
 # USER OPERATIONS
 # ==========================
-def create_user(name, email, password, role='user', profile_photo=None):
+def create_user(name, email, password=None, role='user', profile_photo=None, password_hash=None):
+    """
+    Insert a user. Pass `password_hash` when the hash was already computed
+    (e.g. off-thread by security.PasswordHasher); otherwise `password` is hashed here.
+    """
+    if password_hash is None:
+        password_hash = generate_password_hash(password)
     db = get_db()
     cur = db.cursor()
     cur.execute(
@@ -43,9 +255,11 @@ def create_user(name, email, password, role='user', profile_photo=None):
         INSERT INTO users (name, email, password, role, profile_photo)
         VALUES (%s, %s, %s, %s, %s)
         """,
-        (name, email, generate_password_hash(password), role, profile_photo)
+        (name, email, password_hash, role, profile_photo)
     )
     db.commit()
+    invalidate_stats()
+    notify_change('users', None, role)
     cur.close()
     db.close()
 
@@ -60,16 +274,72 @@ def get_user_by_email(email):
     return user
 
 
+USER_BY_ID_SQL = "SELECT * FROM users WHERE id=%s"
+
+
 def get_user_by_id(user_id):
     db = get_db()
     cur = db.cursor()
-    cur.execute("SELECT * FROM users WHERE id=%s", (user_id,))
+    cur.execute(USER_BY_ID_SQL, (user_id,))
     user = cur.fetchone()
     cur.close()
     db.close()
     return user
 
 
+USER_SESSION_FIELDS = ('id', 'name', 'email', 'role', 'profile_photo')
+
+
+def get_user_cached(user_id):
+    """
+    Small user record (no password hash) for the Flask-Login user loader,
+    served from the user cache when possible.
+    """
+    cache = current_app.extensions['user_cache']
+    key = str(user_id)
+    row = cache.get(key)
+    if row is None:
+        full = get_user_by_id(user_id)
+        if not full:
+            return None
+        row = {field: full.get(field) for field in USER_SESSION_FIELDS}
+        cache.set(key, row)
+    return row
+
+
+def invalidate_user(user_id):
+    current_app.extensions['user_cache'].delete(str(user_id))
+
+
+USER_ROLE_SQL = "SELECT role FROM users WHERE id=%s"
+
+
+def get_user_role(user_id):
+    """
+    The user's current role read from the primary, bypassing the session copy
+    and the user cache; None once the user is gone. Used for admin checks.
+    """
+    db = get_db()
+    cur = db.cursor()
+    cur.execute(USER_ROLE_SQL, (user_id,))
+    row = cur.fetchone()
+    cur.close()
+    db.close()
+    return row['role'] if row else None
+
+
+def update_user_role(user_id, role):
+    db = get_db()
+    cur = db.cursor()
+    cur.execute("UPDATE users SET role=%s WHERE id=%s", (role, user_id))
+    db.commit()
+    cur.close()
+    db.close()
+    # Bump the cache generation rather than deleting one key: with the Redis
+    # backend that reaches every worker. Admin checks never trust the cache.
+    current_app.extensions['user_cache'].clear()
+
+
 def verify_password(hash_value, password):
     return check_password_hash(hash_value, password)
 
@@ -84,10 +354,11 @@ def update_profile_photo(user_id, filename):
     db.commit()
     cur.close()
     db.close()
+    invalidate_user(user_id)
 
 
 def get_all_users():
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("SELECT * FROM users ORDER BY created_at DESC")
     users = cur.fetchall()
@@ -99,184 +370,392 @@ def get_all_users():
 # ==========================
 # USER FORMS
 # ==========================
-def create_form(user_id, data):
+# Editable form columns, in the order every form statement below uses.
+FORM_FIELDS = (
+    'full_name', 'phone', 'age', 'gender', 'dob',
+    'aadhar_number', 'pan_number',
+    'qualification', 'university', 'passing_year',
+    'father_name', 'mother_name', 'family_members', 'marital_status',
+    'address', 'city', 'state', 'pincode',
+)
+# Stored with every save, derived from aadhar_number / pan_number (identifiers.py).
+FORM_INDEX_FIELDS = tuple(identifiers.COLUMNS.values())
+FORM_COLUMNS = FORM_FIELDS + FORM_INDEX_FIELDS
+FORM_INSERT_COLUMNS = ('user_id',) + FORM_COLUMNS + ('status',)
+# Every stored column, in the order user_forms and user_forms_archive share (archive.py).
+FORM_ROW_COLUMNS = ('id', 'user_id') + FORM_COLUMNS + ('status', 'admin_remark', 'created_at', 'updated_at')
+
+# Statement text is built once at import rather than on every save.
+FORM_INSERT_SQL = (
+    f"INSERT INTO user_forms ({', '.join(FORM_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(FORM_INSERT_COLUMNS))})"
+)
+_FORM_SET = ', '.join(f'{field}=%s' for field in FORM_COLUMNS)
+FORM_UPDATE_SQL = f"UPDATE user_forms SET {_FORM_SET}, status=%s WHERE id=%s"
+FORM_ADMIN_UPDATE_SQL = f"UPDATE user_forms SET {_FORM_SET}, status=%s, admin_remark=%s WHERE id=%s"
+# The user's row and their newest form (if any), locked: concurrent saves by
+# the same user wait here, and then see each other's committed rows.
+LATEST_FORM_FOR_UPDATE_SQL = """
+    SELECT u.id AS user_id, uf.id, uf.status, DATE(uf.created_at) AS day
+    FROM users u
+    LEFT JOIN user_forms uf ON uf.user_id = u.id
+    WHERE u.id=%s
+    ORDER BY uf.created_at DESC, uf.id DESC
+    LIMIT 1
+    FOR UPDATE
+"""
+
+
+def form_values(data):
+    """Values for FORM_COLUMNS from a dict-like `data`; missing keys become NULL."""
+    return stored_form_values(tuple(data.get(field) for field in FORM_FIELDS))
+
+
+_IDENTIFIER_POSITIONS = tuple((column, FORM_FIELDS.index(column)) for column in identifiers.COLUMNS)
+
+
+def stored_form_values(values):
     """
-    Insert a new user form.
-    `data` is a dict-like object with keys matching column names.
+    FORM_FIELDS values as saved: Aadhaar/PAN normalised (and encrypted when
+    configured), followed by their blind indexes in FORM_INDEX_FIELDS order.
     """
-    db = get_db()
+    ids = identifiers.get()
+    values = list(values)
+    indexes = []
+    for column, i in _IDENTIFIER_POSITIONS:
+        indexes.append(ids.index(column, values[i]))
+        values[i] = ids.seal(column, values[i])
+    return tuple(values) + tuple(indexes)
+
+
+def reveal_form(form):
+    """Decrypt a form row's identifiers in place and drop its blind index columns."""
+    if form:
+        ids = identifiers.get()
+        for column, index_column in identifiers.COLUMNS.items():
+            if column in form:
+                form[column] = ids.reveal(form[column])
+            form.pop(index_column, None)
+    return form
+
+
+def reveal_forms(forms):
+    for form in forms:
+        reveal_form(form)
+    return forms
+
+
+class IdentifierConflict(Exception):
+    """Raised when a saved form's Aadhaar/PAN number is on another user's form."""
+
+    def __init__(self, columns):
+        super().__init__(f"Already registered to another user: {', '.join(columns)}")
+        self.columns = columns
+
+
+def _identifier_conflicts(cur, data, user_id=None, lock=False):
+    """
+    Names of the identifier fields in `data` (aadhar_number, pan_number) that
+    already appear on a form of another user, or of any user when `user_id`
+    is None. Archived forms count too: a number stays taken after its form
+    is archived. One blind-index lookup per table and non-empty field.
+
+    With `lock`, the user_forms lookup is a locking read: InnoDB also locks
+    the gap where a matching row would go, so a concurrent transaction saving
+    the same number blocks until this one ends (or one of them is rolled back
+    as a deadlock and retried by _in_transaction()).
+    """
+    ids = identifiers.get()
+    conflicts = []
+    for column, index_column in identifiers.COLUMNS.items():
+        digest = ids.index(column, data.get(column))
+        if digest is None:
+            continue
+        if user_id is None:
+            owner, params = "", (digest,)
+        else:
+            owner, params = " AND user_id<>%s", (digest, user_id)
+        for table, suffix in (('user_forms', " FOR UPDATE" if lock else ""), ('user_forms_archive', "")):
+            cur.execute(f"SELECT 1 FROM {table} WHERE {index_column}=%s{owner} LIMIT 1{suffix}", params)
+            if cur.fetchone():
+                conflicts.append(column)
+                break
+    return conflicts
+
+
+def identifier_conflicts(data, user_id=None):
+    """
+    _identifier_conflicts() on a read connection, for advisory checks such as
+    inline form validation. Saves check again under lock (claim_identifiers).
+    """
+    db = get_read_db()
     cur = db.cursor()
-    cur.execute(
-        """
-        INSERT INTO user_forms (
-            user_id, full_name, phone, age, gender, dob,
-            aadhar_number, pan_number,
-            qualification, university, passing_year,
-            father_name, mother_name, family_members, marital_status,
-            address, city, state, pincode, status
-        ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """,
-        (
-            user_id,
-            data.get('full_name'), data.get('phone'), data.get('age'),
-            data.get('gender'), data.get('dob'),
-            data.get('aadhar_number'), data.get('pan_number'),
-            data.get('qualification'), data.get('university'), data.get('passing_year'),
-            data.get('father_name'), data.get('mother_name'),
-            data.get('family_members'), data.get('marital_status'),
-            data.get('address'), data.get('city'), data.get('state'), data.get('pincode'),
-            data.get('status') or 'pending'
-        )
-    )
-    db.commit()
+    conflicts = _identifier_conflicts(cur, data, user_id)
     cur.close()
     db.close()
+    return conflicts
+
+
+def claim_identifiers(cur, data, user_id):
+    """Inside a save transaction: lock `data`'s numbers or raise IdentifierConflict."""
+    conflicts = _identifier_conflicts(cur, data, user_id, lock=True)
+    if conflicts:
+        raise IdentifierConflict(conflicts)
+
 
+DEADLOCK = 1213
 
-def update_form_by_id(form_id, data):
+
+def _in_transaction(work, retries=1):
     """
-    Update an existing form by its ID.
+    Run `work(cur)` on the primary and commit, returning its result. A
+    deadlock rolls back and runs it again, up to `retries` times; any other
+    error rolls back and propagates.
     """
     db = get_db()
     cur = db.cursor()
-    cur.execute(
-        """
-        UPDATE user_forms SET
-            full_name=%s, phone=%s, age=%s, gender=%s, dob=%s,
-            aadhar_number=%s, pan_number=%s,
-            qualification=%s, university=%s, passing_year=%s,
-            father_name=%s, mother_name=%s, family_members=%s, marital_status=%s,
-            address=%s, city=%s, state=%s, pincode=%s,
-            status=%s
-        WHERE id=%s
-        """,
-        (
-            data.get('full_name'), data.get('phone'), data.get('age'),
-            data.get('gender'), data.get('dob'),
-            data.get('aadhar_number'), data.get('pan_number'),
-            data.get('qualification'), data.get('university'), data.get('passing_year'),
-            data.get('father_name'), data.get('mother_name'),
-            data.get('family_members'), data.get('marital_status'),
-            data.get('address'), data.get('city'), data.get('state'), data.get('pincode'),
-            data.get('status') or 'pending',
-            form_id
-        )
-    )
-    db.commit()
-    cur.close()
-    db.close()
+    try:
+        for attempt in range(retries + 1):
+            try:
+                result = work(cur)
+                db.commit()
+                return result
+            except MySQLdb.OperationalError as e:
+                db.rollback()
+                if e.args[0] != DEADLOCK or attempt == retries:
+                    raise
+            except Exception:
+                db.rollback()
+                raise
+    finally:
+        cur.close()
+        db.close()
 
 
-def create_or_update_form(user_id, data):
+def identifier_owners(cur, index_column, digests, lock=False):
     """
-    Backwards-compatible helper:
-    - If a form exists for the user (any), update the most recent one.
-    - Otherwise, create a new form.
+    {blind index: set of user ids} for the given digests of one index column,
+    archives included. With `lock`, the user_forms lookup is a locking read,
+    as in _identifier_conflicts(), so the numbers stay unclaimed by others
+    until the caller's transaction ends.
     """
+    owners = {}
+    if digests:
+        placeholders = ', '.join(['%s'] * len(digests))
+        for table, suffix in (('user_forms', " FOR UPDATE" if lock else ""), ('user_forms_archive', "")):
+            cur.execute(
+                f"SELECT {index_column} AS digest, user_id FROM {table} WHERE {index_column} IN ({placeholders}){suffix}",
+                tuple(digests)
+            )
+            for row in cur.fetchall():
+                owners.setdefault(bytes(row['digest']), set()).add(row['user_id'])
+    return owners
+
+
+BACKFILL_IDENTIFIERS_SQL = """
+    SELECT id, aadhar_number, pan_number, aadhar_bidx, pan_bidx
+    FROM {table}
+    WHERE id > %s
+    ORDER BY id
+    LIMIT %s
+    FOR UPDATE
+"""
+# updated_at=updated_at: a backfill is not an edit
+BACKFILL_IDENTIFIERS_UPDATE_SQL = """
+    UPDATE {table}
+    SET aadhar_number=%s, pan_number=%s, aadhar_bidx=%s, pan_bidx=%s, updated_at=updated_at
+    WHERE id=%s
+"""
+
+
+def backfill_form_identifiers(batch_size=1000, start_id=0, on_progress=None, table='user_forms'):
+    """
+    Bring every form's Aadhaar/PAN storage up to date with the current keys:
+    fill missing or stale blind indexes, normalise, and encrypt (or leave
+    plaintext) per IDENTIFIER_ENCRYPTION_KEY. Rows of `table` ('user_forms'
+    or 'user_forms_archive') are walked in id order, `batch_size` per
+    transaction; up-to-date rows are not rewritten.
+    Returns {'scanned', 'updated', 'last_id'}; pass last_id back as
+    `start_id` to resume.
+    """
+    if table not in ('user_forms', 'user_forms_archive'):
+        raise ValueError(f"Unsupported table for identifier backfill: {table}")
+    select_sql = BACKFILL_IDENTIFIERS_SQL.format(table=table)
+    update_sql = BACKFILL_IDENTIFIERS_UPDATE_SQL.format(table=table)
+    ids = identifiers.get()
+    report = {'scanned': 0, 'updated': 0, 'last_id': start_id}
     db = get_db()
     cur = db.cursor()
-    cur.execute("SELECT id FROM user_forms WHERE user_id=%s ORDER BY created_at DESC LIMIT 1", (user_id,))
-    exists = cur.fetchone()
-    if exists:
-        form_id = exists['id']
-        cur.execute(
-            """
-            UPDATE user_forms SET
-                full_name=%s, phone=%s, age=%s, gender=%s, dob=%s,
-                aadhar_number=%s, pan_number=%s,
-                qualification=%s, university=%s, passing_year=%s,
-                father_name=%s, mother_name=%s, family_members=%s, marital_status=%s,
-                address=%s, city=%s, state=%s, pincode=%s,
-                status='pending'
-            WHERE id=%s
-            """,
-            (
-                data.get('full_name'), data.get('phone'), data.get('age'),
-                data.get('gender'), data.get('dob'),
-                data.get('aadhar_number'), data.get('pan_number'),
-                data.get('qualification'), data.get('university'), data.get('passing_year'),
-                data.get('father_name'), data.get('mother_name'),
-                data.get('family_members'), data.get('marital_status'),
-                data.get('address'), data.get('city'), data.get('state'), data.get('pincode'),
-                form_id
-            )
-        )
+    try:
+        while True:
+            cur.execute(select_sql, (report['last_id'], batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                db.rollback()
+                break
+            updates = []
+            for row in rows:
+                if any(ids.needs_update(column, row[column], row[index_column])
+                       for column, index_column in identifiers.COLUMNS.items()):
+                    aadhar, pan = ids.reveal(row['aadhar_number']), ids.reveal(row['pan_number'])
+                    updates.append((
+                        ids.seal('aadhar_number', aadhar),
+                        ids.seal('pan_number', pan),
+                        ids.index('aadhar_number', aadhar),
+                        ids.index('pan_number', pan),
+                        row['id'],
+                    ))
+            if updates:
+                cur.executemany(update_sql, updates)
+            db.commit()
+            report['scanned'] += len(rows)
+            report['updated'] += len(updates)
+            report['last_id'] = rows[-1]['id']
+            if on_progress:
+                on_progress(report)
+    finally:
+        cur.close()
+        db.close()
+    return report
+
+
+def create_form(user_id, data):
+    """
+    Insert a new user form.
+    `data` is a dict-like object with keys matching column names.
+    Raises IdentifierConflict if its Aadhaar/PAN belongs to another user.
+    """
+    status = data.get('status') or 'pending'
+
+    def work(cur):
+        claim_identifiers(cur, data, user_id)
+        cur.execute(FORM_INSERT_SQL, (user_id,) + form_values(data) + (status,))
+    _in_transaction(work)
+    invalidate_stats()
+    notify_change('forms', None, status)
+
+
+def update_form_by_id(form_id, data, user_id=None, admin_remark=None):
+    """
+    Update an existing form by its ID. With `user_id`, only a form owned by
+    that user is touched. Its Aadhaar/PAN must not belong to anyone but the
+    form's owner, whoever edits it (IdentifierConflict); `admin_remark`, if
+    given, is saved in the same statement. Returns False if there is no such
+    form.
+    """
+    status = data.get('status') or 'pending'
+
+    def work(cur):
+        row = _locked_row(cur, 'user_forms', form_id, user_id)
+        if row is None:
+            return None
+        claim_identifiers(cur, data, row['user_id'])
+        if admin_remark is None:
+            cur.execute(FORM_UPDATE_SQL, form_values(data) + (status, form_id))
+        else:
+            cur.execute(FORM_ADMIN_UPDATE_SQL, form_values(data) + (status, admin_remark, form_id))
+        return row['status'], row['day']
+
+    saved = _in_transaction(work)
+    if saved is None:
+        return False
+    invalidate_stats()
+    notify_change('forms', saved[0], status, saved[1])
+    return True
+
+
+def create_or_update_form(user_id, data):
+    """
+    Save the user's form: update their most recent one (back to 'pending'),
+    or create one if they have none. Runs as one transaction with the user's
+    row locked, so concurrent submissions cannot both insert. Raises
+    IdentifierConflict if its Aadhaar/PAN belongs to another user.
+    """
+    def work(cur):
+        cur.execute(LATEST_FORM_FOR_UPDATE_SQL, (user_id,))
+        latest = cur.fetchone()
+        claim_identifiers(cur, data, user_id)
+        if latest and latest['id']:
+            cur.execute(FORM_UPDATE_SQL, form_values(data) + ('pending', latest['id']))
+        else:
+            cur.execute(FORM_INSERT_SQL, (user_id,) + form_values(data) + ('pending',))
+        return latest
+
+    latest = _in_transaction(work)
+    invalidate_stats()
+    if latest and latest['id']:
+        notify_change('forms', latest['status'], 'pending', latest['day'])
     else:
-        # Insert a new form
-        cur.execute(
-            """
-            INSERT INTO user_forms (
-                user_id, full_name, phone, age, gender, dob,
-                aadhar_number, pan_number,
-                qualification, university, passing_year,
-                father_name, mother_name, family_members, marital_status,
-                address, city, state, pincode, status
-            )
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """,
-            (
-                user_id,
-                data.get('full_name'), data.get('phone'), data.get('age'),
-                data.get('gender'), data.get('dob'),
-                data.get('aadhar_number'), data.get('pan_number'),
-                data.get('qualification'), data.get('university'), data.get('passing_year'),
-                data.get('father_name'), data.get('mother_name'),
-                data.get('family_members'), data.get('marital_status'),
-                data.get('address'), data.get('city'), data.get('state'), data.get('pincode'),
-                'pending'
-            )
-        )
-    db.commit()
-    cur.close()
-    db.close()
+        notify_change('forms', None, 'pending')
 
 
 def get_form_by_user(user_id):
     """
     Return the most recent form for a given user (or None).
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("SELECT * FROM user_forms WHERE user_id=%s ORDER BY created_at DESC LIMIT 1", (user_id,))
     form = cur.fetchone()
     cur.close()
     db.close()
-    return form
+    return reveal_form(form)
+
+
+FORMS_BY_USER_SQL = """
+    SELECT *
+    FROM user_forms
+    WHERE user_id=%s
+    ORDER BY created_at DESC
+"""
+_FORM_ROW_SELECT = ', '.join(FORM_ROW_COLUMNS)
+FORMS_BY_USER_WITH_ARCHIVE_SQL = f"""
+    SELECT {_FORM_ROW_SELECT}, NULL AS archived_at FROM user_forms WHERE user_id=%s
+    UNION ALL
+    SELECT {_FORM_ROW_SELECT}, archived_at FROM user_forms_archive WHERE user_id=%s
+    ORDER BY created_at DESC
+"""
 
 
-def get_all_forms_by_user(user_id):
+def get_all_forms_by_user(user_id, include_archived=False):
     """
     Fetch all forms submitted by a specific user, ordered newest-first.
+    With `include_archived`, archived forms are included (archived_at set).
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
-    cur.execute("""
-        SELECT *
-        FROM user_forms
-        WHERE user_id=%s
-        ORDER BY created_at DESC
-    """, (user_id,))
+    if include_archived:
+        cur.execute(FORMS_BY_USER_WITH_ARCHIVE_SQL, (user_id, user_id))
+    else:
+        cur.execute(FORMS_BY_USER_SQL, (user_id,))
     forms = cur.fetchall()
     cur.close()
     db.close()
-    return forms
+    return reveal_forms(forms)
 
 
-def get_form_by_id(form_id):
-    db = get_db()
+def get_form_by_id(form_id, include_archived=False):
+    """
+    A form by id, or None. With `include_archived`, a form that is not in
+    user_forms is looked up in the archive (the row then has archived_at).
+    """
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("SELECT * FROM user_forms WHERE id=%s", (form_id,))
     form = cur.fetchone()
+    if form is None and include_archived:
+        cur.execute("SELECT * FROM user_forms_archive WHERE id=%s", (form_id,))
+        form = cur.fetchone()
     cur.close()
     db.close()
-    return form
+    return reveal_form(form)
 
 
 def get_all_forms():
     """
     Admin: fetch all forms along with user name/email.
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("""
         SELECT uf.*, u.name AS user_name, u.email AS user_email
@@ -287,17 +766,21 @@ def get_all_forms():
     forms = cur.fetchall()
     cur.close()
     db.close()
-    return forms
+    return reveal_forms(forms)
 
 
 def update_form_status(form_id, status, remark):
     db = get_db()
     cur = db.cursor()
+    old_status, day = _row_status(cur, 'user_forms', form_id)
     cur.execute(
         "UPDATE user_forms SET status=%s, admin_remark=%s WHERE id=%s",
         (status, remark, form_id)
     )
     db.commit()
+    invalidate_stats()
+    if old_status:
+        notify_change('forms', old_status, status, day)
     cur.close()
     db.close()
 
@@ -332,40 +815,87 @@ def create_ticket(user_id, subject, message, form_id=None):
         (user_id, form_id, subject, message)
     )
     db.commit()
+    invalidate_stats()
+    notify_change('tickets', None, 'open')
     cur.close()
     db.close()
 
 
-def get_tickets_by_user(user_id):
+TICKET_ROW_COLUMNS = (
+    'id', 'user_id', 'form_id', 'subject', 'message', 'status', 'admin_response', 'created_at', 'updated_at',
+)
+_TICKET_ROW_SELECT = ', '.join(f't.{column}' for column in TICKET_ROW_COLUMNS)
+
+TICKETS_BY_USER_SQL = """
+    SELECT t.*, uf.full_name AS form_full_name, uf.id AS form_id
+    FROM tickets t
+    JOIN user_forms uf ON t.form_id = uf.id
+    WHERE t.user_id=%s
+    ORDER BY t.created_at DESC
+"""
+# An archived ticket's form may be live or archived itself.
+TICKETS_BY_USER_WITH_ARCHIVE_SQL = f"""
+    SELECT {_TICKET_ROW_SELECT}, NULL AS archived_at, uf.full_name AS form_full_name
+    FROM tickets t
+    JOIN user_forms uf ON t.form_id = uf.id
+    WHERE t.user_id=%s
+    UNION ALL
+    SELECT {_TICKET_ROW_SELECT}, t.archived_at, COALESCE(uf.full_name, ufa.full_name)
+    FROM tickets_archive t
+    LEFT JOIN user_forms uf ON t.form_id = uf.id
+    LEFT JOIN user_forms_archive ufa ON t.form_id = ufa.id
+    WHERE t.user_id=%s
+    ORDER BY created_at DESC
+"""
+
+
+def get_tickets_by_user(user_id, include_archived=False):
     """
     Get tickets for a user, including the associated form's basic info.
+    With `include_archived`, archived tickets are included (archived_at set).
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
-    cur.execute("""
-        SELECT t.*, uf.full_name AS form_full_name, uf.id AS form_id
-        FROM tickets t
-        JOIN user_forms uf ON t.form_id = uf.id
-        WHERE t.user_id=%s
-        ORDER BY t.created_at DESC
-    """, (user_id,))
+    if include_archived:
+        cur.execute(TICKETS_BY_USER_WITH_ARCHIVE_SQL, (user_id, user_id))
+    else:
+        cur.execute(TICKETS_BY_USER_SQL, (user_id,))
     tickets = cur.fetchall()
     cur.close()
     db.close()
     return tickets
 
 
-def get_ticket_by_id(ticket_id):
-    db = get_db()
+TICKET_BY_ID_SQL = """
+    SELECT t.*, u.name AS user_name, u.email AS user_email, uf.full_name AS form_full_name, uf.id AS form_id
+    FROM tickets t
+    JOIN users u ON t.user_id = u.id
+    JOIN user_forms uf ON t.form_id = uf.id
+    WHERE t.id=%s
+"""
+ARCHIVED_TICKET_BY_ID_SQL = """
+    SELECT t.*, u.name AS user_name, u.email AS user_email,
+           COALESCE(uf.full_name, ufa.full_name) AS form_full_name
+    FROM tickets_archive t
+    LEFT JOIN users u ON t.user_id = u.id
+    LEFT JOIN user_forms uf ON t.form_id = uf.id
+    LEFT JOIN user_forms_archive ufa ON t.form_id = ufa.id
+    WHERE t.id=%s
+"""
+
+
+def get_ticket_by_id(ticket_id, include_archived=False):
+    """
+    A ticket with its user and form names, or None. With `include_archived`,
+    a ticket that is not in tickets is looked up in the archive.
+    """
+    db = get_read_db()
     cur = db.cursor()
-    cur.execute("""
-        SELECT t.*, u.name AS user_name, u.email AS user_email, uf.full_name AS form_full_name, uf.id AS form_id
-        FROM tickets t
-        JOIN users u ON t.user_id = u.id
-        JOIN user_forms uf ON t.form_id = uf.id
-        WHERE t.id=%s
-    """, (ticket_id,))
+    cur.execute(TICKET_BY_ID_SQL, (ticket_id,))
     ticket = cur.fetchone()
+    if ticket is None and include_archived:
+        cur.execute(ARCHIVED_TICKET_BY_ID_SQL, (ticket_id,))
+        ticket = cur.fetchone()
     cur.close()
     db.close()
     return ticket
@@ -375,7 +905,7 @@ def get_all_tickets():
     """
     Admin: return all tickets joined with user + form info.
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("""
         SELECT t.id, t.user_id, t.form_id, t.subject, t.message, t.status, t.admin_response, t.created_at, t.updated_at,
@@ -395,11 +925,15 @@ def get_all_tickets():
 def update_ticket_status(ticket_id, status, admin_response):
     db = get_db()
     cur = db.cursor()
+    old_status, day = _row_status(cur, 'tickets', ticket_id)
     cur.execute(
         "UPDATE tickets SET status=%s, admin_response=%s WHERE id=%s",
         (status, admin_response, ticket_id)
     )
     db.commit()
+    invalidate_stats()
+    if old_status:
+        notify_change('tickets', old_status, status, day)
     cur.close()
     db.close()
 
@@ -407,36 +941,162 @@ def update_ticket_status(ticket_id, status, admin_response):
 # ==========================
 # ADMIN STATS
 # ==========================
-def get_stats(time_from=None):
-    db = get_db()
-    cur = db.cursor()
+def _window_key(time_from):
+    """Cache key for a `time_from` window, floored to the minute."""
+    return time_from.strftime('%Y-%m-%d %H:%M') if time_from else 'all'
+
 
-    cur.execute("SELECT COUNT(*) AS total FROM users")
-    users = cur.fetchone()['total']
+# table -> `kind` of its rows in archive_counts (archive.py) and in the stats
+ARCHIVE_KINDS = {'user_forms': 'forms', 'tickets': 'tickets'}
 
-    # optional time filter
+
+def _stats_query(time_from):
+    """(sql, params) for get_stats(); shared with async_models."""
+    # optional time filter; archived rows are counted per day
     time_clause = ""
+    day_clause = ""
     params = ()
     if time_from:
         time_clause = "WHERE created_at >= %s"
-        params = (time_from,)
+        day_clause = "WHERE day >= DATE(%s)"
+        params = (time_from, time_from, time_from)
+
+    return f"""
+        SELECT 'users' AS kind, NULL AS status, COUNT(*) AS count FROM users
+        UNION ALL
+        SELECT 'forms', status, COUNT(*) FROM user_forms {time_clause} GROUP BY status
+        UNION ALL
+        SELECT 'tickets', status, COUNT(*) FROM tickets {time_clause} GROUP BY status
+        UNION ALL
+        SELECT kind, status, SUM(count) FROM archive_counts {day_clause} GROUP BY kind, status
+    """, params
 
-    cur.execute(f"SELECT status, COUNT(*) AS count FROM user_forms {time_clause} GROUP BY status", params)
+
+def _stats_from_rows(rows):
+    stats = {"users": 0}
+    counts = {"forms": {}, "tickets": {}}
+    for row in rows:
+        if row['kind'] == 'users':
+            stats['users'] = row['count']
+        else:
+            by_status = counts[row['kind']]
+            by_status[row['status']] = by_status.get(row['status'], 0) + int(row['count'])
+    for kind, by_status in counts.items():
+        stats[kind] = [{'status': status, 'count': count} for status, count in by_status.items()]
+    return stats
+
+
+def get_stats(time_from=None):
+    """
+    User total plus per-status form and ticket counts, in a single round trip.
+    Archived forms and tickets are included (from archive_counts).
+    Results are cached per `time_from` window (floored to the minute) until
+    CACHE_TTL expires or a write invalidates them.
+    """
+    if time_from:
+        time_from = time_from.replace(second=0, microsecond=0)
+    key = f"stats:{_window_key(time_from)}"
+    cached = _stats_cache().get(key)
+    if cached is not None:
+        return cached
+
+    db = _cache_fill_db()
+    cur = db.cursor()
+    cur.execute(*_stats_query(time_from))
+    rows = cur.fetchall()
+    cur.close()
+    db.close()
+
+    stats = _stats_from_rows(rows)
+    _stats_cache().set(key, stats)
+    return stats
+
+
+RECENT_FORMS_SQL = """
+    SELECT uf.id, uf.status, uf.created_at, u.email
+    FROM user_forms uf
+    JOIN users u ON uf.user_id = u.id
+    ORDER BY uf.created_at DESC, uf.id DESC
+    LIMIT %s
+"""
+
+
+def get_recent_forms(limit=10):
+    """
+    Admin dashboard: the newest `limit` forms with their owner's email, in one query.
+    """
+    db = get_read_db()
+    cur = db.cursor()
+    cur.execute(RECENT_FORMS_SQL, (limit,))
     forms = cur.fetchall()
+    cur.close()
+    db.close()
+    return forms
+
+
+DAILY_COUNTS_SQL = """
+    SELECT DATE(created_at) AS day, COUNT(*) AS count
+    FROM {table}
+    WHERE created_at >= %s
+    GROUP BY DATE(created_at)
+    UNION ALL
+    SELECT day, SUM(count) FROM archive_counts
+    WHERE kind = %s AND day >= DATE(%s)
+    GROUP BY day
+"""
 
-    cur.execute(f"SELECT status, COUNT(*) AS count FROM tickets {time_clause} GROUP BY status", params)
-    tickets = cur.fetchall()
 
+def _daily_counts_query(table, time_from):
+    """(sql, params) for get_daily_counts(); shared with async_models."""
+    if table not in ARCHIVE_KINDS:
+        raise ValueError(f"Unsupported table for daily counts: {table}")
+    return DAILY_COUNTS_SQL.format(table=table), (time_from, ARCHIVE_KINDS[table], time_from)
+
+
+def _daily_series(rows, time_from, days):
+    """One {'date', 'count'} entry per day from `time_from` through today, zero-filled."""
+    counts = {}
+    for row in rows:
+        day = row['day'].strftime('%Y-%m-%d')
+        counts[day] = counts.get(day, 0) + int(row['count'])
+    series = []
+    for i in range(days + 1):
+        day = (time_from + timedelta(days=i)).strftime('%Y-%m-%d')
+        series.append({'date': day, 'count': counts.get(day, 0)})
+    return series
+
+
+def get_daily_counts(table, time_from, days):
+    """
+    Count rows of `table` ('user_forms' or 'tickets') per calendar day,
+    starting at `time_from`, grouped in SQL; archived rows are included.
+    Returns [{'date': 'YYYY-MM-DD', 'count': n}, ...] with one entry per day
+    for `days` days plus today (so live deltas have a bucket to land in);
+    days without rows are filled with 0.
+    """
+    time_from = time_from.replace(second=0, microsecond=0)
+    sql, params = _daily_counts_query(table, time_from)
+    key = f"daily:{table}:{_window_key(time_from)}:{days}"
+    cached = _stats_cache().get(key)
+    if cached is not None:
+        return cached
+
+    db = _cache_fill_db()
+    cur = db.cursor()
+    cur.execute(sql, params)
+    series = _daily_series(cur.fetchall(), time_from, days)
     cur.close()
     db.close()
 
-    return {"users": users, "forms": forms, "tickets": tickets}
+    _stats_cache().set(key, series)
+    return series
+
 
 def get_all_forms_admin():
     """
     Admin: fetch all forms with user name & email
     """
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("""
         SELECT 
@@ -450,11 +1110,11 @@ def get_all_forms_admin():
     forms = cur.fetchall()
     cur.close()
     db.close()
-    return forms
+    return reveal_forms(forms)
 
 
 def get_all_forms(time_from=None):
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     query = "SELECT * FROM user_forms"
     params = []
@@ -466,10 +1126,10 @@ def get_all_forms(time_from=None):
     forms = cur.fetchall()
     cur.close()
     db.close()
-    return forms
+    return reveal_forms(forms)
 
 def get_all_forms_time_filtered(time_from):
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     cur.execute("""
         SELECT *
@@ -480,12 +1140,12 @@ def get_all_forms_time_filtered(time_from):
     forms = cur.fetchall()
     cur.close()
     db.close()
-    return forms
+    return reveal_forms(forms)
 
 
 
 def get_all_tickets(time_from=None):
-    db = get_db()
+    db = get_read_db()
     cur = db.cursor()
     query = "SELECT * FROM tickets"
     params = []
@@ -498,3 +1158,217 @@ def get_all_tickets(time_from=None):
     cur.close()
     db.close()
     return tickets
+
+
+# ==========================
+# ADMIN LISTINGS (keyset pagination)
+# ==========================
+def encode_cursor(row):
+    """Cursor for the page after `row`: '<created_at as YYYYmmddHHMMSSffffff>-<id>'."""
+    return f"{row['created_at'].strftime('%Y%m%d%H%M%S%f')}-{row['id']}"
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); returns (created_at, id) or None if invalid."""
+    try:
+        created, row_id = cursor.split('-', 1)
+        return datetime.strptime(created, '%Y%m%d%H%M%S%f'), int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _keyset_query(query, alias, where, params, cursor, limit):
+    """
+    (sql, params) running `query` newest-first on (created_at, id) starting
+    after `cursor`, fetching one extra row to detect a next page.
+    """
+    where = list(where)
+    params = list(params)
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        where.append(
+            f"({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.id < %s))"
+        )
+        params.extend([position[0], position[0], position[1]])
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {alias}.created_at DESC, {alias}.id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+def _keyset_result(rows, limit):
+    """(rows, next_cursor) from the limit + 1 rows fetched by a keyset query."""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return rows, next_cursor
+
+
+def _keyset_page(query, alias, where, params, cursor, limit):
+    """
+    Run `query` newest-first on (created_at, id) starting after `cursor`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    db = get_read_db()
+    cur = db.cursor()
+    cur.execute(*_keyset_query(query, alias, where, params, cursor, limit))
+    rows = cur.fetchall()
+    cur.close()
+    db.close()
+    return _keyset_result(rows, limit)
+
+
+def _status_filter(alias, status):
+    if status:
+        return [f"{alias}.status = %s"], [status]
+    return [], []
+
+
+def get_forms_page(status=None, cursor=None, limit=50, archived=False):
+    """
+    Admin: one page of forms with user name & email, newest first; pages
+    through user_forms_archive instead with `archived`.
+    """
+    where, params = _status_filter("uf", status)
+    # archives have no foreign keys, so their user may be gone
+    table, join = ('user_forms_archive', 'LEFT JOIN') if archived else ('user_forms', 'JOIN')
+    return _keyset_page(f"""
+        SELECT uf.id, uf.user_id, uf.full_name, uf.status, uf.created_at, uf.updated_at,
+               u.name AS user_name, u.email AS user_email
+        FROM {table} uf
+        {join} users u ON uf.user_id = u.id
+    """, "uf", where, params, cursor, limit)
+
+
+TICKETS_PAGE_SQL = """
+    SELECT t.id, t.user_id, t.form_id, t.subject, t.message, t.status, t.admin_response, t.created_at, t.updated_at,
+           u.name AS user_name, u.email AS user_email,
+           uf.full_name AS form_full_name
+    FROM tickets t
+    JOIN users u ON t.user_id = u.id
+    JOIN user_forms uf ON t.form_id = uf.id
+"""
+ARCHIVED_TICKETS_PAGE_SQL = """
+    SELECT t.id, t.user_id, t.form_id, t.subject, t.message, t.status, t.admin_response, t.created_at, t.updated_at,
+           t.archived_at, u.name AS user_name, u.email AS user_email,
+           COALESCE(uf.full_name, ufa.full_name) AS form_full_name
+    FROM tickets_archive t
+    LEFT JOIN users u ON t.user_id = u.id
+    LEFT JOIN user_forms uf ON t.form_id = uf.id
+    LEFT JOIN user_forms_archive ufa ON t.form_id = ufa.id
+"""
+
+
+def get_tickets_page(status=None, cursor=None, limit=50, archived=False):
+    """
+    Admin: one page of tickets joined with user + form info, newest first;
+    pages through tickets_archive instead with `archived`.
+    """
+    where, params = _status_filter("t", status)
+    query = ARCHIVED_TICKETS_PAGE_SQL if archived else TICKETS_PAGE_SQL
+    return _keyset_page(query, "t", where, params, cursor, limit)
+
+
+def get_users_page(role=None, cursor=None, limit=50):
+    """
+    Admin: one page of users, newest first (password hashes are not selected).
+    """
+    where, params = [], []
+    if role:
+        where.append("u.role = %s")
+        params.append(role)
+    return _keyset_page("""
+        SELECT u.id, u.name, u.email, u.role, u.profile_photo, u.created_at
+        FROM users u
+    """, "u", where, params, cursor, limit)
+
+
+def _status_counts_sql(table):
+    column = {'user_forms': 'status', 'tickets': 'status', 'users': 'role'}.get(table)
+    if column is None:
+        raise ValueError(f"Unsupported table for status counts: {table}")
+    return f"SELECT {column} AS status, COUNT(*) AS count FROM {table} GROUP BY {column}"
+
+
+ARCHIVE_STATUS_COUNTS_SQL = "SELECT status, SUM(count) AS count FROM archive_counts WHERE kind=%s GROUP BY status"
+
+
+# table -> watermark column (users rows are never edited in ways the admin views show)
+VERSION_COLUMNS = {'user_forms': 'updated_at', 'tickets': 'updated_at', 'users': 'created_at'}
+TABLE_VERSION_SQL = "SELECT MAX({column}) AS updated_at, COUNT(*) AS count FROM {table}"
+USER_VERSION_SQL = """
+    SELECT MAX(updated_at) AS updated_at, COUNT(*) AS count FROM user_forms WHERE user_id=%s
+    UNION ALL
+    SELECT MAX(updated_at), COUNT(*) FROM tickets WHERE user_id=%s
+"""
+
+
+def _table_version_sql(table):
+    if table not in VERSION_COLUMNS:
+        raise ValueError(f"Unsupported table for versioning: {table}")
+    return TABLE_VERSION_SQL.format(column=VERSION_COLUMNS[table], table=table)
+
+
+def table_version(table):
+    """
+    A string that changes whenever rows of `table` ('user_forms', 'tickets'
+    or 'users') are added, edited or deleted: latest watermark plus row
+    count. Used to key cached fragments and ETags. Cached with the admin
+    stats, so app writes (invalidate_stats) refresh it at once and other
+    writers within CACHE_TTL.
+    """
+    sql = _table_version_sql(table)
+    cache = _stats_cache()
+    key = f"version:{table}"
+    version = cache.get(key)
+    if version is None:
+        db = _cache_fill_db()
+        cur = db.cursor()
+        cur.execute(sql)
+        version = _version_from_row(cur.fetchone())
+        cur.close()
+        db.close()
+        cache.set(key, version)
+    return version
+
+
+def _version_from_row(row):
+    # microseconds (migration 009): two edits within one second still differ
+    updated = row['updated_at'].strftime('%Y%m%d%H%M%S%f') if row['updated_at'] else '0'
+    return f"{updated}-{row['count']}"
+
+
+def user_version(user_id):
+    """
+    Like table_version() for one user's forms and tickets; not cached, it is
+    two index lookups on user_id.
+    """
+    db = get_read_db()
+    cur = db.cursor()
+    cur.execute(USER_VERSION_SQL, (user_id, user_id))
+    version = '/'.join(_version_from_row(row) for row in cur.fetchall())
+    cur.close()
+    db.close()
+    return version
+
+
+def get_status_counts(table, archived=False):
+    """
+    Per-status row counts for 'user_forms' or 'tickets' as {status: count},
+    or per-role counts for 'users'. With `archived`, counts of the archived
+    forms or tickets instead (from archive_counts, not the archive itself).
+    """
+    if archived:
+        sql, params = ARCHIVE_STATUS_COUNTS_SQL, (ARCHIVE_KINDS[table],)
+    else:
+        sql, params = _status_counts_sql(table), None
+    db = get_read_db()
+    cur = db.cursor()
+    cur.execute(sql, params)
+    counts = {row['status']: int(row['count']) for row in cur.fetchall()}
+    cur.close()
+    db.close()
+    return counts
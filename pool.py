@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be borrowed within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    A small, thread-safe, bounded pool of DB-API connections.
+
+    `connect` is a zero-argument callable that opens a new raw connection.
+    At most `max_size` connections exist at once; borrowers block for up to
+    `timeout` seconds when all of them are checked out.
+
+    Idle connections are pinged before reuse once they have been idle for
+    `ping_interval` seconds, and are replaced after `recycle` seconds of age
+    so server-side `wait_timeout` never bites.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=5.0, ping_interval=30, recycle=3600):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.recycle = recycle
+
+        # idle entries are (conn, created_at, last_used)
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+
+    # ---------- borrowing ----------
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to `timeout` seconds (default: the pool's; 0 = don't wait)."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No DB connection available within {timeout}s")
+                self._cond.wait(remaining)
+
+        if conn is None:
+            return self._open()
+
+        now = time.monotonic()
+        if now - created > self.recycle or (now - last_used > self.ping_interval and not self._ping(conn)):
+            # Replace in place: the slot stays ours, so no waiter can take it
+            # and push the pool past max_size while the new one opens.
+            self._close(conn)
+            return self._open()
+
+        conn._pool_created = created
+        return conn
+
+    def release(self, conn, broken=False):
+        """
+        Give a connection back. Any open transaction is rolled back so the
+        next borrower does not inherit locks or a stale read snapshot.
+        """
+        if not broken:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+
+        if broken:
+            self._discard(conn)
+            return
+
+        created = getattr(conn, '_pool_created', time.monotonic())
+        with self._cond:
+            self._idle.append((conn, created, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    # ---------- internals ----------
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        conn._pool_created = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _ping(conn):
+        try:
+            conn.ping()
+            return True
+        except Exception:
+            return False
+
+    def status(self):
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+
+class NoReplicaAvailable(Exception):
+    """Raised when every read replica is down or busy."""
+
+
+class _Replica:
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.checked_at = 0.0
+        self.lag = None
+        self.last_error = None
+
+
+class ReplicaSet:
+    """
+    Read-only connections spread round-robin over one ConnectionPool per
+    replica, with the same acquire()/release() interface as ConnectionPool.
+
+    A replica that fails to connect or fails its health check is taken out
+    of rotation and probed again after `check_interval` seconds; healthy
+    replicas are re-checked on that interval as well. The check is a ping,
+    plus `SHOW SLAVE STATUS` when `max_lag` is set: a replica more than
+    `max_lag` seconds behind (or with replication stopped) is skipped. That
+    needs the REPLICATION CLIENT privilege; any error counts as unhealthy.
+
+    acquire() first tries every replica without waiting and only then waits
+    (up to the pool timeout) on the first busy one, so one saturated replica
+    does not stall reads that another could serve.
+    """
+
+    def __init__(self, pools, check_interval=5, max_lag=None):
+        self.replicas = [_Replica(name, pool) for name, pool in pools]
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _candidates(self, now):
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [r for r in ordered if r.healthy or now - r.checked_at >= self.check_interval]
+
+    def _check(self, replica, conn):
+        replica.checked_at = time.monotonic()
+        try:
+            conn.ping()
+            if self.max_lag is not None:
+                cur = conn.cursor()
+                cur.execute("SHOW SLAVE STATUS")
+                row = cur.fetchone()
+                cur.close()
+                lag = row['Seconds_Behind_Master'] if row else 0
+                replica.lag = lag
+                if lag is None or lag > self.max_lag:
+                    replica.last_error = f"replication lag {lag}s"
+                    replica.healthy = False
+                    return False
+        except Exception as e:
+            replica.last_error = str(e)
+            replica.healthy = False
+            return False
+        replica.healthy = True
+        replica.last_error = None
+        return True
+
+    def _try(self, replica, now, timeout):
+        """A checked connection from `replica`, None if it is unhealthy; PoolTimeout if busy."""
+        try:
+            conn = replica.pool.acquire(timeout=timeout)
+        except PoolTimeout:
+            raise
+        except Exception as e:
+            replica.healthy = False
+            replica.checked_at = now
+            replica.last_error = str(e)
+            return None
+        if now - replica.checked_at >= self.check_interval and not self._check(replica, conn):
+            replica.pool.release(conn, broken=True)
+            return None
+        conn._replica = replica
+        return conn
+
+    def acquire(self):
+        now = time.monotonic()
+        busy = []
+        for replica in self._candidates(now):
+            try:
+                conn = self._try(replica, now, timeout=0)
+            except PoolTimeout:
+                busy.append(replica)  # busy, not broken
+                continue
+            if conn is not None:
+                return conn
+        if busy:
+            try:
+                conn = self._try(busy[0], now, timeout=None)
+            except PoolTimeout:
+                conn = None
+            if conn is not None:
+                return conn
+        raise NoReplicaAvailable("No healthy read replica available")
+
+    def release(self, conn, broken=False):
+        conn._replica.pool.release(conn, broken=broken)
+
+    def close_all(self):
+        for replica in self.replicas:
+            replica.pool.close_all()
+
+    def status(self):
+        return [
+            dict(replica.pool.status(), name=replica.name, healthy=replica.healthy,
+                 lag=replica.lag, last_error=replica.last_error)
+            for replica in self.replicas
+        ]
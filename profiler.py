@@ -0,0 +1,175 @@
+"""
+Per-request SQL profiling.
+
+ProfilingCursor wraps every cursor handed out by models.get_db() and records
+statement count and DB time on flask.g. At the end of each request the totals
+are folded into per-endpoint latency samples (for the /admin/metrics page),
+together with template render time,
+statements slower than SLOW_QUERY_MS go to the `demograph.slow_query` logger
+as JSON lines, and X-Query-Count / Server-Timing headers are added when
+QUERY_PROFILE_HEADERS is on.
+"""
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+
+slow_log = logging.getLogger('demograph.slow_query')
+
+SLOWEST_PER_REQUEST = 5
+SAMPLES_PER_ENDPOINT = 1000
+
+
+class ProfilingCursor:
+    """Cursor proxy that times executed statements for the current request."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, query, args):
+        started = time.perf_counter()
+        try:
+            return method(query, args)
+        finally:
+            record(query, time.perf_counter() - started)
+
+    def execute(self, query, args=None):
+        return self._timed(self._cursor.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._timed(self._cursor.executemany, query, args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+def _profile():
+    profile = g.get('db_profile')
+    if profile is None:
+        profile = g.db_profile = {'count': 0, 'seconds': 0.0, 'slowest': []}
+    return profile
+
+
+def record(query, seconds):
+    profile = _profile()
+    profile['count'] += 1
+    profile['seconds'] += seconds
+
+    statement = ' '.join(query.split())
+    entry = (seconds, profile['count'], statement)
+    if len(profile['slowest']) < SLOWEST_PER_REQUEST:
+        heapq.heappush(profile['slowest'], entry)
+    else:
+        heapq.heappushpop(profile['slowest'], entry)
+
+    if seconds * 1000 >= current_app.config['SLOW_QUERY_MS']:
+        in_request = has_request_context()
+        slow_log.warning(json.dumps({
+            'endpoint': request.endpoint if in_request else None,
+            'path': request.path if in_request else None,
+            'ms': round(seconds * 1000, 2),
+            'sql': statement[:2000],
+        }))
+
+
+def query_count():
+    profile = g.get('db_profile')
+    return profile['count'] if profile else 0
+
+
+class EndpointStats:
+    """Rolling per-endpoint samples of (total ms, db ms, query count, render ms)."""
+
+    def __init__(self, maxlen=SAMPLES_PER_ENDPOINT):
+        self._samples = defaultdict(lambda: deque(maxlen=maxlen))
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, total_ms, db_ms, queries, render_ms=0.0):
+        with self._lock:
+            self._samples[endpoint].append((total_ms, db_ms, queries, render_ms))
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return round(ordered[index], 2)
+
+    def summary(self):
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+        rows = []
+        for endpoint, samples in snapshot.items():
+            totals = [s[0] for s in samples]
+            db_times = [s[1] for s in samples]
+            queries = [s[2] for s in samples]
+            render_times = [s[3] for s in samples]
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(samples),
+                'p50_ms': self._percentile(totals, 50),
+                'p95_ms': self._percentile(totals, 95),
+                'p99_ms': self._percentile(totals, 99),
+                'db_p95_ms': self._percentile(db_times, 95),
+                'render_p95_ms': self._percentile(render_times, 95),
+                'avg_queries': round(sum(queries) / len(queries), 2),
+                'max_queries': max(queries),
+            })
+        return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)
+
+
+def init_app(app):
+    stats = app.extensions['endpoint_stats'] = EndpointStats(maxlen=app.config['PROFILE_SAMPLES'])
+    logger = app.logger
+
+    @app.before_request
+    def _start_profile():
+        g.request_started = time.perf_counter()
+
+    # Template time: from render_template() until the template has rendered,
+    # summed when a view renders more than one.
+    def _start_render(sender, template, context, **extra):
+        g.render_started = time.perf_counter()
+
+    def _finish_render(sender, template, context, **extra):
+        started = g.pop('render_started', None)
+        if started is not None:
+            g.render_seconds = g.get('render_seconds', 0.0) + time.perf_counter() - started
+
+    before_render_template.connect(_start_render, app, weak=False)
+    template_rendered.connect(_finish_render, app, weak=False)
+
+    @app.after_request
+    def _finish_profile(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+        profile = _profile()
+        db_ms = profile['seconds'] * 1000
+        render_ms = g.get('render_seconds', 0.0) * 1000
+
+        stats.add(request.endpoint or '<unmatched>', total_ms, db_ms, profile['count'], render_ms)
+        logger.debug(
+            "%s %s -> %d SQL queries, %.1f ms DB / %.1f ms render / %.1f ms total; slowest: %s",
+            request.method, request.path, profile['count'], db_ms, render_ms, total_ms,
+            [(round(s * 1000, 2), q[:120]) for s, _, q in sorted(profile['slowest'], reverse=True)]
+        )
+
+        if app.config['QUERY_PROFILE_HEADERS']:
+            response.headers['X-Query-Count'] = str(profile['count'])
+            response.headers.add(
+                'Server-Timing', f'db;dur={db_ms:.2f};desc="{profile["count"]} queries"'
+            )
+            if render_ms:
+                response.headers.add('Server-Timing', f'render;dur={render_ms:.2f}')
+            response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+        return response
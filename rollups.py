@@ -0,0 +1,190 @@
+"""
+Precomputed demographic rollups over user_forms.
+
+Each cube in ROLLUPS is a summary table holding form counts per day
+(DATE(created_at)) and a handful of low-cardinality dimensions. Because a
+form's day never changes, a refresh only has to rebuild the days touched
+since the last `updated_at` watermark: it finds those days through
+idx_forms_updated_at and recomputes them from the base table, so edits and
+status changes are picked up without rescanning history.
+
+Days are rebuilt from user_forms and user_forms_archive together, so moving
+closed forms to the archive (archive.py) does not change any count.
+
+Run `flask refresh-rollups` from cron (e.g. every minute); `--full` rebuilds
+everything, which is also how deleted forms are eventually reconciled.
+"""
+from datetime import datetime, timedelta
+
+import models
+
+AGE_BAND_SQL = """CASE
+    WHEN age IS NULL THEN 'unknown'
+    WHEN age < 18 THEN '0-17'
+    WHEN age < 25 THEN '18-24'
+    WHEN age < 35 THEN '25-34'
+    WHEN age < 45 THEN '35-44'
+    WHEN age < 55 THEN '45-54'
+    WHEN age < 65 THEN '55-64'
+    ELSE '65+'
+END"""
+
+# dimension -> SQL expression over user_forms (NULLs become '' so they can be part of the key)
+DIMENSIONS = {
+    'state': "COALESCE(state, '')",
+    'gender': "COALESCE(gender, '')",
+    'age_band': AGE_BAND_SQL,
+    'marital_status': "COALESCE(marital_status, '')",
+    'status': "COALESCE(status, '')",
+    'qualification': "COALESCE(qualification, '')",
+    'passing_year': "COALESCE(passing_year, 0)",
+}
+
+# cube name -> (summary table, dimensions); queries use the first cube that has every requested dimension
+ROLLUPS = {
+    'demographics': ('rollup_forms_demographics', ('state', 'gender', 'age_band', 'marital_status', 'status')),
+    'education': ('rollup_forms_education', ('state', 'qualification', 'passing_year', 'gender')),
+}
+
+WATERMARK = 'user_forms'
+# re-read a little before the watermark so rows from transactions that
+# committed late with an older updated_at are not missed (refresh is idempotent)
+SAFETY_LAG = timedelta(seconds=60)
+DAYS_PER_BATCH = 31
+# columns the DIMENSIONS expressions read
+SOURCE_COLUMNS = 'created_at, state, gender, age, marital_status, status, qualification, passing_year'
+
+
+def _clear_days(cur, after=None, through=None):
+    """Delete every cube's rows for days in (after, through]; None leaves that end open."""
+    where, params = [], []
+    if after is not None:
+        where.append("day > %s")
+        params.append(after)
+    if through is not None:
+        where.append("day <= %s")
+        params.append(through)
+    for table, _ in ROLLUPS.values():
+        cur.execute(f"DELETE FROM {table}" + (" WHERE " + " AND ".join(where) if where else ""), params)
+
+
+def _rebuild_days(cur, days):
+    """Recompute every cube for the given dates (a list of datetime.date)."""
+    placeholders = ', '.join(['%s'] * len(days))
+    for table, dims in ROLLUPS.values():
+        cur.execute(f"DELETE FROM {table} WHERE day IN ({placeholders})", days)
+        exprs = ', '.join(DIMENSIONS[d] for d in dims)
+        ranges = ' OR '.join(["(created_at >= %s AND created_at < %s)"] * len(days))
+        params = []
+        for day in days:
+            start = datetime.combine(day, datetime.min.time())
+            params.extend([start, start + timedelta(days=1)])
+        cur.execute(f"""
+            INSERT INTO {table} (day, {', '.join(dims)}, forms)
+            SELECT DATE(created_at), {exprs}, COUNT(*)
+            FROM (
+                SELECT {SOURCE_COLUMNS} FROM user_forms WHERE {ranges}
+                UNION ALL
+                SELECT {SOURCE_COLUMNS} FROM user_forms_archive WHERE {ranges}
+            ) AS uf
+            GROUP BY DATE(created_at), {exprs}
+        """, params * 2)
+
+
+def refresh(full=False):
+    """
+    Bring the rollup tables up to date. Returns {'days': n, 'watermark': ts}.
+    """
+    db = models.get_db()
+    cur = db.cursor()
+    try:
+        cur.execute("SELECT last_updated_at FROM rollup_watermarks WHERE name=%s", (WATERMARK,))
+        row = cur.fetchone()
+        since = None if full or not row else row['last_updated_at'] - SAFETY_LAG
+
+        cur.execute("SELECT MAX(updated_at) AS high FROM user_forms")
+        high = cur.fetchone()['high']
+        if high is None:
+            return {'days': 0, 'watermark': None}
+
+        if since is None:
+            cur.execute("""
+                SELECT DATE(created_at) AS day FROM user_forms
+                UNION
+                SELECT DATE(created_at) FROM user_forms_archive
+            """)
+        else:
+            cur.execute(
+                "SELECT DISTINCT DATE(created_at) AS day FROM user_forms WHERE updated_at >= %s",
+                (since,)
+            )
+        days = sorted(r['day'] for r in cur.fetchall())
+
+        for i in range(0, len(days), DAYS_PER_BATCH):
+            batch = days[i:i + DAYS_PER_BATCH]
+            if since is None:
+                # a full rebuild also drops days that no longer have forms, one
+                # range at a time with its batch, so readers never see empty cubes
+                after = days[i - 1] if i else None
+                through = None if i + DAYS_PER_BATCH >= len(days) else batch[-1]
+                _clear_days(cur, after, through)
+            _rebuild_days(cur, batch)
+            db.commit()
+
+        cur.execute("""
+            INSERT INTO rollup_watermarks (name, last_updated_at) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE last_updated_at = VALUES(last_updated_at)
+        """, (WATERMARK, high))
+        db.commit()
+        return {'days': len(days), 'watermark': high}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+        db.close()
+
+
+def query(group_by, filters=None, date_from=None, date_to=None):
+    """
+    Cross-tab from the rollups: form counts grouped by `group_by` dimensions,
+    optionally filtered by exact dimension values and a [date_from, date_to) day range.
+    Returns (cube name, [{dim: value, ..., 'count': n}, ...]).
+    """
+    filters = filters or {}
+    wanted = set(group_by) | set(filters)
+    unknown = wanted - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown dimensions: {', '.join(sorted(unknown))}")
+
+    for name, (table, dims) in ROLLUPS.items():
+        if wanted <= set(dims):
+            break
+    else:
+        raise ValueError(f"No rollup covers: {', '.join(sorted(wanted))}")
+
+    where, params = [], []
+    for dim, value in filters.items():
+        where.append(f"{dim} = %s")
+        params.append(value)
+    if date_from:
+        where.append("day >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("day < %s")
+        params.append(date_to)
+
+    select = ', '.join(group_by)
+    sql = f"SELECT {select + ', ' if select else ''}SUM(forms) AS count FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if group_by:
+        sql += f" GROUP BY {select} ORDER BY count DESC"
+
+    db = models.get_read_db()
+    cur = db.cursor()
+    cur.execute(sql, params)
+    rows = [dict(r, count=int(r['count'] or 0)) for r in cur.fetchall()]
+    cur.close()
+    db.close()
+    return name, rows
@@ -0,0 +1,78 @@
+"""
+Full-text search over forms and tickets using InnoDB FULLTEXT indexes
+(ft_user_forms: full_name, city, state, university; ft_tickets: subject, message).
+
+InnoDB keeps FULLTEXT indexes up to date inside the writing transaction, so
+create_form, update_form_by_id and create_ticket need no separate indexing
+step: a committed row is searchable immediately.
+
+Every term becomes a required prefix match (`+term*`) in BOOLEAN MODE and
+results are ranked by MATCH() relevance. Terms shorter than
+innodb_ft_min_token_size (3 by default) are not indexed and are dropped.
+
+Only live rows are searched: the archive tables (archive.py) have no
+FULLTEXT indexes, and the search page says so.
+"""
+import re
+
+import models
+
+MIN_TOKEN = 3
+MAX_TERMS = 8
+MAX_PAGE = 50  # deep OFFSETs get slow; refine the query instead
+
+TARGETS = {
+    'forms': """
+        SELECT uf.id, uf.full_name, uf.city, uf.state, uf.university, uf.status, uf.created_at,
+               u.email AS user_email,
+               MATCH(uf.full_name, uf.city, uf.state, uf.university) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM user_forms uf
+        JOIN users u ON uf.user_id = u.id
+        WHERE MATCH(uf.full_name, uf.city, uf.state, uf.university) AGAINST (%s IN BOOLEAN MODE)
+    """,
+    'tickets': """
+        SELECT t.id, t.form_id, t.subject, LEFT(t.message, 200) AS message, t.status, t.created_at,
+               u.email AS user_email,
+               MATCH(t.subject, t.message) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM tickets t
+        JOIN users u ON t.user_id = u.id
+        WHERE MATCH(t.subject, t.message) AGAINST (%s IN BOOLEAN MODE)
+    """,
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def boolean_query(text):
+    """
+    Turn free text into a BOOLEAN MODE expression requiring every term as a
+    prefix. Operator characters are stripped, so user input cannot change the
+    query's meaning. Returns '' when no searchable term is left.
+    """
+    terms = [t for t in _TOKEN.findall(text or '') if len(t) >= MIN_TOKEN][:MAX_TERMS]
+    return ' '.join(f"+{t}*" for t in terms)
+
+
+def search(target, text, page=1, per_page=20):
+    """
+    Ranked search in 'forms' or 'tickets'. Returns (rows, has_more);
+    has_more is always False on MAX_PAGE.
+    """
+    query = TARGETS.get(target)
+    if query is None:
+        raise ValueError(f"Unknown search target: {target}")
+    expr = boolean_query(text)
+    page = max(1, min(page, MAX_PAGE))
+    if not expr:
+        return [], False
+
+    db = models.get_read_db()
+    cur = db.cursor()
+    cur.execute(
+        query + " ORDER BY score DESC, id DESC LIMIT %s OFFSET %s",
+        (expr, expr, per_page + 1, (page - 1) * per_page)
+    )
+    rows = list(cur.fetchall())
+    cur.close()
+    db.close()
+    return rows[:per_page], len(rows) > per_page and page < MAX_PAGE  # no link to a page that clamps back
@@ -0,0 +1,155 @@
+"""
+Password hashing off the request thread, and login/registration rate limiting.
+
+Hashing: werkzeug's PBKDF2/scrypt hashing is deliberately CPU-heavy, so it
+runs in a small process pool (PASSWORD_HASH_WORKERS). At most
+PASSWORD_HASH_QUEUE hashes may be queued or running per worker process;
+beyond that `Overloaded` is raised right away instead of piling up blocked
+request threads (backpressure). A slot is only freed once its hash has
+actually finished, so requests that time out still count against the limit.
+If the pool breaks, the request retries once on a fresh pool and otherwise
+gets `Overloaded`; hashing never falls back to the request thread. Workers
+are started with forkserver (spawn where unavailable), never plain fork.
+
+Rate limiting: a token bucket per key (client IP, email) kept in memory with
+LRU eviction, so credential-stuffing traffic is turned away before it costs a
+DB lookup or a hash.
+"""
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Forking a multithreaded server worker can copy a lock held by another
+# thread into the child and deadlock it; start workers from a clean process.
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class Overloaded(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasher:
+    def __init__(self, workers=2, max_pending=16, timeout=10.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # created lazily so forked server workers each get their own pool
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(_START_METHOD)
+                )
+            return self._executor
+
+    def _discard(self, executor):
+        """Forget a broken pool so the next call starts a new one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _submit(self, func, *args):
+        """Submit to the pool, retrying once on a fresh pool if it broke or was shut down."""
+        for attempt in range(2):
+            executor = self._pool()
+            try:
+                return executor, executor.submit(func, *args)
+            except RuntimeError:
+                # BrokenProcessPool, or another thread's _discard() shut it down
+                self._discard(executor)
+        raise Overloaded("Password hashing pool restarted")
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Too many password operations in progress")
+        try:
+            executor, future = self._submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot stays taken until the hash is done, even if we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise Overloaded("Password hashing timed out")
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise Overloaded("Password hashing pool restarted")
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password)
+
+    def check(self, hash_value, password):
+        return self._run(check_password_hash, hash_value, password)
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by string. Each key may spend `capacity` requests in a
+    burst, refilled at `capacity / period` tokens per second. Only the
+    `max_keys` most recently seen keys are tracked.
+    """
+
+    def __init__(self, capacity, period, max_keys=100_000):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Spend one token for `key`. Returns 0 if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+def parse_rate(value):
+    """'10/60' -> (10, 60.0): 10 attempts per 60 seconds."""
+    count, period = value.split('/', 1)
+    return int(count), float(period)
+
+
+def init_app(app):
+    config = app.config
+    app.extensions['password_hasher'] = PasswordHasher(
+        workers=config['PASSWORD_HASH_WORKERS'],
+        max_pending=config['PASSWORD_HASH_QUEUE'],
+    )
+    app.extensions['rate_limits'] = {
+        'ip': RateLimiter(*parse_rate(config['AUTH_RATE_PER_IP']), max_keys=config['AUTH_RATE_MAX_KEYS']),
+        'email': RateLimiter(*parse_rate(config['AUTH_RATE_PER_EMAIL']), max_keys=config['AUTH_RATE_MAX_KEYS']),
+        'identifier': RateLimiter(*parse_rate(config['IDENTIFIER_CHECK_RATE']), max_keys=config['AUTH_RATE_MAX_KEYS']),
+    }
+
+
+def throttle(app, ip, email=None):
+    """
+    Spend a token from the IP bucket and (if given) the email bucket.
+    Returns seconds to wait if either is exhausted, else 0.
+    """
+    limits = app.extensions['rate_limits']
+    wait = limits['ip'].hit(ip or 'unknown')
+    if email:
+        wait = max(wait, limits['email'].hit(email))
+    return wait
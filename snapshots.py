@@ -0,0 +1,312 @@
+"""
+Columnar snapshots of user_forms for analytics (analytics.py).
+
+`flask snapshot-forms` copies the analytic columns of every form into one
+NumPy .npy file per column under SNAPSHOT_DIR, so demographic analysis reads
+memory-mapped arrays instead of the OLTP tables. Text and enum columns are
+dictionary encoded: the file holds small integer codes and the manifest the
+values, with code 0 meaning NULL. Names, contact details and identifiers
+are not copied.
+
+Refreshes are incremental like rollups.py. Only forms with updated_at at or
+after the previous watermark (minus SAFETY_LAG) are read, through
+idx_forms_updated_at, and they replace their old rows by id. Dictionaries
+only ever grow, so existing codes stay valid. A `--full` build also reads
+user_forms_archive and drops deleted forms. Incremental runs do not need
+the archive: a form is idle for ARCHIVE_AFTER_DAYS before it moves there,
+so it has already been copied.
+
+Each run writes a new generation directory and then atomically replaces
+CURRENT, so readers never see a half-written snapshot. Each worker maps the
+current generation read-only at start (np.load with mmap_mode='r': no copy,
+and workers share the page cache). It picks up a newer generation within
+SNAPSHOT_RELOAD_SECONDS.
+
+Needs the optional `numpy` package.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import MySQLdb.cursors
+from flask import current_app
+
+import models
+
+try:
+    import numpy as np  # optional dependency
+except ImportError:
+    np = None
+
+# column -> (kind, dtype): 'int' (NULL stored as -1), 'time' (datetime64[s]) or 'dict' (codes, dtype by size)
+COLUMNS = {
+    'id': ('int', 'int64'),
+    'age': ('int', 'int32'),  # int(11) with no range check on web saves
+    'passing_year': ('int', 'int16'),  # year(4)
+    'family_members': ('int', 'int32'),
+    'gender': ('dict', None),
+    'marital_status': ('dict', None),
+    'status': ('dict', None),
+    'state': ('dict', None),
+    'qualification': ('dict', None),
+    'created_at': ('time', 'datetime64[s]'),
+    'updated_at': ('time', 'datetime64[s]'),
+}
+DICTIONARY_COLUMNS = tuple(name for name, (kind, _) in COLUMNS.items() if kind == 'dict')
+NUMERIC_COLUMNS = tuple(name for name, (kind, _) in COLUMNS.items() if kind == 'int' and name != 'id')
+
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM {{table}}"
+# re-read a little before the watermark, as in rollups.py (merging is idempotent)
+SAFETY_LAG = timedelta(seconds=60)
+FETCH_SIZE = 10000
+CURRENT = 'CURRENT'
+MANIFEST = 'manifest.json'
+
+
+class SnapshotsUnavailable(RuntimeError):
+    """Raised when numpy is not installed."""
+
+
+def _require_numpy():
+    if np is None:
+        raise SnapshotsUnavailable("Analytics snapshots need numpy (pip install numpy)")
+
+
+class Snapshot:
+    """One generation: read-only column arrays plus the dictionaries of the encoded ones."""
+
+    def __init__(self, generation, manifest, columns):
+        self.generation = generation
+        self.manifest = manifest
+        self.columns = columns
+        self.dictionaries = manifest['dictionaries']
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self.dictionaries.items()}
+
+    @property
+    def rows(self):
+        return len(self.columns['id'])
+
+    @property
+    def watermark(self):
+        return datetime.fromisoformat(self.manifest['watermark']) if self.manifest['watermark'] else None
+
+    def code(self, column, value):
+        """Dictionary code of `value` in `column`, or None if no form has it."""
+        return self._codes[column].get(value)
+
+    def describe(self):
+        return {'generation': self.generation, 'rows': self.rows, 'watermark': self.manifest['watermark'],
+                'built_at': self.manifest['built_at']}
+
+
+def _code_dtype(size):
+    if size <= 1 << 8:
+        return np.uint8
+    if size <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+def _encoder(values):
+    """value -> code function for one dictionary, appending unseen values."""
+    codes = {value: code for code, value in enumerate(values)}
+
+    def encode(value):
+        if value is None or value == '':
+            return 0
+        value = str(value)
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+    return encode
+
+
+def _encode(rows, encoders):
+    """Column arrays for a chunk of SELECT_SQL rows (tuples in COLUMNS order)."""
+    arrays = {}
+    for i, (name, (kind, dtype)) in enumerate(COLUMNS.items()):
+        values = [row[i] for row in rows]
+        if kind == 'int':
+            arrays[name] = np.array([-1 if v is None else v for v in values], dtype=dtype)
+        elif kind == 'time':
+            arrays[name] = np.array(values, dtype=dtype)
+        else:
+            encode = encoders[name]
+            arrays[name] = np.array([encode(v) for v in values], dtype=np.uint32)
+    return arrays
+
+
+def _read(queries, encoders, on_progress=None):
+    """Run (sql, params) queries on a dedicated read connection; {column: [chunk arrays]}."""
+    chunks = {name: [] for name in COLUMNS}
+    count = 0
+    pool, conn = models.acquire_read()
+    finished = False
+    try:
+        for sql, params in queries:
+            cur = conn.cursor(MySQLdb.cursors.SSCursor)
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for name, array in _encode(rows, encoders).items():
+                    chunks[name].append(array)
+                count += len(rows)
+                if on_progress:
+                    on_progress(count)
+            cur.close()
+        finished = True
+    finally:
+        pool.release(conn, broken=not finished)
+    return chunks
+
+
+def _latest_by_id(columns):
+    """Sort by id and keep the last occurrence of every id (later chunks win)."""
+    order = np.argsort(columns['id'], kind='stable')
+    ids = columns['id'][order]
+    last = np.ones(len(ids), dtype=bool)
+    last[:-1] = ids[1:] != ids[:-1]
+    keep = order[last]
+    return {name: array[keep] for name, array in columns.items()}
+
+
+def build(directory, full=False, keep=2, on_progress=None):
+    """
+    Write a new snapshot generation into `directory` and make it current:
+    a full export, or the previous generation plus forms changed since its
+    watermark. Returns {'generation', 'rows', 'read', 'watermark', 'full'}.
+    """
+    _require_numpy()
+    previous = None if full else load(directory)
+    full = previous is None
+    dictionaries = {name: list(previous.dictionaries[name]) if previous else [None] for name in DICTIONARY_COLUMNS}
+    encoders = {name: _encoder(values) for name, values in dictionaries.items()}
+
+    if full:
+        queries = [(SELECT_SQL.format(table=table), None) for table in ('user_forms', 'user_forms_archive')]
+    else:
+        since = previous.watermark - SAFETY_LAG if previous.watermark else datetime.min
+        queries = [(SELECT_SQL.format(table='user_forms') + " WHERE updated_at >= %s", (since,))]
+    chunks = _read(queries, encoders, on_progress)
+    read = sum(len(chunk) for chunk in chunks['id'])
+
+    columns = {}
+    for name, (kind, dtype) in COLUMNS.items():
+        parts = ([np.asarray(previous.columns[name])] if previous else []) + chunks[name]
+        if kind == 'dict':
+            dtype = _code_dtype(len(dictionaries[name]))
+        columns[name] = np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+    columns = _latest_by_id(columns)
+
+    watermark = previous.watermark if previous else None
+    if read:
+        latest = max(chunk.max() for chunk in chunks['updated_at']).item()
+        watermark = max(watermark, latest) if watermark else latest
+
+    os.makedirs(directory, exist_ok=True)
+    generation = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    path = os.path.join(directory, generation)
+    os.makedirs(path)
+    try:
+        for name, array in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        manifest = {
+            'rows': len(columns['id']),
+            'watermark': watermark.isoformat() if watermark else None,
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'dictionaries': dictionaries,
+        }
+        with open(os.path.join(path, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        tmp = os.path.join(directory, CURRENT + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(generation)
+        os.replace(tmp, os.path.join(directory, CURRENT))
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+    _prune(directory, generation, keep)
+    return {'generation': generation, 'rows': manifest['rows'], 'read': read,
+            'watermark': manifest['watermark'], 'full': full}
+
+
+def _prune(directory, current, keep):
+    """Delete all but the newest `keep` generations (workers may still map them; POSIX keeps the data alive)."""
+    generations = sorted(name for name in os.listdir(directory)
+                         if name.isdigit() and os.path.isdir(os.path.join(directory, name)))
+    for name in generations[:-max(keep, 1)]:
+        if name != current:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def _current_generation(directory):
+    try:
+        with open(os.path.join(directory, CURRENT), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load(directory, generation=None):
+    """Map the current (or given) generation read-only; None if there is none yet."""
+    _require_numpy()
+    generation = generation or _current_generation(directory)
+    if generation is None:
+        return None
+    path = os.path.join(directory, generation)
+    with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in COLUMNS}
+    return Snapshot(generation, manifest, columns)
+
+
+class _Current:
+    """The worker's mapped snapshot, swapped for a newer generation at most every `interval` seconds."""
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.interval:
+            return self.snapshot
+        with self._lock:
+            if self._checked is None or now - self._checked >= self.interval:
+                self._checked = now
+                generation = _current_generation(self.directory)
+                if generation and (self.snapshot is None or generation != self.snapshot.generation):
+                    self.snapshot = load(self.directory, generation)
+        return self.snapshot
+
+
+def init_app(app):
+    config = app.config
+    current = None
+    if config['SNAPSHOT_DIR'] and np is not None:
+        current = _Current(config['SNAPSHOT_DIR'], config['SNAPSHOT_RELOAD_SECONDS'])
+        current.get()  # map the columns now rather than on the first request
+    app.extensions['snapshots'] = current
+
+
+def get():
+    """The current Snapshot, or None (no snapshot built yet, SNAPSHOT_DIR empty or numpy missing)."""
+    current = current_app.extensions['snapshots']
+    return current.get() if current else None
+
+
+def generation():
+    """Current generation id ('' if none); the ETag validator of the analytics API."""
+    snapshot = get()
+    return snapshot.generation if snapshot else ''